@@ -0,0 +1,234 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmark of kit operations using a synthetic kit.
+
+Each repeat runs in a new process so that datatree modules are imported again,
+and the fastest repeat of each stage is reported. Results are written as JSON
+and can be compared with a previous results file.
+
+Usage:
+    poetry run python benchmarks/bench_kit.py --sites 50 --hosts 20 \\
+        --output results.json --compare baseline.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+from kitgen import generate_kit, add_kit_args
+
+STAGES = [
+    "discovery",
+    "facts",
+    "filter",
+    "render",
+    "write",
+    "json_export",
+    "checks_collect",
+    "checks_manifest",
+]
+
+
+def run_stages(kit_path: str) -> Dict[str, Dict]:
+    """
+    Runs each stage once against a kit and returns durations.
+    """
+    # pylint: disable=C0415
+    from nectl import Nectl
+    from nectl.settings import load_settings
+    from nectl.datatree.hosts import get_all_hosts, get_filtered_hosts
+    from nectl.datatree.facts_utils import write_facts_json
+    from nectl.configs.render import render_hosts
+    from nectl.configs.utils import write_configs_to_dir
+
+    settings = load_settings(filepath=os.path.join(kit_path, "kit.py"))
+    shutil.rmtree(settings.cache_path, ignore_errors=True)
+    results: Dict[str, Dict] = {}
+
+    def _timed(name, func):
+        ts_start = time.perf_counter()
+        items = func()
+        results[name] = {"seconds": time.perf_counter() - ts_start, "items": items}
+
+    state: Dict = {}
+
+    def _discovery():
+        state["hosts"] = list(get_all_hosts(settings).values())
+        return len(state["hosts"])
+
+    def _facts():
+        return sum(len(host.facts) for host in state["hosts"])
+
+    def _filter():
+        return len(get_filtered_hosts(settings, role="role0"))
+
+    def _render():
+        state["configs"] = render_hosts(settings=settings, hosts=state["hosts"])
+        return len(state["configs"])
+
+    def _write():
+        return write_configs_to_dir(
+            configs=state["configs"],
+            output_dir=os.path.join(kit_path, settings.staged_configs_dir),
+            extension=settings.configs_file_extension,
+        )
+
+    def _json_export():
+        with open(os.devnull, "w", encoding="utf-8") as fh:
+            return write_facts_json(((h.id, h.facts) for h in state["hosts"]), fh)
+
+    def _checks(fast: bool):
+        with redirect_stdout(io.StringIO()):
+            return len(Nectl(settings=settings).list_checks(state["hosts"], fast=fast))
+
+    _timed("discovery", _discovery)
+    _timed("facts", _facts)
+    _timed("filter", _filter)
+    _timed("render", _render)
+    _timed("write", _write)
+    _timed("json_export", _json_export)
+    _timed("checks_collect", lambda: _checks(fast=False))
+    _timed("checks_manifest", lambda: _checks(fast=True))
+
+    return results
+
+
+def summarize(runs: List[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """
+    Returns fastest and median duration of each stage across repeats.
+    """
+    return {
+        stage: {
+            "min": min(run[stage]["seconds"] for run in runs),
+            "median": statistics.median(run[stage]["seconds"] for run in runs),
+            "items": runs[0][stage]["items"],
+        }
+        for stage in STAGES
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float):
+    """
+    Prints ratio to baseline for each stage and returns stages over threshold.
+    """
+    slower = []
+    print(f"\n{'stage':<16} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for stage, result in results.items():
+        if stage not in baseline:
+            continue
+        ratio = result["min"] / max(baseline[stage]["min"], 1e-9)
+        flag = " !" if ratio > threshold else ""
+        print(
+            f"{stage:<16} {baseline[stage]['min']:>10.4f} "
+            f"{result['min']:>10.4f} {ratio:>7.2f}{flag}"
+        )
+        if ratio > threshold:
+            slower.append(stage)
+    return slower
+
+
+def main():
+    """
+    Benchmark entrypoint.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_kit_args(parser)
+    parser.add_argument("--repeat", type=int, default=3, help="Repeats per stage.")
+    parser.add_argument("--kit", help="Kit directory, temporary if not set.")
+    parser.add_argument("--output", help="Write JSON results to file.")
+    parser.add_argument("--compare", help="Compare with JSON results file.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Ratio to baseline which fails the comparison.",
+    )
+    args = parser.parse_args()
+
+    kit_path = os.path.abspath(args.kit or tempfile.mkdtemp(prefix="nectl-bench-"))
+    params = generate_kit(
+        path=kit_path,
+        sites=args.sites,
+        roles=args.roles,
+        hosts=args.hosts,
+        facts=args.facts,
+        sections=args.sections,
+        checks=args.checks,
+    )
+    print(f"benchmarking kit: {kit_path} {params}")
+
+    # New process per repeat so that module imports are not cached
+    ctx = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(args.repeat):
+        with ctx.Pool(1) as pool:
+            runs.append(pool.apply(run_stages, (kit_path,)))
+
+    results = summarize(runs)
+    print(f"\n{'stage':<16} {'min(s)':>10} {'median(s)':>10} {'items':>8}")
+    for stage, result in results.items():
+        print(
+            f"{stage:<16} {result['min']:>10.4f} "
+            f"{result['median']:>10.4f} {result['items']:>8}"
+        )
+
+    if args.output:
+        from nectl import __version__  # pylint: disable=C0415
+
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "nectl_version": __version__,
+                    "python_version": platform.python_version(),
+                    "timestamp": time.time(),
+                    "params": {**params, "repeat": args.repeat},
+                    "results": results,
+                },
+                fh,
+                indent=2,
+            )
+        print(f"\nresults written to: {args.output}")
+
+    if not args.kit:
+        shutil.rmtree(kit_path, ignore_errors=True)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        if baseline.get("params", {}).get("hosts") != params["hosts"]:
+            print("warning: baseline was run with a different kit size")
+        slower = compare(results, baseline["results"], args.threshold)
+        if slower:
+            print(f"\nslower than baseline: {', '.join(slower)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
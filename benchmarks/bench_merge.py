@@ -0,0 +1,120 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmark of fact merges using large interface dicts.
+
+Usage:
+    poetry run python benchmarks/bench_merge.py --keys 10000 --layers 4
+"""
+import copy
+import time
+import argparse
+from typing import Callable, List, Dict
+
+from dpath import merge, MergeType
+
+from nectl.datatree.facts_merge import merge_facts
+
+
+def make_layers(keys: int, layers: int) -> List[Dict]:
+    """
+    Returns interface dict layers where each layer overrides some interfaces.
+    """
+    base = {
+        f"ge-0/0/{i}": {
+            "description": f"port {i}",
+            "mtu": 1500,
+            "units": {"0": {"vlans": [i % 4094 + 1]}},
+        }
+        for i in range(keys)
+    }
+    result = [base]
+    for layer in range(1, layers):
+        result.append(
+            {
+                f"ge-0/0/{i}": {"mtu": 9000 + layer, "units": {"0": {"vlans": [layer]}}}
+                for i in range(0, keys, 10)
+            }
+        )
+    return result
+
+
+def run(name: str, func: Callable[[List[Dict]], Dict], layers: List[Dict]) -> float:
+    """
+    Runs a merge function against a deep copy of layers and returns duration.
+    """
+    data = copy.deepcopy(layers)
+    ts_start = time.perf_counter()
+    func(data)
+    dur = time.perf_counter() - ts_start
+    print(f"{name:<24} {dur:0.4f}s")
+    return dur
+
+
+def merge_dpath(layers: List[Dict]) -> Dict:
+    """
+    Merge layers using dpath as facts were previously loaded.
+    """
+    facts: Dict = {}
+    for layer in layers:
+        facts = merge(facts, layer, flags=MergeType.ADDITIVE)
+    return facts
+
+
+def merge_copy(layers: List[Dict]) -> Dict:
+    """
+    Merge layers using copy on write merges.
+    """
+    facts: Dict = {}
+    for layer in layers:
+        facts = merge_facts(facts, layer)
+    return facts
+
+
+def merge_accumulate(layers: List[Dict]) -> Dict:
+    """
+    Merge layers using accumulate mode as done when loading host facts.
+    """
+    facts: Dict = {}
+    owned: Dict = {}
+    for layer in layers:
+        facts = merge_facts(facts, layer, owned)
+    return facts
+
+
+def main():
+    """
+    Benchmark entrypoint.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=10000, help="Interfaces.")
+    parser.add_argument("--layers", type=int, default=4, help="Datatree layers.")
+    args = parser.parse_args()
+
+    layers = make_layers(keys=args.keys, layers=args.layers)
+    print(f"merging {args.layers} layers of {args.keys} interfaces")
+
+    assert merge_dpath(copy.deepcopy(layers)) == merge_accumulate(layers)
+
+    run("dpath", merge_dpath, layers)
+    run("merge_facts", merge_copy, layers)
+    run("merge_facts accumulate", merge_accumulate, layers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Generator of synthetic kits used by benchmarks.
+
+The kit has a datatree with common, role, site and host layers. Each layer
+has scalar facts, an 'interfaces' dict and an 'ntp_servers' list which are
+merged with the layer below so that both replace and merge actions are used.
+
+Usage:
+    poetry run python benchmarks/kitgen.py /tmp/bench-kit --sites 50 --hosts 20
+"""
+
+import os
+import argparse
+from typing import Dict, List
+
+KIT_FILE = """\
+datatree_lookup_paths = [
+    "datatree.common",
+    "datatree.roles.{role}",
+    "datatree.sites.{site}.common",
+    "datatree.sites.{site}.hosts.{hostname}",
+]
+
+hosts_glob_pattern = "sites/*/hosts/*"
+hosts_hostname_regex = "sites/.*/hosts/(.*).py$"
+hosts_site_regex = "sites/(.*)/hosts/.*"
+"""
+
+
+def _write(filepath: str, content: str) -> None:
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, "w", encoding="utf-8") as fh:
+        fh.write(content)
+
+
+def _layer(name: str, facts: int, merge: bool, header: str = "") -> str:
+    """
+    Returns datatree file content for a layer.
+    """
+    action = ": actions.merge_with" if merge else ""
+    interfaces: Dict[str, Dict] = {
+        f"ge-0/0/{i}": {"description": f"{name} port {i}", "mtu": 1500 + i}
+        for i in range(facts)
+    }
+    lines = ["from nectl import actions", "", header]
+    lines += [f"{name}_fact_{i} = {i!r}" for i in range(facts)]
+    lines += [
+        f"interfaces{action} = {interfaces!r}",
+        f"ntp_servers{action} = {[f'10.{i}.0.1' for i in range(3)]!r}",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def _template(sections: int) -> str:
+    """
+    Returns template content with sections that use scalar and merged facts.
+    """
+    lines: List[str] = []
+    for i in range(sections):
+        lines += [
+            f"def section_{i}(hostname, interfaces, ntp_servers):",
+            f"    print(f'section {i} for {{hostname}}')",
+            "    for name, intf in interfaces.items():",
+            f"        print(f'  {{name}} mtu {{intf[\"mtu\"] + {i}}}')",
+            "    for server in ntp_servers:",
+            "        print(f'  ntp {server}')",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def _checks(checks: int, roles: List[str]) -> str:
+    """
+    Returns check file content with a dict hosts filter for the first role.
+    """
+    lines = [f"__hosts_filter__ = {{'role': {roles[0]!r}}}", ""]
+    for i in range(checks):
+        lines += [
+            f"def check_fact_{i}(host):",
+            "    assert host.facts['common_fact_0'] == 0",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def generate_kit(
+    path: str,
+    sites: int = 10,
+    roles: int = 3,
+    hosts: int = 10,
+    facts: int = 20,
+    sections: int = 20,
+    checks: int = 20,
+) -> Dict[str, int]:
+    """
+    Writes a synthetic kit to a directory.
+
+    Args:
+        path (str): kit directory.
+        sites (int): total sites.
+        roles (int): total roles, hosts are assigned to roles in turn.
+        hosts (int): hosts per site.
+        facts (int): scalar facts and interfaces per datatree layer.
+        sections (int): template sections.
+        checks (int): checks in the check file.
+
+    Returns:
+        Dict[str, int]: kit size parameters.
+    """
+    role_names = [f"role{r}" for r in range(roles)]
+    datatree = os.path.join(path, "datatree")
+
+    _write(os.path.join(path, "kit.py"), KIT_FILE)
+    _write(os.path.join(datatree, "common.py"), _layer("common", facts, False))
+    for role in role_names:
+        _write(os.path.join(datatree, "roles", f"{role}.py"), _layer(role, facts, True))
+
+    for s in range(sites):
+        site = f"site{s}"
+        _write(
+            os.path.join(datatree, "sites", site, "common.py"),
+            _layer(site, facts, True),
+        )
+        for h in range(hosts):
+            role = role_names[h % roles]
+            header = (
+                f"role = {role!r}\n"
+                "os_name = 'benchos'\n"
+                "os_version = '1.0'\n"
+                f"mgmt_ip = '10.{s // 250}.{s % 250}.{h + 1}'\n"
+                f"deployment_group = 'group{s % 4}'\n"
+            )
+            _write(
+                os.path.join(datatree, "sites", site, "hosts", f"host{h}.py"),
+                _layer("host", facts, True, header),
+            )
+
+    _write(os.path.join(path, "templates", "benchos.py"), _template(sections))
+    _write(os.path.join(path, "checks", "check_bench.py"), _checks(checks, role_names))
+
+    return {
+        "sites": sites,
+        "roles": roles,
+        "hosts": sites * hosts,
+        "facts": facts,
+        "sections": sections,
+        "checks": checks,
+    }
+
+
+def add_kit_args(parser: argparse.ArgumentParser) -> None:
+    """
+    Add kit size arguments to a parser.
+    """
+    parser.add_argument("--sites", type=int, default=10, help="Sites.")
+    parser.add_argument("--roles", type=int, default=3, help="Roles.")
+    parser.add_argument("--hosts", type=int, default=10, help="Hosts per site.")
+    parser.add_argument("--facts", type=int, default=20, help="Facts per layer.")
+    parser.add_argument("--sections", type=int, default=20, help="Template sections.")
+    parser.add_argument("--checks", type=int, default=20, help="Checks.")
+
+
+def main():
+    """
+    Generator entrypoint.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", help="Kit directory to create.")
+    add_kit_args(parser)
+    args = parser.parse_args()
+
+    params = generate_kit(
+        path=args.path,
+        sites=args.sites,
+        roles=args.roles,
+        hosts=args.hosts,
+        facts=args.facts,
+        sections=args.sections,
+        checks=args.checks,
+    )
+    print(f"kit written to: {args.path} {params}")
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,9 @@ def checks():
 @click.option("-s", "--site", help="Filter by site.")
 @click.option("-r", "--role", help="Filter by role.")
 @click.option("-d", "--deployment-group", help="Filter by deployment group.")
+@click.option(
+    "--fast", is_flag=True, help="List checks from cached manifest without pytest."
+)
 @click.pass_context
 @logging_opts
 def list_cmd(
@@ -47,6 +50,7 @@ def list_cmd(
     site: str,
     role: str,
     deployment_group: str,
+    fast: bool,
 ):
     """
     Use this command to list all configured checks.
@@ -66,6 +70,7 @@ def list_cmd(
                 key=lambda host: (host.customer, host.site, host.id),
             ),
             pytest_expression=pytest_expression,
+            fast=fast,
         )
 
         print(f"{len(results)} checks found.")
@@ -82,6 +87,31 @@ def list_cmd(
 @click.option("-s", "--site", help="Filter by site.")
 @click.option("-r", "--role", help="Filter by role.")
 @click.option("-d", "--deployment-group", help="Filter by deployment group.")
+@click.option("-u", "--username", help="Host driver username.")
+@click.option("-p", "--password", help="Host driver password.")
+@click.option("-i", "--ssh-key", help="Host driver SSH private key file.")
+@click.option(
+    "-w",
+    "--workers",
+    help="Total worker processes to run checks in parallel.",
+    type=click.IntRange(min=1),
+    default=1,
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    help="Use last state snapshots and skip checks that connect to hosts.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Reuse previous results of checks where check file and facts are unchanged.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue an interrupted run without repeating completed checks.",
+)
 @click.pass_context
 @logging_opts
 def run_cmd(
@@ -92,6 +122,13 @@ def run_cmd(
     site: str,
     role: str,
     deployment_group: str,
+    username: str,
+    password: str,
+    ssh_key: str,
+    workers: int,
+    offline: bool,
+    incremental: bool,
+    resume: bool,
 ):
     """
     Use this command to run checks.
@@ -111,6 +148,13 @@ def run_cmd(
                 key=lambda host: (host.customer, host.site, host.id),
             ),
             pytest_expression=pytest_expression,
+            workers=workers,
+            username=username,
+            password=password,
+            ssh_private_key_file=ssh_key,
+            offline=offline,
+            incremental=incremental,
+            resume=resume,
         )
 
         print(f"report written to: {results['report']}")
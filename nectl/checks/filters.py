@@ -0,0 +1,142 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Check hosts filters which are resolved once and shared between checks.
+"""
+from typing import Any, Callable, Dict, List, Set, Tuple, Union
+
+from ..logging import get_logger
+from ..exceptions import ChecksError
+from ..datatree.hosts import Host
+
+HostsFilter = Union[Callable[[Host], Any], Dict[str, Any]]
+logger = get_logger()
+
+
+def match_all_hosts(host: Host) -> Host:
+    """
+    Default hosts filter which matches all hosts.
+    """
+    return host
+
+
+class HostsFilterIndex:
+    """
+    Resolves hosts filters against a list of hosts and memoizes the result for
+    each filter object, so checks sharing a module or class filter are only
+    evaluated once.
+
+    Filters can be a callable which accepts a host, or a dict of host attribute
+    and value. A list, tuple or set value matches any of its items and all
+    attributes must match, for example:
+
+        __hosts_filter__ = {"site": "london", "os_name": ["junos", "eos"]}
+
+    Dict filters are resolved using an index of attribute values which is built
+    the first time an attribute is used.
+    """
+
+    def __init__(self, hosts: List[Host]) -> None:
+        """
+        Args:
+            hosts (List[Host]): hosts to filter.
+        """
+        self._hosts = hosts
+        self._results: Dict[int, Tuple[HostsFilter, List[Host]]] = {}
+        self._attributes: Dict[str, Tuple[Dict[Any, Set[int]], List[int]]] = {}
+
+    def filter(self, hosts_filter: HostsFilter) -> List[Host]:
+        """
+        Returns hosts which match the filter in their original order.
+
+        Args:
+            hosts_filter (HostsFilter): callable or dict filter.
+
+        Returns:
+            List[Host]: matching hosts.
+
+        Raises:
+            ChecksError: if filter is not a callable or dict.
+        """
+        # Filter is kept with the result so that its id cannot be reused
+        cached = self._results.get(id(hosts_filter))
+        if cached is not None and cached[0] is hosts_filter:
+            return cached[1]
+
+        if isinstance(hosts_filter, dict):
+            hosts = self._filter_by_attributes(hosts_filter)
+        elif callable(hosts_filter):
+            hosts = [host for host in self._hosts if hosts_filter(host)]
+        else:
+            raise ChecksError(
+                f"hosts filter must be a callable or dict not {type(hosts_filter)}"
+            )
+
+        self._results[id(hosts_filter)] = (hosts_filter, hosts)
+        return hosts
+
+    def _filter_by_attributes(self, hosts_filter: Dict[str, Any]) -> List[Host]:
+        """
+        Returns hosts matching all attributes in a dict filter.
+        """
+        matched = set(range(len(self._hosts)))
+
+        for attr, value in hosts_filter.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            matched &= self._lookup(attr, values)
+            if not matched:
+                break
+
+        return [self._hosts[i] for i in sorted(matched)]
+
+    def _lookup(self, attr: str, values: List[Any]) -> Set[int]:
+        """
+        Returns positions of hosts where the attribute matches any value.
+        """
+        if attr not in self._attributes:
+            self._attributes[attr] = self._build(attr)
+        index, unhashable = self._attributes[attr]
+
+        positions: Set[int] = set()
+        for value in values:
+            try:
+                positions |= index.get(value, set())
+            except TypeError:
+                pass  # unhashable filter value can only match unhashable facts
+            positions.update(
+                i for i in unhashable if getattr(self._hosts[i], attr) == value
+            )
+        return positions
+
+    def _build(self, attr: str) -> Tuple[Dict[Any, Set[int]], List[int]]:
+        """
+        Returns index of attribute values mapped to host positions, and the
+        positions of hosts which have an unhashable value.
+        """
+        logger.debug(f"building hosts filter index for attribute '{attr}'")
+        index: Dict[Any, Set[int]] = {}
+        unhashable: List[int] = []
+
+        for i, host in enumerate(self._hosts):
+            value = getattr(host, attr)
+            try:
+                index.setdefault(value, set()).add(i)
+            except TypeError:
+                unhashable.append(i)
+
+        return index, unhashable
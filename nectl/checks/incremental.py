@@ -0,0 +1,118 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Check result fingerprints used to skip checks when nothing they depend on has
+changed since the previous run.
+
+A fingerprint combines the source of the check file with the facts of the host
+that the check ran against.
+"""
+import os
+import json
+import hashlib
+from typing import Dict
+
+from ..logging import get_logger
+from ..settings import Settings
+from ..datatree.hosts import Host
+from ..datatree.facts_utils import facts_to_json_string
+
+CHECKS_RESULTS_FILENAME = "checks_results.json"
+logger = get_logger()
+
+
+class Fingerprinter:
+    """
+    Returns fingerprints for check and host pairs. File and host hashes are
+    calculated once and reused for every check.
+    """
+
+    def __init__(self) -> None:
+        self._files: Dict[str, str] = {}
+        self._hosts: Dict[str, str] = {}
+
+    def get(self, filepath: str, host: Host) -> str:
+        """
+        Returns fingerprint of check file and host facts.
+
+        Args:
+            filepath (str): check file path.
+            host (Host): host the check runs against.
+
+        Returns:
+            str: fingerprint.
+        """
+        if filepath not in self._files:
+            with open(filepath, "rb") as fh:
+                self._files[filepath] = hashlib.sha256(fh.read()).hexdigest()
+
+        if host.id not in self._hosts:
+            self._hosts[host.id] = hashlib.sha256(
+                facts_to_json_string(host.facts, compact=True).encode()
+            ).hexdigest()
+
+        return hashlib.sha256(
+            f"{self._files[filepath]}:{self._hosts[host.id]}".encode()
+        ).hexdigest()
+
+
+def get_results_filepath(settings: Settings) -> str:
+    """
+    Returns path to stored check results.
+
+    Args:
+        settings (Settings): config settings.
+
+    Returns:
+        str: check results file path.
+    """
+    return os.path.join(settings.cache_path, CHECKS_RESULTS_FILENAME)
+
+
+def load_check_results(settings: Settings) -> Dict[str, Dict]:
+    """
+    Returns check results stored by the previous run.
+
+    Args:
+        settings (Settings): config settings.
+
+    Returns:
+        Dict[str, Dict]: check ID as key and result as value.
+    """
+    try:
+        with open(get_results_filepath(settings), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_check_results(settings: Settings, results: Dict[str, Dict]) -> None:
+    """
+    Writes check results merged with results stored by previous runs.
+
+    Args:
+        settings (Settings): config settings.
+        results (Dict[str, Dict]): check ID as key and result as value.
+    """
+    filepath = get_results_filepath(settings)
+    merged = {**load_check_results(settings), **results}
+
+    os.makedirs(settings.cache_path, exist_ok=True)
+    with open(filepath, "w", encoding="utf-8") as fh:
+        json.dump(merged, fh)
+    logger.debug(f"check results written to file: {filepath}")
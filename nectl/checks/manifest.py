@@ -0,0 +1,348 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Checks manifest used to list checks without running pytest collection.
+
+Check files are parsed without being imported and the result is cached per
+file using its modification time. Checks are parametrized by host when they
+use a host fixture directly or through fixtures defined in the check file.
+Host filters are then resolved with the hosts filter index, and a check file
+is only imported when its filter is a callable.
+"""
+import os
+import ast
+import json
+import time
+import importlib.util
+from fnmatch import fnmatch
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Set
+
+from ..logging import get_logger
+from ..settings import Settings
+from ..datatree.hosts import Host
+from .filters import HostsFilterIndex, match_all_hosts
+from .plugins import FILTER_VARIABLE_NAME
+
+CHECKS_MANIFEST_FILENAME = "checks_manifest.json"
+CHECKS_MANIFEST_VERSION = 2
+HOST_FIXTURES = ("host", "device", "snapshot")  # fixtures parametrized by host
+logger = get_logger()
+
+
+class UnsupportedCheckError(Exception):
+    """
+    Indicates that a check file cannot be listed without pytest collection.
+    """
+
+
+def _get_filter(body: List[ast.stmt]) -> Optional[Dict]:
+    """
+    Returns hosts filter defined in module or class body.
+    """
+    for node in body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign):
+            targets = [node.target]
+        else:
+            continue
+
+        if not any(
+            isinstance(t, ast.Name) and t.id == FILTER_VARIABLE_NAME for t in targets
+        ):
+            continue
+
+        if isinstance(node.value, ast.Dict):
+            try:
+                return {"type": "dict", "value": ast.literal_eval(node.value)}
+            except ValueError:
+                pass
+        return {"type": "callable"}
+
+    return None
+
+
+def _is_fixture(node: ast.AST) -> bool:
+    """
+    Returns True if function is decorated as a pytest fixture.
+
+    Raises:
+        UnsupportedCheckError: if fixture arguments change how it is used.
+    """
+    for decorator in node.decorator_list:
+        func = decorator.func if isinstance(decorator, ast.Call) else decorator
+        if getattr(func, "attr", getattr(func, "id", None)) != "fixture":
+            continue
+        if isinstance(decorator, ast.Call) and (
+            decorator.args or any(k.arg != "scope" for k in decorator.keywords)
+        ):
+            raise UnsupportedCheckError(f"fixture '{node.name}' has arguments")
+        return True
+    return False
+
+
+def _get_host_fixtures(body: List[ast.stmt]) -> Set[str]:
+    """
+    Returns names of host fixtures and fixtures in module body which depend on
+    them, as checks using any of these are parametrized by host.
+    """
+    fixtures: Dict[str, List[str]] = {}
+    for node in body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if not _is_fixture(node):
+            continue
+        if node.name in HOST_FIXTURES:
+            raise UnsupportedCheckError(f"fixture '{node.name}' is overridden")
+        fixtures[node.name] = [arg.arg for arg in node.args.args]
+
+    host_fixtures = set(HOST_FIXTURES)
+    while True:
+        found = {
+            name
+            for name, args in fixtures.items()
+            if name not in host_fixtures and host_fixtures.intersection(args)
+        }
+        if not found:
+            return host_fixtures
+        host_fixtures |= found
+
+
+def _get_check(node: ast.AST, host_fixtures: Set[str], is_method: bool = False) -> Dict:
+    """
+    Returns check function details.
+    """
+    if node.decorator_list:
+        raise UnsupportedCheckError(f"check '{node.name}' has decorators")
+
+    args = [arg.arg for arg in node.args.args[1 if is_method else 0 :]]
+    return {
+        "name": node.name,
+        "hosts": any(arg in host_fixtures for arg in args),
+    }
+
+
+def build_file_manifest(settings: Settings, filepath: str) -> Dict:
+    """
+    Returns checks defined in a check file by parsing its source.
+
+    Args:
+        settings (Settings): config settings.
+        filepath (str): check file path.
+
+    Returns:
+        Dict: file manifest.
+
+    Raises:
+        UnsupportedCheckError: if checks are generated in a way that cannot
+            be determined without pytest.
+    """
+    with open(filepath, "r", encoding="utf-8") as fh:
+        tree = ast.parse(fh.read(), filename=filepath)
+
+    function_pattern = f"{settings.checks_prefix}_*"
+    class_prefix = settings.checks_prefix.capitalize()
+    host_fixtures = _get_host_fixtures(tree.body)
+    manifest: Dict[str, Any] = {
+        "filter": _get_filter(tree.body),
+        "checks": [],
+        "classes": [],
+    }
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if node.name == "pytest_generate_tests":
+                raise UnsupportedCheckError("file defines 'pytest_generate_tests'")
+            if fnmatch(node.name, function_pattern):
+                manifest["checks"].append(_get_check(node, host_fixtures))
+
+        elif isinstance(node, ast.ClassDef) and node.name.startswith(class_prefix):
+            if node.decorator_list:
+                raise UnsupportedCheckError(f"class '{node.name}' has decorators")
+            methods = [
+                n
+                for n in node.body
+                if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+            if any(method.name == "__init__" for method in methods):
+                continue  # pytest does not collect classes with __init__
+            if any(_is_fixture(method) for method in methods):
+                raise UnsupportedCheckError(f"class '{node.name}' defines fixtures")
+            manifest["classes"].append(
+                {
+                    "name": node.name,
+                    "filter": _get_filter(node.body),
+                    "checks": [
+                        _get_check(method, host_fixtures, is_method=True)
+                        for method in methods
+                        if fnmatch(method.name, function_pattern)
+                    ],
+                }
+            )
+
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)) and "pytestmark" in [
+            getattr(t, "id", None)
+            for t in (node.targets if isinstance(node, ast.Assign) else [node.target])
+        ]:
+            raise UnsupportedCheckError("file defines 'pytestmark'")
+
+    return manifest
+
+
+def get_checks_manifest(settings: Settings) -> Dict[str, Dict]:
+    """
+    Returns manifest of all check files. Only files which have been added or
+    modified since the cached manifest was written are parsed.
+
+    Args:
+        settings (Settings): config settings.
+
+    Returns:
+        Dict[str, Dict]: check file path relative to checks directory as key
+            and file manifest as value.
+
+    Raises:
+        UnsupportedCheckError: if checks cannot be listed without pytest.
+    """
+    checks_path = os.path.join(settings.kit_path, settings.checks_dirname)
+    manifest_filepath = os.path.join(settings.cache_path, CHECKS_MANIFEST_FILENAME)
+    file_pattern = f"{settings.checks_prefix}_*.py"
+
+    try:
+        with open(manifest_filepath, "r", encoding="utf-8") as fh:
+            cached = json.load(fh)
+        if cached.get("version") != CHECKS_MANIFEST_VERSION:
+            cached = {}
+    except (FileNotFoundError, ValueError):
+        cached = {}
+
+    cached_files = cached.get("files", {})
+    files: Dict[str, Dict] = {}
+    parsed = 0
+
+    for root, dirs, filenames in os.walk(checks_path):
+        dirs[:] = sorted(
+            d for d in dirs if not d.startswith(".") and d != "__pycache__"
+        )
+        if "conftest.py" in filenames:
+            raise UnsupportedCheckError("checks directory contains 'conftest.py'")
+
+        for filename in sorted(filenames):
+            if not fnmatch(filename, file_pattern):
+                continue
+
+            filepath = os.path.join(root, filename)
+            relpath = os.path.relpath(filepath, checks_path)
+            mtime_ns = os.stat(filepath).st_mtime_ns
+
+            if cached_files.get(relpath, {}).get("mtime_ns") == mtime_ns:
+                files[relpath] = cached_files[relpath]
+                continue
+
+            files[relpath] = {
+                "mtime_ns": mtime_ns,
+                **build_file_manifest(settings=settings, filepath=filepath),
+            }
+            parsed += 1
+
+    if parsed or len(files) != len(cached_files):
+        os.makedirs(settings.cache_path, exist_ok=True)
+        with open(manifest_filepath, "w", encoding="utf-8") as fh:
+            json.dump({"version": CHECKS_MANIFEST_VERSION, "files": files}, fh)
+        logger.debug(f"checks manifest written to file: {manifest_filepath}")
+
+    logger.debug(f"checks manifest parsed={parsed} total={len(files)}")
+
+    return files
+
+
+def _import_check_file(filepath: str) -> ModuleType:
+    """
+    Returns imported check file which is used to read callable filters.
+    """
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    spec = importlib.util.spec_from_file_location(name, filepath)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def list_checks_from_manifest(settings: Settings, hosts: List[Host]) -> List[str]:
+    """
+    Returns check IDs for hosts using the checks manifest. IDs match those
+    listed by pytest, ordered by file, check and then host.
+
+    Args:
+        settings (Settings): config settings.
+        hosts (List[Host]): hosts to list checks for.
+
+    Returns:
+        List[str]: check IDs.
+
+    Raises:
+        UnsupportedCheckError: if checks cannot be listed without pytest.
+    """
+    checks_path = os.path.join(settings.kit_path, settings.checks_dirname)
+    index = HostsFilterIndex(hosts)
+    checks: List[str] = []
+
+    ts_start = time.perf_counter()
+
+    for relpath, manifest in get_checks_manifest(settings).items():
+        module: Optional[ModuleType] = None
+
+        def _get_hosts(hosts_filter: Optional[Dict], cls_name: str = "") -> List[Host]:
+            nonlocal module
+            if hosts_filter is None:
+                return index.filter(match_all_hosts)
+            if hosts_filter["type"] == "dict":
+                return index.filter(hosts_filter["value"])
+            if module is None:
+                module = _import_check_file(os.path.join(checks_path, relpath))
+            owner = getattr(module, cls_name) if cls_name else module
+            return index.filter(getattr(owner, FILTER_VARIABLE_NAME))
+
+        def _get_ids(prefix: str, check: Dict, matched: List[Host]) -> List[str]:
+            if not check["hosts"]:
+                return [f"{prefix}::{check['name']}"]
+            return [f"{prefix}::{check['name']}[{host.id}]" for host in matched]
+
+        # Module is skipped when a module check matches no hosts
+        module_hosts = _get_hosts(manifest["filter"])
+        if not module_hosts and any(c["hosts"] for c in manifest["checks"]):
+            continue
+
+        for check in manifest["checks"]:
+            checks.extend(_get_ids(relpath, check, module_hosts))
+
+        for cls in manifest["classes"]:
+            cls_filter = cls["filter"] if cls["filter"] else manifest["filter"]
+            cls_hosts = _get_hosts(cls_filter, cls["name"] if cls["filter"] else "")
+
+            # Class is skipped when a class check matches no hosts
+            if not cls_hosts and any(c["hosts"] for c in cls["checks"]):
+                continue
+
+            for check in cls["checks"]:
+                checks.extend(_get_ids(f"{relpath}::{cls['name']}", check, cls_hosts))
+
+    dur = f"{time.perf_counter()-ts_start:0.4f}"
+    logger.info(f"finished listing checks from manifest total={len(checks)} ({dur}s)")
+
+    return checks
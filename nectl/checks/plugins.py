@@ -16,14 +16,24 @@
 # along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
 
 
-from typing import List
+import time
+from typing import Dict, List, Optional
 import pytest
 
 from ..logging import get_logger
+from ..settings import Settings
+from ..exceptions import ChecksError
 from ..datatree.hosts import Host
+from ..configs.drivers.basedriver import BaseDriver
+from .filters import HostsFilterIndex, match_all_hosts
+from .sessions import DriverSessionPool
+from .snapshots import load_snapshot
+from .incremental import Fingerprinter
 
 
 FILTER_VARIABLE_NAME = "__hosts_filter__"
+NO_HOSTS_MATCHED_MESSAGE = "skipping as no hosts matched the test filter"
+LIVE_FIXTURES = ("device", "snapshot")  # checks using these always run
 
 
 logger = get_logger()
@@ -40,16 +50,52 @@ class ChecksPlugin:
     def check_site(host):
         assert host.site == "nyc"
 
+    Filters can also be a dict of host attributes:
+
+    __hosts_filter__ = {"site": "nyc", "os_name": ["junos", "eos"]}
+
     """
 
-    def __init__(self, hosts: List[Host]) -> None:
+    def __init__(
+        self,
+        hosts: List[Host],
+        settings: Optional[Settings] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        ssh_private_key_file: Optional[str] = None,
+        offline: bool = False,
+        snapshots_since: Optional[float] = None,
+        previous_results: Optional[Dict[str, Dict]] = None,
+    ) -> None:
         """
         A Pytest plugin that generates additional tests for each matching host.
 
         Args:
             hosts (List[Host]): list of hosts to check.
+            settings (Settings): config settings, defaults to host settings.
+            username (str): override host username for driver sessions.
+            password (str): override host password for driver sessions.
+            ssh_private_key_file (str): override ssh private key file.
+            offline (bool): skip checks that use device and use last snapshots.
+            snapshots_since (float): time the run started collecting snapshots,
+                which snapshot age is measured at against the state TTL.
+            previous_results (Dict[str, Dict]): results from a previous run
+                which are reused for checks with unchanged fingerprints.
         """
         self._hosts = hosts
+        self._settings = settings
+        self._username = username
+        self._password = password
+        self._ssh_private_key_file = ssh_private_key_file
+        self._offline = offline
+        self._snapshots_since = snapshots_since
+        self._previous_results = previous_results
+        self._fingerprinter = Fingerprinter()
+        self._fingerprints: Dict[str, str] = {}
+        self.results: Dict[str, Dict] = {}
+        self.carried_forward = 0
+        self._sessions: Optional[DriverSessionPool] = None
+        self._hosts_filter_index = HostsFilterIndex(hosts)
         self.passed = 0
         self.failed = 0
         self.tests = []
@@ -64,9 +110,110 @@ class ChecksPlugin:
     def host(self, _nectl_host):
         return _nectl_host
 
+    @pytest.fixture
+    def device(self, host) -> BaseDriver:
+        """
+        Returns a connected driver for host. Sessions are opened on first use
+        and shared by all checks for the host until the end of the run.
+        """
+        if self._offline:
+            pytest.skip("device is not available in offline mode")
+
+        if self._sessions is None:
+            settings = self._get_settings(host)
+            self._sessions = DriverSessionPool(
+                settings=settings,
+                max_sessions=settings.checks_max_sessions,
+                username=self._username,
+                password=self._password,
+                ssh_private_key_file=self._ssh_private_key_file,
+            )
+        return self._sessions.get(host)
+
+    @pytest.fixture
+    def snapshot(self, host) -> Dict:
+        """
+        Returns device state collected for host before checks started. In
+        offline mode the last collected snapshot is used regardless of age,
+        otherwise the snapshot must have been within the TTL when this run
+        started collecting snapshots.
+        """
+        settings = self._get_settings(host)
+
+        ttl = None
+        if not self._offline:
+            ttl = settings.checks_state_ttl
+            if self._snapshots_since is not None:
+                ttl += time.time() - self._snapshots_since  # age at run start
+
+        snapshot = load_snapshot(
+            settings=settings,
+            host=host,
+            getters=settings.checks_state_getters,
+            ttl=ttl,
+        )
+        if snapshot is None:
+            if self._offline:
+                raise ChecksError(f"[{host.id}] no state snapshot found")
+            raise ChecksError(f"[{host.id}] no fresh state snapshot found")
+        return snapshot["state"]
+
+    def _get_max_sessions(self) -> int:
+        """
+        Returns the maximum sessions of the session pool.
+        """
+        settings = self._settings if self._settings else self._hosts[0]._settings
+        return settings.checks_max_sessions
+
+    def _get_settings(self, host: Host) -> Settings:
+        """
+        Returns plugin settings or host settings if none were supplied.
+        """
+        return self._settings if self._settings else host._settings
+
+    def pytest_sessionfinish(self):
+        """
+        Close driver sessions.
+        """
+        if self._sessions is not None:
+            self._sessions.close_all()
+
+        if self._previous_results is not None:
+            logger.info(f"reused {self.carried_forward} unchanged check results")
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_pyfunc_call(self, pyfuncitem):
+        """
+        Fingerprint check and reuse the previous result if it is unchanged.
+        Checks are only fingerprinted in incremental mode.
+        """
+        if self._previous_results is None:
+            return None
+
+        host = _get_item_host(pyfuncitem)
+        if not host or any(f in pyfuncitem.fixturenames for f in LIVE_FIXTURES):
+            return None
+
+        fingerprint = self._fingerprinter.get(str(pyfuncitem.path), host)
+        self._fingerprints[pyfuncitem.nodeid] = fingerprint
+
+        previous = self._previous_results.get(pyfuncitem.nodeid, {})
+        if previous.get("fingerprint") != fingerprint:
+            return None
+
+        self.carried_forward += 1
+        if previous.get("outcome") == "passed":
+            return True
+        if previous.get("outcome") == "failed":
+            pytest.fail(
+                f"unchanged since previous run which failed:\n{previous['message']}",
+                pytrace=False,
+            )
+        return None
+
     def pytest_runtest_logreport(self, report):
         """
-        Update counters.
+        Update counters and results.
         """
         if report.when != "call":
             return
@@ -75,10 +222,46 @@ class ChecksPlugin:
         elif report.failed:
             self.failed += 1
 
-    def pytest_collection_modifyitems(self, session):
+        if report.nodeid in self._fingerprints and (report.passed or report.failed):
+            fingerprint = self._fingerprints[report.nodeid]
+            previous = (self._previous_results or {}).get(report.nodeid, {})
+            message = str(report.longrepr) if report.failed else ""
+
+            # Keep original failure message when result was carried forward
+            if report.failed and previous.get("fingerprint") == fingerprint:
+                message = previous.get("message", message)
+
+            self.results[report.nodeid] = {
+                "fingerprint": fingerprint,
+                "outcome": report.outcome,
+                "message": message,
+            }
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, items):
         """
         Intercept tests and add them to a tests list.
+
+        When checks using the device fixture need more hosts than the session
+        pool keeps open, checks are ordered by host instead of by module so that
+        each host session is only opened once.
         """
+        hosts: Dict[str, int] = {}
+        uses_device = False
+        for item in items:
+            host = _get_item_host(item)
+            if host is not None:
+                hosts.setdefault(host.id, len(hosts))
+                uses_device = uses_device or "device" in item.fixturenames
+
+        def host_order(item) -> int:
+            host = _get_item_host(item)
+            return hosts[host.id] if host else -1
+
+        if uses_device and len(hosts) > self._get_max_sessions():
+            logger.debug(f"ordering checks by host for {len(hosts)} hosts")
+            items.sort(key=host_order)
+
         self.tests = self.tests_selected = [item.nodeid for item in session.items]
 
     def pytest_deselected(self, items):
@@ -102,14 +285,14 @@ class ChecksPlugin:
             elif hasattr(metafunc.module, FILTER_VARIABLE_NAME):
                 hosts_filter = getattr(metafunc.module, FILTER_VARIABLE_NAME)
             else:
-                hosts_filter = lambda host: host  # default return all hosts
+                hosts_filter = match_all_hosts  # default return all hosts
 
-            # Filter hosts
-            hosts = [host for host in self._hosts if hosts_filter(host)]
+            # Filter hosts, results are shared by checks using the same filter
+            hosts = self._hosts_filter_index.filter(hosts_filter)
 
             # Skip test if there are no hosts matched
             if not hosts:
-                pytest.skip("skipping as no hosts matched the test filter")
+                pytest.skip(NO_HOSTS_MATCHED_MESSAGE)
 
             # Repeat tests using parametrize and passing matching host instances
             metafunc.parametrize(
@@ -119,3 +302,11 @@ class ChecksPlugin:
                 scope="module",
                 indirect=True,
             )
+
+
+def _get_item_host(item) -> Optional[Host]:
+    """
+    Returns host that a check item is parametrized with.
+    """
+    callspec = getattr(item, "callspec", None)
+    return callspec.params.get("_nectl_host") if callspec else None
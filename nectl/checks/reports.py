@@ -0,0 +1,349 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Checks report which is streamed to a JSON lines file as each check finishes
+and converted to a junit xml report at the end of the run.
+
+Each line is a record for one check, or for a module or class which was
+skipped during collection, for example:
+
+    {"nodeid": "check_bgp.py::check_peers[core0.nyc]", "host": "core0.nyc",
+     "outcome": "passed", "when": "call", "duration": 0.0123, "message": "",
+     "details": "", "timestamp": 1760000000.0}
+"""
+import os
+import json
+import time
+from glob import glob, escape
+from typing import Dict, Iterator, List, Optional, Set, TextIO, Tuple
+from xml.etree import ElementTree
+import pytest
+
+from ..logging import get_logger
+from .plugins import NO_HOSTS_MATCHED_MESSAGE
+
+FINAL_OUTCOMES = ("passed", "failed", "skipped", "error")
+logger = get_logger()
+
+
+def _get_message(report) -> Tuple[str, str]:
+    """
+    Returns short message and details from pytest report.
+    """
+    if not report.longrepr:
+        return "", ""
+    if isinstance(report.longrepr, tuple):
+        return str(report.longrepr[2]), ""  # skip reports are (path, lineno, msg)
+
+    details = report.longreprtext
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is not None:
+        return crash.message, details
+    return details.strip().splitlines()[0] if details.strip() else "", details
+
+
+class ChecksReporter:
+    """
+    Pytest plugin that appends a JSON record to a file as each check finishes
+    so that results are not held in memory and survive an interrupted run.
+    """
+
+    def __init__(self, filepath: str, completed: Optional[Set[str]] = None) -> None:
+        """
+        Args:
+            filepath (str): JSON lines file to append records to.
+            completed (Set[str]): IDs of checks already in the file which are
+                deselected when resuming a run.
+        """
+        self.filepath = filepath
+        self._completed = completed or set()
+        self._fh: Optional[TextIO] = None
+        self._hosts: Dict[str, str] = {}
+        self._pending: Dict[str, Dict] = {}
+
+    def pytest_sessionstart(self):
+        """
+        Open report file.
+        """
+        os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+
+        # Terminate incomplete record left by an interrupted run
+        terminate = False
+        if os.path.exists(self.filepath) and os.path.getsize(self.filepath):
+            with open(self.filepath, "rb") as fh:
+                fh.seek(-1, os.SEEK_END)
+                terminate = fh.read(1) != b"\n"
+
+        self._fh = open(self.filepath, "a", encoding="utf-8")
+        if terminate:
+            self._fh.write("\n")
+
+    def pytest_sessionfinish(self):
+        """
+        Close report file.
+        """
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config, items):
+        """
+        Map checks to hosts and deselect checks completed by a previous run.
+        """
+        for item in items:
+            callspec = getattr(item, "callspec", None)
+            host = callspec.params.get("_nectl_host") if callspec else None
+            if host is not None:
+                self._hosts[item.nodeid] = host.id
+
+        if not self._completed:
+            return
+
+        deselected = [item for item in items if item.nodeid in self._completed]
+        if deselected:
+            logger.info(f"resuming checks run skipping {len(deselected)} completed")
+            items[:] = [item for item in items if item.nodeid not in self._completed]
+            config.hook.pytest_deselected(items=deselected)
+
+    def pytest_collectreport(self, report):
+        """
+        Write record for modules and classes that failed or skipped collection.
+        """
+        if report.passed:
+            return
+        message, details = _get_message(report)
+        self._write(
+            {
+                "nodeid": report.nodeid,
+                "host": None,
+                "outcome": "skipped" if report.skipped else "error",
+                "when": "collect",
+                "duration": 0.0,
+                "message": message,
+                "details": details,
+            }
+        )
+
+    def pytest_runtest_logreport(self, report):
+        """
+        Write record once check teardown has finished.
+        """
+        record = self._pending.setdefault(
+            report.nodeid,
+            {
+                "nodeid": report.nodeid,
+                "host": self._hosts.get(report.nodeid),
+                "outcome": "passed",
+                "when": "call",
+                "duration": 0.0,
+                "message": "",
+                "details": "",
+            },
+        )
+        record["duration"] += report.duration
+
+        if record["outcome"] == "passed" and not report.passed:
+            if report.skipped:
+                record["outcome"] = "skipped"
+            elif report.when == "call":
+                record["outcome"] = "failed"
+            else:
+                record["outcome"] = "error"
+            record["when"] = report.when
+            record["message"], record["details"] = _get_message(report)
+
+        if report.when == "teardown":
+            record["duration"] = round(record["duration"], 6)
+            self._write(self._pending.pop(report.nodeid))
+
+    def _write(self, record: Dict) -> None:
+        """
+        Write record and flush so that it is kept if the run is interrupted.
+        """
+        record["timestamp"] = time.time()
+        self._fh.write(json.dumps(record) + "\n")
+        self._fh.flush()
+
+
+def iter_report_records(filepath: str) -> Iterator[Dict]:
+    """
+    Yields records from a JSON lines report. An incomplete last line, which is
+    left when a run is killed while writing, is ignored.
+
+    Args:
+        filepath (str): JSON lines report file.
+
+    Yields:
+        Dict: report record.
+    """
+    try:
+        with open(filepath, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"ignoring incomplete record in: {filepath}")
+    except FileNotFoundError:
+        return
+
+
+def get_completed_checks(filepath: str) -> Set[str]:
+    """
+    Returns IDs of checks which have a final outcome in a JSON lines report.
+
+    Args:
+        filepath (str): JSON lines report file.
+
+    Returns:
+        Set[str]: completed check IDs.
+    """
+    return {
+        record["nodeid"]
+        for record in iter_report_records(filepath)
+        if record.get("when") != "collect" and record.get("outcome") in FINAL_OUTCOMES
+    }
+
+
+def get_shard_reports(filepath: str) -> List[str]:
+    """
+    Returns JSON lines reports written by worker processes for a report.
+
+    Args:
+        filepath (str): JSON lines report file.
+
+    Returns:
+        List[str]: shard report files.
+    """
+    return sorted(
+        f for f in glob(f"{escape(filepath)}.*") if f[len(filepath) + 1 :].isdigit()
+    )
+
+
+def merge_shard_reports(filepath: str) -> None:
+    """
+    Appends JSON lines reports written by worker processes to a report and
+    removes them. Complete lines are kept from reports of interrupted runs.
+
+    Args:
+        filepath (str): JSON lines report file.
+    """
+    shard_reports = get_shard_reports(filepath)
+    if not shard_reports:
+        return
+
+    with open(filepath, "a", encoding="utf-8") as fh:
+        for shard_report in shard_reports:
+            with open(shard_report, "r", encoding="utf-8") as shard_fh:
+                for line in shard_fh:
+                    if line.endswith("\n"):
+                        fh.write(line)
+            os.remove(shard_report)
+
+
+def _get_testcase(record: Dict) -> ElementTree.Element:
+    """
+    Returns junit xml testcase for a record using the same names as pytest.
+    """
+    parts = record["nodeid"].split("::")
+    path = parts[0][:-3] if parts[0].endswith(".py") else parts[0]
+    path = path.replace("/", ".")
+
+    testcase = ElementTree.Element(
+        "testcase",
+        classname=".".join([path] + parts[1:-1]) if len(parts) > 1 else "",
+        name=parts[-1] if len(parts) > 1 else path,
+        time=f"{record.get('duration', 0.0):0.3f}",
+    )
+
+    if record.get("host"):
+        properties = ElementTree.SubElement(testcase, "properties")
+        ElementTree.SubElement(
+            properties, "property", name="host", value=record["host"]
+        )
+
+    tag = {"failed": "failure", "error": "error", "skipped": "skipped"}.get(
+        record["outcome"]
+    )
+    if tag:
+        result = ElementTree.SubElement(
+            testcase, tag, message=record.get("message", "")
+        )
+        result.text = record.get("details") or record.get("message", "")
+
+    return testcase
+
+
+def write_junit_report(filepath: str, junit_filepath: str) -> Tuple[int, int]:
+    """
+    Writes junit xml report from a JSON lines report one check at a time.
+
+    Modules and classes are skipped during collection in a worker when none of
+    its hosts match a check filter, so these are only kept when no checks in
+    the module or class ran.
+
+    Args:
+        filepath (str): JSON lines report file.
+        junit_filepath (str): junit xml report file.
+
+    Returns:
+        Tuple[int, int]: passed and failed totals.
+    """
+    ts_start = time.perf_counter()
+    counts = {"passed": 0, "failed": 0, "skipped": 0, "error": 0}
+    prefixes: Set[str] = set()
+    unmatched: Dict[str, Dict] = {}
+    duration = 0.0
+
+    # First pass to calculate totals for test suite
+    for record in iter_report_records(filepath):
+        if record["when"] == "collect" and NO_HOSTS_MATCHED_MESSAGE in record.get(
+            "message", ""
+        ):
+            unmatched.setdefault(record["nodeid"], record)
+            continue
+        counts[record["outcome"]] += 1
+        duration += record.get("duration", 0.0)
+        parts = record["nodeid"].split("::")
+        prefixes.update("::".join(parts[:i]) for i in range(1, len(parts)))
+
+    unmatched = {k: v for k, v in unmatched.items() if k not in prefixes}
+    counts["skipped"] += len(unmatched)
+
+    # Second pass to write test cases
+    with open(junit_filepath, "w", encoding="utf-8") as fh:
+        fh.write('<?xml version="1.0" encoding="utf-8"?>\n<testsuites>')
+        fh.write(
+            f'<testsuite name="pytest" errors="{counts["error"]}" '
+            f'failures="{counts["failed"]}" skipped="{counts["skipped"]}" '
+            f'tests="{sum(counts.values())}" time="{duration:0.3f}">'
+        )
+        for record in iter_report_records(filepath):
+            if record["when"] == "collect" and NO_HOSTS_MATCHED_MESSAGE in record.get(
+                "message", ""
+            ):
+                continue
+            fh.write(ElementTree.tostring(_get_testcase(record), encoding="unicode"))
+        for record in unmatched.values():
+            fh.write(ElementTree.tostring(_get_testcase(record), encoding="unicode"))
+        fh.write("</testsuite></testsuites>\n")
+
+    dur = f"{time.perf_counter()-ts_start:0.4f}"
+    logger.debug(f"junit report written to file: {junit_filepath} ({dur}s)")
+
+    return counts["passed"], counts["failed"]
@@ -0,0 +1,122 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Checks runner functions used to run checks in parallel worker processes.
+"""
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+
+from ..logging import get_logger
+from ..datatree.hosts import Host
+from .plugins import ChecksPlugin
+from .reports import ChecksReporter, merge_shard_reports
+
+# pytest exit code when no tests are collected which happens when no host in a
+# shard matches any of the check filters or all checks completed before resuming.
+PYTEST_NO_TESTS_COLLECTED = 5
+
+logger = get_logger()
+
+
+def run_checks_shard(
+    hosts: List[Host],
+    pytest_args: List[str],
+    stream_filepath: str,
+    plugin_options: Optional[Dict[str, Any]] = None,
+    completed: Optional[Set[str]] = None,
+) -> Tuple[int, Dict[str, Dict]]:
+    """
+    Runs checks for a shard of hosts. This is run inside a worker process.
+
+    Args:
+        hosts (List[Host]): hosts in shard.
+        pytest_args (List[str]): pytest arguments.
+        stream_filepath (str): JSON lines report file for shard.
+        plugin_options (Dict[str, Any]): extra checks plugin arguments.
+        completed (Set[str]): IDs of checks to skip when resuming.
+
+    Returns:
+        Tuple[int, Dict[str, Dict]]: pytest return code and check results.
+    """
+    checks_plugin = ChecksPlugin(hosts=hosts, **(plugin_options or {}))
+    reporter = ChecksReporter(filepath=stream_filepath, completed=completed)
+
+    rc = pytest.main(pytest_args, plugins=[checks_plugin, reporter])
+
+    return (int(rc), checks_plugin.results)
+
+
+def run_checks_parallel(
+    hosts: List[Host],
+    pytest_args: List[str],
+    stream_filepath: str,
+    workers: int,
+    plugin_options: Optional[Dict[str, Any]] = None,
+    completed: Optional[Set[str]] = None,
+) -> Tuple[int, Dict[str, Dict]]:
+    """
+    Runs checks with hosts sharded across worker processes. All checks for a
+    host run in the same worker and shard reports are appended to the JSON
+    lines report when all workers have finished.
+
+    Args:
+        hosts (List[Host]): hosts to check.
+        pytest_args (List[str]): pytest arguments.
+        stream_filepath (str): JSON lines report file.
+        workers (int): total worker processes.
+        plugin_options (Dict[str, Any]): extra checks plugin arguments.
+        completed (Set[str]): IDs of checks to skip when resuming.
+
+    Returns:
+        Tuple[int, Dict[str, Dict]]: highest pytest return code of shards which
+            collected checks, or no tests collected code if none did, and check
+            results.
+    """
+    total_shards = max(1, min(workers, len(hosts)))
+    shards = [hosts[i::total_shards] for i in range(total_shards)]
+    shard_reports = [f"{stream_filepath}.{i}" for i in range(total_shards)]
+
+    ts_start = time.perf_counter()
+    logger.debug(f"starting checks on {total_shards} workers")
+
+    with ProcessPoolExecutor(max_workers=total_shards) as executor:
+        results = list(
+            executor.map(
+                run_checks_shard,
+                shards,
+                [pytest_args] * total_shards,
+                shard_reports,
+                [plugin_options] * total_shards,
+                [completed] * total_shards,
+            )
+        )
+
+    merge_shard_reports(stream_filepath)
+
+    dur = f"{time.perf_counter()-ts_start:0.4f}"
+    logger.info(f"finished checks on {total_shards} workers ({dur}s)")
+
+    # Shards whose hosts match no checks are ignored unless all shards are empty
+    rcs = [rc for rc, _ in results if rc != PYTEST_NO_TESTS_COLLECTED]
+
+    return (
+        max(rcs) if rcs else PYTEST_NO_TESTS_COLLECTED,
+        {k: v for _, shard_results in results for k, v in shard_results.items()},
+    )
@@ -0,0 +1,189 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Driver session pool used to share host connections between checks.
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from ..logging import get_logger
+from ..settings import Settings
+from ..exceptions import DriverError, DriverNotFoundError
+from ..datatree.hosts import Host
+from ..configs.drivers import get_driver
+from ..configs.drivers.basedriver import BaseDriver
+
+logger = get_logger()
+
+
+class DriverSessionPool:
+    """
+    Pool of open driver sessions with one session per host. Sessions are
+    opened the first time a host is requested and kept open so that all checks
+    for a host share one connection. When the pool is full the least recently
+    used session is closed.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        max_sessions: int = 10,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        ssh_private_key_file: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            settings (Settings): config settings.
+            max_sessions (int): maximum sessions open at the same time.
+            username (str): override host username.
+            password (str): override host password.
+            ssh_private_key_file (str): override ssh private key file.
+        """
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+
+        self.settings = settings
+        self.max_sessions = max_sessions
+        self.username = username
+        self.password = password
+        self.ssh_private_key_file = ssh_private_key_file
+        self._sessions: "OrderedDict[str, BaseDriver]" = OrderedDict()
+        self._pending: Dict[str, threading.Event] = {}
+        self._errors: Dict[str, DriverError] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, host: Host) -> BaseDriver:
+        """
+        Returns an open driver session for host, opening one if required.
+
+        A host which fails to connect is not retried so that remaining checks
+        for the host fail quickly. Connections are opened outside the pool lock
+        so hosts connect at the same time, and callers for a host which is
+        connecting wait for that connection.
+
+        Args:
+            host (Host): host to get session for.
+
+        Returns:
+            BaseDriver: connected driver.
+
+        Raises:
+            DriverError: if a session cannot be opened for host.
+        """
+        while True:
+            with self._lock:
+                if host.id in self._sessions:
+                    self._sessions.move_to_end(host.id)
+                    return self._sessions[host.id]
+
+                if host.id in self._errors:
+                    raise self._errors[host.id]
+
+                pending = self._pending.get(host.id)
+                if pending is None:
+                    # Make room for the new session including other pending ones
+                    evicted = []
+                    while (
+                        self._sessions
+                        and len(self._sessions) + len(self._pending)
+                        >= self.max_sessions
+                    ):
+                        evicted.append(self._sessions.popitem(last=False))
+                    self._pending[host.id] = threading.Event()
+                    break
+
+            # Wait for another caller to open the session for host
+            pending.wait()
+
+        for host_id, session in evicted:
+            self._close(host_id, session)
+
+        try:
+            session = self._open(host)
+        except DriverError as e:
+            with self._lock:
+                self._errors[host.id] = e
+            raise
+        else:
+            with self._lock:
+                self._sessions[host.id] = session
+            return session
+        finally:
+            with self._lock:
+                self._pending.pop(host.id).set()
+
+    def close_all(self) -> None:
+        """
+        Closes all open sessions.
+        """
+        with self._lock:
+            sessions = list(self._sessions.items())
+            self._sessions.clear()
+
+        for host_id, session in sessions:
+            self._close(host_id, session)
+
+    def _open(self, host: Host) -> BaseDriver:
+        """
+        Returns connected driver for host.
+        """
+        if not host.os_name or not host.mgmt_ip:
+            raise DriverError(f"[{host.id}] missing 'os_name' or 'mgmt_ip'")
+
+        ts_start = time.perf_counter()
+
+        try:
+            driver = get_driver(settings=self.settings, os_name=host.os_name)(
+                host=host,
+                username=self.username if self.username else host.username,
+                password=self.password if self.password else host.password,
+                ssh_private_key_file=self.ssh_private_key_file,
+            )
+            session = driver.__enter__()
+            try:
+                session.start_keepalive(self.settings.checks_keepalive)
+            except Exception:
+                session.__exit__(None, None, None)
+                raise
+        except DriverNotFoundError as e:
+            raise DriverError(f"[{host.id}] {e}") from e
+        except DriverError:
+            raise
+        except Exception as e:
+            raise DriverError(f"[{host.id}] failed to open session: {e}") from e
+
+        dur = f"{time.perf_counter()-ts_start:0.4f}"
+        logger.info(f"[{host.id}] opened driver session ({dur}s)")
+
+        return session
+
+    def _close(self, host_id: str, session: BaseDriver) -> None:
+        """
+        Closes session for host which has been removed from pool.
+        """
+        try:
+            session.__exit__(None, None, None)
+            logger.info(f"[{host_id}] closed driver session")
+        except Exception as e:  # pylint: disable=W0703
+            logger.warning(f"[{host_id}] error closing driver session: {e}")
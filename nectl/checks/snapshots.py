@@ -0,0 +1,201 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Device state snapshots which are collected once per host and used by checks.
+"""
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from ..logging import get_logger
+from ..settings import Settings
+from ..exceptions import DriverError, DriverNotFoundError
+from ..datatree.hosts import Host
+from ..configs.drivers import get_driver
+
+SNAPSHOTS_DIRNAME = "snapshots"
+logger = get_logger()
+
+
+def get_snapshot_filepath(settings: Settings, host: Host) -> str:
+    """
+    Returns path to host snapshot file.
+
+    Args:
+        settings (Settings): config settings.
+        host (Host): host instance.
+
+    Returns:
+        str: snapshot file path.
+    """
+    return os.path.join(settings.cache_path, SNAPSHOTS_DIRNAME, f"{host.id}.json")
+
+
+def load_snapshot(
+    settings: Settings,
+    host: Host,
+    getters: Optional[List[str]] = None,
+    ttl: Optional[int] = None,
+) -> Optional[Dict]:
+    """
+    Returns host snapshot from cache.
+
+    Args:
+        settings (Settings): config settings.
+        host (Host): host instance.
+        getters (List[str]): getters that the snapshot must contain.
+        ttl (int): maximum age of snapshot in seconds, no limit if None.
+
+    Returns:
+        Optional[Dict]: snapshot, or None if not found, too old or incomplete.
+    """
+    try:
+        with open(get_snapshot_filepath(settings, host), "r", encoding="utf-8") as fh:
+            snapshot = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if ttl is not None and time.time() - snapshot.get("timestamp", 0) > ttl:
+        logger.debug(f"[{host.id}] snapshot expired")
+        return None
+
+    if getters and not set(getters).issubset(snapshot.get("state", {})):
+        logger.debug(f"[{host.id}] snapshot missing getters")
+        return None
+
+    return snapshot
+
+
+def collect_snapshot(
+    settings: Settings,
+    host: Host,
+    getters: List[str],
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    ssh_private_key_file: Optional[str] = None,
+) -> Dict:
+    """
+    Collects state from host and writes snapshot to cache.
+
+    Args:
+        settings (Settings): config settings.
+        host (Host): host instance.
+        getters (List[str]): names of state getters.
+        username (str): override host username.
+        password (str): override host password.
+        ssh_private_key_file (str): override ssh private key file.
+
+    Returns:
+        Dict: snapshot.
+
+    Raises:
+        DriverError: if state cannot be collected from host.
+    """
+    if not host.os_name or not host.mgmt_ip:
+        raise DriverError("missing 'os_name' or 'mgmt_ip'")
+
+    ts_start = time.perf_counter()
+
+    try:
+        driver = get_driver(settings=settings, os_name=host.os_name)(
+            host=host,
+            username=username if username else host.username,
+            password=password if password else host.password,
+            ssh_private_key_file=ssh_private_key_file,
+        )
+    except DriverNotFoundError as e:
+        raise DriverError(str(e)) from e
+
+    with driver as con:
+        state = con.get_state(getters)
+
+    snapshot = {"host": host.id, "timestamp": time.time(), "state": state}
+
+    filepath = get_snapshot_filepath(settings, host)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, "w", encoding="utf-8") as fh:
+        json.dump(snapshot, fh, default=str)
+
+    dur = f"{time.perf_counter()-ts_start:0.4f}"
+    logger.info(f"[{host.id}] collected snapshot ({dur}s)")
+
+    return snapshot
+
+
+def collect_snapshots(
+    settings: Settings,
+    hosts: List[Host],
+    workers: int,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    ssh_private_key_file: Optional[str] = None,
+) -> int:
+    """
+    Collects snapshots in parallel for hosts which do not have a valid snapshot
+    in cache.
+
+    Args:
+        settings (Settings): config settings.
+        hosts (List[Host]): hosts to collect snapshots for.
+        workers (int): total hosts to collect from at the same time.
+        username (str): override host username.
+        password (str): override host password.
+        ssh_private_key_file (str): override ssh private key file.
+
+    Returns:
+        int: total errors.
+    """
+    getters = settings.checks_state_getters
+    stale = [
+        host
+        for host in hosts
+        if load_snapshot(settings, host, getters, settings.checks_state_ttl)
+        is None
+    ]
+
+    ts_start = time.perf_counter()
+    logger.debug(f"start collecting snapshots for {len(stale)} hosts")
+
+    def _collect(host: Host) -> Optional[Dict]:
+        try:
+            return collect_snapshot(
+                settings=settings,
+                host=host,
+                getters=getters,
+                username=username,
+                password=password,
+                ssh_private_key_file=ssh_private_key_file,
+            )
+        except Exception as e:  # pylint: disable=W0703
+            logger.error(f"[{host.id}] failed to collect snapshot: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(_collect, stale))
+
+    errors = sum(1 for result in results if result is None)
+
+    dur = f"{time.perf_counter()-ts_start:0.4f}"
+    logger.info(
+        f"finished collecting snapshots for {len(stale)} hosts "
+        f"errors={errors} cached={len(hosts) - len(stale)} ({dur}s)"
+    )
+
+    return errors
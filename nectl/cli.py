@@ -15,10 +15,12 @@
 # You should have received a copy of the GNU General Public License
 # along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
 import sys
 import click
 
 from .logging import logging_opts
+from .metrics import FileSink, add_sink, remove_sink
 from .exceptions import SettingsFileError
 from .settings import APP_VERSION, APP_DESCRIPTION, get_settings
 from .datatree.cli import datatree
@@ -48,6 +50,12 @@ def cli_root(ctx):
         print(f"Error: {e}")
         sys.exit(1)
 
+    # Append metrics to file until command has finished
+    if settings.metrics_filename:
+        sink = FileSink(os.path.join(settings.kit_path, settings.metrics_filename))
+        add_sink(sink)
+        ctx.call_on_close(lambda: remove_sink(sink))
+
     # Set context for child commands
     ctx.obj = {"settings": settings}
 
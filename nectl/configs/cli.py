@@ -25,8 +25,12 @@ from ..exceptions import (
     DiscoveryError,
     RenderError,
     DriverError,
+    RolloutHaltedError,
 )
+from .profiler import RenderProfiler, get_profile_filepath
+from .store import ConfigStore
 
+PROFILE_TABLE_LIMIT = 20
 logger = get_logger()
 
 
@@ -44,14 +48,26 @@ def configs():
 @click.option("-s", "--site", help="Filter by site.")
 @click.option("-r", "--role", help="Filter by role.")
 @click.option("-d", "--deployment-group", help="Filter by deployment group.")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Record render time and output size of each template section.",
+)
 @click.pass_context
 @logging_opts
 def render_cmd(
-    ctx, hostname: str, customer: str, site: str, role: str, deployment_group: str
+    ctx,
+    hostname: str,
+    customer: str,
+    site: str,
+    role: str,
+    deployment_group: str,
+    profile: bool,
 ):
     """
     Use this command to render configurations for hosts.
     """
+    profiler = RenderProfiler() if profile else None
     try:
         nectl = Nectl(settings=ctx.obj["settings"])
         hosts = nectl.get_hosts(
@@ -61,13 +77,19 @@ def render_cmd(
             role=role,
             deployment_group=deployment_group,
         )
-        nectl.render_configs(hosts=hosts.values())
+        nectl.render_configs(hosts=hosts.values(), profiler=profiler)
     except (DiscoveryError, RenderError) as e:
         print(f"Error: {e}")
         sys.exit(1)
 
     print(f"{len(hosts)} configs created.")
 
+    if profiler is not None:
+        profile_filepath = get_profile_filepath(nectl.settings)
+        profiler.write_json(profile_filepath)
+        print(f"\n{profiler.format_table(limit=PROFILE_TABLE_LIMIT)}")
+        print(f"\nrender profile written to: {profile_filepath}")
+
 
 @configs.command(name="diff", help="Compare active configs to rendered configs.")
 @click.option("-h", "--hostname", help="Filter by hostname.")
@@ -78,6 +100,23 @@ def render_cmd(
 @click.option("-u", "--username", help="Host driver username.")
 @click.option("-p", "--password", help="Host driver password.")
 @click.option("-i", "--ssh-key", help="Host driver SSH private key file.")
+@click.option(
+    "--cache",
+    is_flag=True,
+    help="Use cached results for hosts which have not changed since the last run.",
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    help="Compare with active config backups instead of connecting to hosts.",
+)
+@click.option(
+    "-w",
+    "--workers",
+    help="Total hosts to compare at the same time.",
+    type=click.IntRange(min=1),
+    default=1,
+)
 @click.pass_context
 @logging_opts
 def diff_cmd(
@@ -90,6 +129,9 @@ def diff_cmd(
     username: str,
     password: str,
     ssh_key: str,
+    cache: bool,
+    offline: bool,
+    workers: int,
 ):
     """
     Use this command to compare staged and active configurations on hosts.
@@ -108,6 +150,9 @@ def diff_cmd(
             username=username,
             password=password,
             ssh_private_key_file=ssh_key,
+            offline=offline,
+            workers=workers,
+            use_cache=cache,
         )
     except (DiscoveryError, DriverError) as e:
         print(f"Error: {e}")
@@ -116,6 +161,22 @@ def diff_cmd(
     print(f"{len(next(os.walk(diff_dir))[2])} config diffs created.")
 
 
+@configs.command(name="diff-report", help="Group hosts with the same config diff.")
+@click.pass_context
+@logging_opts
+def diff_report_cmd(ctx):
+    """
+    Use this command to write a report with each distinct diff once and its hosts.
+    """
+    groups, report_filepath = Nectl(settings=ctx.obj["settings"]).report_diffs()
+
+    print(
+        f"{sum(len(g.hosts) for g in groups)} config diffs grouped "
+        f"into {len(groups)} distinct diffs."
+    )
+    print(f"diff report written to: {report_filepath}")
+
+
 @configs.command(name="apply", help="Apply staged config onto host.")
 @click.option("-h", "--hostname", help="Filter by hostname.")
 @click.option("-c", "--customer", help="Filter by customer.")
@@ -125,6 +186,29 @@ def diff_cmd(
 @click.option("-u", "--username", help="Host driver username.")
 @click.option("-p", "--password", help="Host driver password.")
 @click.option("-i", "--ssh-key", help="Host driver SSH private key file.")
+@click.option(
+    "-w",
+    "--workers",
+    help="Total hosts to apply config on at the same time.",
+    type=click.IntRange(min=1),
+    default=1,
+)
+@click.option(
+    "--waves",
+    is_flag=True,
+    help="Apply config one deployment group at a time and halt on errors.",
+)
+@click.option(
+    "--max-error-rate",
+    help="Fraction of hosts in a wave that can fail before halting.",
+    type=click.FloatRange(min=0, max=1),
+)
+@click.option(
+    "--checks",
+    is_flag=True,
+    help="Run checks on hosts after each wave and halt on failures.",
+)
+@click.option("-k", "--pytest-expression", help="Only run checks matching expression.")
 @click.option(
     "-y",
     "--assumeyes",
@@ -143,11 +227,25 @@ def apply_cmd(
     username: str,
     password: str,
     ssh_key: str,
+    workers: int,
+    waves: bool,
+    max_error_rate: float,
+    checks: bool,
+    pytest_expression: str,
     assumeyes: bool = False,
 ):
     """
     Use this command to apply staged configurations onto hosts.
     """
+    wave_opts = {
+        "--max-error-rate": max_error_rate is not None,
+        "--checks": checks,
+        "-k": pytest_expression is not None,
+    }
+    if not waves and any(wave_opts.values()):
+        opts = ", ".join(opt for opt, used in wave_opts.items() if used)
+        raise click.UsageError(f"{opts} can only be used with --waves")
+
     try:
         nectl = Nectl(settings=ctx.obj["settings"])
         hosts = nectl.get_hosts(
@@ -167,13 +265,28 @@ def apply_cmd(
                 abort=True,
             )
 
-        diff_dir = nectl.apply_configs(
-            hosts=hosts.values(),
-            username=username,
-            password=password,
-            ssh_private_key_file=ssh_key,
-        )
-    except (DiscoveryError, DriverError) as e:
+        if waves:
+            summary = nectl.rollout_configs(
+                hosts=hosts.values(),
+                username=username,
+                password=password,
+                ssh_private_key_file=ssh_key,
+                workers=workers,
+                max_error_rate=max_error_rate,
+                checks=checks,
+                pytest_expression=pytest_expression,
+            )
+            print(f"{len(summary)} waves applied.")
+            diff_dir = f"{nectl.settings.kit_path}/{nectl.settings.config_diffs_dir}"
+        else:
+            diff_dir = nectl.apply_configs(
+                hosts=hosts.values(),
+                username=username,
+                password=password,
+                ssh_private_key_file=ssh_key,
+                workers=workers,
+            )
+    except (DiscoveryError, DriverError, RolloutHaltedError) as e:
         print(f"Error: {e}")
         sys.exit(1)
 
@@ -189,6 +302,18 @@ def apply_cmd(
 @click.option("-u", "--username", help="Host driver username.")
 @click.option("-p", "--password", help="Host driver password.")
 @click.option("-i", "--ssh-key", help="Host driver SSH private key file.")
+@click.option(
+    "--cache",
+    is_flag=True,
+    help="Use cached results for hosts which have not changed since the last run.",
+)
+@click.option(
+    "-w",
+    "--workers",
+    help="Total hosts to get config from at the same time.",
+    type=click.IntRange(min=1),
+    default=1,
+)
 @click.pass_context
 @logging_opts
 def get_cmd(
@@ -201,6 +326,8 @@ def get_cmd(
     username: str,
     password: str,
     ssh_key: str,
+    cache: bool,
+    workers: int,
 ):
     """
     Use this command to get active configurations from hosts.
@@ -219,9 +346,50 @@ def get_cmd(
             username=username,
             password=password,
             ssh_private_key_file=ssh_key,
+            use_cache=cache,
+            workers=workers,
         )
     except (DiscoveryError, DriverError) as e:
         print(f"Error: {e}")
         sys.exit(1)
 
     print(f"{len(hosts)} config backups created.")
+
+
+@configs.command(name="history", help="Show configs kept by previous runs.")
+@click.option(
+    "-k",
+    "--kind",
+    help="Filter runs by kind of config.",
+    type=click.Choice(["staged", "active", "diffs"]),
+)
+@click.option("--run", "run_id", help="Run ID to show hosts for.")
+@click.option("--host", "host_id", help="Host ID to show config for in run.")
+@click.pass_context
+@logging_opts
+def history_cmd(ctx, kind: str, run_id: str, host_id: str):
+    """
+    Use this command to list runs, hosts in a run or a host config from a run.
+    """
+    store = ConfigStore(ctx.obj["settings"])
+
+    if not run_id:
+        for run in store.list_runs(kind=kind):
+            print(run)
+        return
+
+    try:
+        if not host_id:
+            for run_host_id, digest in store.get_run(run_id)["hosts"].items():
+                print(f"{run_host_id} {digest[:12] if digest else '(empty)'}")
+            return
+        config = store.get_config(run_id=run_id, host_id=host_id)
+    except FileNotFoundError:
+        print(f"Error: run not found: {run_id}")
+        sys.exit(1)
+
+    if config is None:
+        print(f"Error: host '{host_id}' not found in run: {run_id}")
+        sys.exit(1)
+
+    print(config)
@@ -0,0 +1,398 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Offline config diffs which compare staged configs to active config backups
+without connecting to hosts.
+
+Configs are split into leaf statements with the path of parent statements so
+that the order of sections does not cause a diff. Blocks where order changes
+behaviour, such as firewall filter terms and access list entries, are compared
+in order. Three formats are detected:
+
+- 'set': Junos set commands, e.g. 'set system host-name r1'.
+- 'curly': Junos curly braces, e.g. 'system { host-name r1; }'.
+- 'indented': EOS and IOS style indented sections.
+
+Diff files written for many hosts are grouped by hashing each normalized diff,
+so a report holds one copy of each distinct change with the hosts it is for.
+"""
+import os
+import re
+import time
+import hashlib
+from glob import glob, escape
+from collections import Counter
+from difflib import SequenceMatcher
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+
+from ..logging import get_logger
+from ..settings import Settings
+from ..datatree.hosts import Host
+
+ConfigFormat = Literal["set", "curly", "indented"]
+Statement = Tuple[str, ...]  # parent statements followed by leaf statement
+DIFF_IGNORE_REGEX = (
+    r"^(---|\+\+\+) ",  # unified diff file headers
+    r"^[#!]",  # comments such as last commit timestamps
+)
+DIFF_HUNK_REGEX = r"^@@ .* @@"
+ORDERED_BLOCK_REGEX = (
+    r"^(.*? )?(filter|policy-statement) \S+",  # Junos filter and policy terms
+    r"^(ip|ipv6|mac) access-list .*",  # IOS and EOS access list entries
+)
+logger = get_logger()
+
+
+def detect_config_format(config: str) -> ConfigFormat:
+    """
+    Returns format of config.
+
+    Args:
+        config (str): config text.
+
+    Returns:
+        str: 'set', 'curly' or 'indented'.
+    """
+    for line in config.splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#", "!", "/*")):
+            continue
+        if line.startswith(("set ", "delete ", "deactivate ")):
+            return "set"
+        if line.endswith("{"):
+            return "curly"
+    return "indented"
+
+
+def _parse_curly(config: str) -> List[Statement]:
+    statements: List[Statement] = []
+    parents: List[str] = []
+    for line in config.splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#", "/*")):
+            continue
+        if line == "}":
+            if parents:
+                parents.pop()
+        elif line.endswith("{"):
+            parents.append(line[:-1].rstrip())
+        else:
+            statements.append((*parents, line))
+    return statements
+
+
+def _parse_indented(config: str) -> List[Statement]:
+    nodes: List[Statement] = []
+    stack: List[Tuple[int, str]] = []
+    for raw_line in config.splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith("!") or line == "end":
+            continue
+        indent = len(raw_line) - len(raw_line.lstrip())
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        nodes.append((*[text for _, text in stack], line))
+        stack.append((indent, line))
+
+    # Sections are context for their statements so only leaves are kept
+    parents = {node[:-1] for node in nodes}
+    return [node for node in nodes if node not in parents]
+
+
+def parse_config(config: str, config_format: ConfigFormat) -> List[Statement]:
+    """
+    Returns leaf statements of config in order.
+
+    Args:
+        config (str): config text.
+        config_format (str): config format.
+
+    Returns:
+        List[Tuple[str, ...]]: parent statements followed by leaf statement.
+    """
+    if config_format == "set":
+        return [
+            (line.strip(),)
+            for line in config.splitlines()
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+    if config_format == "curly":
+        return _parse_curly(config)
+    return _parse_indented(config)
+
+
+def _get_ordered_block(statement: Statement) -> Optional[Statement]:
+    """
+    Returns path of the order sensitive block which statement is in, or None.
+    """
+    for i, part in enumerate(statement[:-1] or statement):
+        for regex in ORDERED_BLOCK_REGEX:
+            match = re.match(regex, part)
+            if match:
+                return (*statement[:i], match.group(0))
+    return None
+
+
+def _diff_statements(
+    left: List[Statement], right: List[Statement]
+) -> Tuple[List[Statement], List[Statement]]:
+    """
+    Returns statements removed from left and added in right. Statements in
+    order sensitive blocks are compared in order and others in any order.
+    """
+    blocks: Dict[Statement, Tuple[List[Statement], List[Statement]]] = {}
+    unordered: Tuple[List[Statement], List[Statement]] = ([], [])
+    for side, statements in enumerate((left, right)):
+        for statement in statements:
+            block = _get_ordered_block(statement)
+            target = unordered if block is None else blocks.setdefault(block, ([], []))
+            target[side].append(statement)
+
+    removed = _subtract(*unordered)
+    added = _subtract(*reversed(unordered))
+    for block_left, block_right in blocks.values():
+        matcher = SequenceMatcher(a=block_left, b=block_right, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != "equal":
+                removed.extend(block_left[i1:i2])
+                added.extend(block_right[j1:j2])
+    return removed, added
+
+
+def _subtract(left: List[Statement], right: List[Statement]) -> List[Statement]:
+    """
+    Returns statements in left which are not in right keeping left order.
+    """
+    remaining = Counter(right)
+    result = []
+    for statement in left:
+        if remaining[statement]:
+            remaining[statement] -= 1
+        else:
+            result.append(statement)
+    return result
+
+
+def _format_diff(
+    removed: List[Statement], added: List[Statement], config_format: ConfigFormat
+) -> str:
+    """
+    Returns diff text with changes grouped under their parent statements.
+    """
+    groups: Dict[Statement, List[Tuple[str, str]]] = {}
+    for sign, statements in (("-", removed), ("+", added)):
+        for statement in statements:
+            groups.setdefault(statement[:-1], []).append((sign, statement[-1]))
+
+    lines = []
+    for parents, changes in groups.items():
+        if config_format == "set":
+            lines.extend(f"{sign} {leaf}" for sign, leaf in changes)
+        elif config_format == "curly":
+            lines.append(f"[edit {' '.join(parents)}]" if parents else "[edit]")
+            lines.extend(f"{sign}   {leaf}" for sign, leaf in changes)
+        else:
+            lines.extend(f"  {'   ' * i}{parent}" for i, parent in enumerate(parents))
+            indent = "   " * len(parents)
+            lines.extend(f"{sign} {indent}{leaf}" for sign, leaf in changes)
+    return "\n".join(lines)
+
+
+def diff_configs(active: str, staged: str) -> str:
+    """
+    Returns diff between active and staged config. The format is detected
+    from the staged config.
+
+    Args:
+        active (str): active config text.
+        staged (str): staged config text.
+
+    Returns:
+        str: diff, or empty string if configs match.
+    """
+    config_format = detect_config_format(staged or active)
+    removed, added = _diff_statements(
+        parse_config(active, config_format), parse_config(staged, config_format)
+    )
+    return _format_diff(removed=removed, added=added, config_format=config_format)
+
+
+def _diff_files(task: Tuple[str, str, str]) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Returns host ID, diff and error for active and staged config files. This
+    is run inside a worker process.
+    """
+    host_id, active_filepath, staged_filepath = task
+    configs = []
+    for name, filepath in (("active", active_filepath), ("staged", staged_filepath)):
+        try:
+            with open(filepath, "r", encoding="utf-8") as fh:
+                configs.append(fh.read())
+        except FileNotFoundError:
+            return host_id, None, f"no {name} config found: {filepath}"
+    return host_id, diff_configs(active=configs[0], staged=configs[1]), None
+
+
+def diff_configs_offline(
+    settings: Settings, hosts: List[Host], workers: int = 1
+) -> Tuple[int, Dict[str, str]]:
+    """
+    Compares staged configs to active config backups for hosts.
+
+    Args:
+        settings (Settings): config settings.
+        hosts (List[Host]): hosts to compare configs for.
+        workers (int): total worker processes.
+
+    Returns:
+        Tuple(int, Dict[str, str]): total errors and dict with host.id and diff.
+    """
+    extension = settings.configs_file_extension
+    tasks = [
+        (
+            host.id,
+            f"{settings.kit_path}/{settings.active_configs_dir}/{host.id}.{extension}",
+            f"{settings.kit_path}/{settings.staged_configs_dir}/{host.id}.{extension}",
+        )
+        for host in hosts
+    ]
+    host_outputs = {}
+    errors = 0
+
+    ts_start = time.perf_counter()
+    logger.debug(f"start comparing {len(tasks)} host configurations offline")
+
+    if workers > 1 and len(tasks) > 1:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_diff_files, tasks, chunksize=chunksize))
+    else:
+        results = [_diff_files(task) for task in tasks]
+
+    for host_id, diff, error in results:
+        if error:
+            logger.error(f"[{host_id}] {error}")
+            errors += 1
+            continue
+        host_outputs[host_id] = diff
+
+    dur = f"{time.perf_counter()-ts_start:0.4f}"
+    logger.info(
+        f"finished comparing host configurations offline "
+        f"changed={sum(1 for d in host_outputs.values() if d)} errors={errors} ({dur}s)"
+    )
+
+    return errors, host_outputs
+
+
+@dataclass
+class DiffGroup:
+    """
+    Defines a distinct diff and the hosts it was found for.
+    """
+
+    digest: str
+    diff: str
+    hosts: List[str] = field(default_factory=list)
+
+
+def normalize_diff(diff: str) -> str:
+    """
+    Returns diff without text that differs between hosts for the same change,
+    such as file headers, timestamps, hunk line numbers and whitespace.
+
+    Args:
+        diff (str): diff text.
+
+    Returns:
+        str: normalized diff.
+    """
+    lines = []
+    for line in diff.splitlines():
+        line = line.rstrip()
+        if not line or any(re.match(regex, line) for regex in DIFF_IGNORE_REGEX):
+            continue
+        lines.append(re.sub(DIFF_HUNK_REGEX, "@@", line))
+    return "\n".join(lines)
+
+
+def group_diffs(diffs: Iterable[Tuple[str, str]]) -> List[DiffGroup]:
+    """
+    Groups hosts which have the same normalized diff. Diffs are compared by
+    hash so only one copy of each distinct diff is kept.
+
+    Args:
+        diffs (Iterable[Tuple[str, str]]): host.id and diff pairs.
+
+    Returns:
+        List[DiffGroup]: groups with most hosts first.
+    """
+    groups: Dict[str, DiffGroup] = {}
+    for host_id, diff in diffs:
+        normalized = normalize_diff(diff)
+        if not normalized:
+            continue
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        group = groups.get(digest)
+        if group is None:
+            group = groups[digest] = DiffGroup(digest=digest, diff=normalized)
+        group.hosts.append(host_id)
+
+    for group in groups.values():
+        group.hosts.sort()
+    return sorted(groups.values(), key=lambda g: (-len(g.hosts), g.hosts[0]))
+
+
+def iter_diff_files(diffs_dir: str, extension: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yields host.id and diff from diff files one at a time.
+
+    Args:
+        diffs_dir (str): directory with diff files.
+        extension (str): diff files extension.
+
+    Yields:
+        Tuple[str, str]: host.id and diff.
+    """
+    suffix = f".{extension}"
+    for filepath in sorted(glob(f"{escape(diffs_dir)}/*{suffix}")):
+        with open(filepath, "r", encoding="utf-8") as fh:
+            yield os.path.basename(filepath)[: -len(suffix)], fh.read()
+
+
+def write_diff_report(groups: List[DiffGroup], filepath: str) -> None:
+    """
+    Writes report with each distinct diff once followed by its hosts.
+
+    Args:
+        groups (List[DiffGroup]): grouped diffs.
+        filepath (str): report file.
+    """
+    total_hosts = sum(len(group.hosts) for group in groups)
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    with open(filepath, "w", encoding="utf-8") as fh:
+        fh.write(f"# {len(groups)} distinct diffs for {total_hosts} hosts\n")
+        for num, group in enumerate(groups, start=1):
+            fh.write(
+                f"\n## diff {num} ({group.digest[:12]}) {len(group.hosts)} hosts\n\n"
+            )
+            fh.write("\n".join(group.hosts))
+            fh.write(f"\n\n{group.diff}\n")
+    logger.debug(f"diff report written to file: {filepath}")
@@ -16,18 +16,25 @@
 # along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
 
 import time
+from contextlib import ExitStack, nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Type, Dict, Optional, Any, Literal
 
 from ...logging import get_logger
+from ...metrics import span, record_span, increment
 from ...settings import Settings
 from ...exceptions import (
     DriverNotFoundError,
+    DriverCircuitOpenError,
     DriverCommitDisconnectError,
     DriverError,
     DriverConfigLoadError,
 )
 from ..utils import write_configs_to_dir
-from .utils import load_drivers_from_kit
+from ..state import DeviceStateCache
+from ..limiter import SessionLimiter
+from ..resilience import CircuitBreaker, RetrySession
+from .registry import DriverRegistry
 from .basedriver import BaseDriver
 from .napalmdriver import NapalmDriver
 from ...datatree.hosts import Host
@@ -35,19 +42,17 @@ from ...datatree.hosts import Host
 logger = get_logger()
 
 
-class Drivers:
-    """
-    Map os_name to drivers.
-    """
-
-    core_drivers = {"junos": NapalmDriver, "eos": NapalmDriver}
-    kit_drivers: Optional[dict] = None
+registry = DriverRegistry(
+    core_drivers={"junos": NapalmDriver, "eos": NapalmDriver},
+    default_drivers={"napalm": NapalmDriver},
+)
 
 
 def get_driver(settings: Settings, os_name: str) -> Type[BaseDriver]:
     """
     Returns the driver from the supplied os_name if one can be found. Checks
-    drivers in kit followed by core drivers.
+    drivers in kit, followed by installed drivers and core drivers. Drivers
+    are resolved once for each os_name.
 
     Args:
         settings (Settings): config settings.
@@ -56,34 +61,135 @@ def get_driver(settings: Settings, os_name: str) -> Type[BaseDriver]:
     Returns:
         BaseDriver: driver object.
     """
-    if not Drivers.kit_drivers:
-        # Load kit drivers once
-        Drivers.kit_drivers = load_drivers_from_kit(settings)
-
-    # Lookup custom drivers in kit
-    logger.debug(f"checking kit drivers for os_name: {os_name}")
-    for driver_os_name, driver in Drivers.kit_drivers.items():
-        if os_name == driver_os_name:
-            return driver
-
-    # Lookup core drivers
-    logger.debug(f"checking core drivers for os_name: {os_name}")
-    for driver_os_name, driver in Drivers.core_drivers.items():
-        if os_name == driver_os_name:
-            return driver
-
-    # Use a default driver
-    logger.debug("checking if default driver is defined")
-    if settings.default_driver:
-        if settings.default_driver == "napalm":
-            return NapalmDriver
-
-        # Default driver does not exist
-        raise DriverNotFoundError(
-            f"no default driver found matching name: {settings.default_driver}"
+    return registry.get(settings=settings, os_name=os_name)
+
+
+def _run_driver_method_on_host(
+    settings: Settings,
+    host: Host,
+    method_name: str,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    ssh_private_key_file: Optional[str] = None,
+    state_cache: Optional[DeviceStateCache] = None,
+    limiter: Optional[SessionLimiter] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Runs driver method on a single host.
+
+    Returns:
+        Tuple(int, Dict[str, Any]): total errors and dict with host.id and output.
+    """
+    # Skip hosts with no os_name or mgmt_ip
+    if not host.os_name or not host.mgmt_ip:
+        logger.warning(f"[{host.id}] skipping due to missing 'os_name' or 'mgmt_ip'")
+        return 0, {}
+
+    # Create host driver
+    try:
+        driver = get_driver(settings=settings, os_name=host.os_name)(
+            host=host,
+            username=username if username else host.username,
+            password=password if password else host.password,
+            ssh_private_key_file=ssh_private_key_file,
+        )
+    except (DriverNotFoundError, DriverError) as e:
+        logger.error(f"[{host.id}] {e}")
+        increment("driver_errors", host=host.id, site=host.site)
+        return 1, {}  # skip host
+
+    # Prepare args
+    kwargs: Dict[str, Any] = {}
+    if method_name in ["compare_config", "apply_config"]:
+        kwargs["config_filepath"] = (
+            f"{settings.kit_path}/{settings.staged_configs_dir}/"
+            + f"{host.id}.{settings.configs_file_extension}"
         )
+    elif method_name == "get_config":
+        kwargs["format"] = settings.configs_format
+        kwargs["sanitized"] = settings.configs_sanitized
 
-    raise DriverNotFoundError(f"no driver found that matches os_name: {os_name}")
+    labels = {"host": host.id, "site": host.site, "os_name": host.os_name}
+    inputs = None
+    if state_cache is not None:
+        if method_name == "apply_config":
+            state_cache.discard(host.id)
+        else:
+            inputs = state_cache.get_inputs(host.id, method_name, kwargs)
+
+    # Use cached output without connecting when within ttl
+    if inputs is not None:
+        output = state_cache.get(host.id, method_name, inputs)
+        if output is not None:
+            logger.info(f"[{host.id}] using cached output skipping connection")
+            increment("state_cache_hits", **labels)
+            return 0, {host.id: output}
+
+    # Open connection to host when allowed by session limits
+    session = limiter.session(host.site) if limiter else nullcontext({})
+    # Hosts with no site do not share a circuit breaker
+    if host.site is None:
+        breaker = None
+
+    try:
+        if breaker is not None:
+            breaker.allow(host)  # fail fast when site is unreachable
+
+        with session as stats:
+            with ExitStack() as connection:
+                # Time connection including failed and timed out connections
+                ts_connect = time.perf_counter()
+                error = None
+                try:
+                    con = connection.enter_context(
+                        RetrySession(
+                            driver,
+                            host=host,
+                            retries=settings.connect_retries,
+                            backoff=settings.connect_backoff,
+                            breaker=breaker,
+                        )
+                    )
+                except Exception as e:
+                    error = type(e).__name__
+                    raise
+                finally:
+                    stats["latency"] = time.perf_counter() - ts_connect
+                    record_span("connect", stats["latency"], error=error, **labels)
+                logger.info(f"[{host.id}] opened connection to host")
+
+                # Use cached output when host has not changed
+                output, marker = None, None
+                if inputs is not None:
+                    marker = con.get_change_marker()
+                    output = state_cache.get(host.id, method_name, inputs, marker)
+                    if output is not None:
+                        logger.info(f"[{host.id}] host unchanged using cached output")
+                        increment("state_cache_hits", **labels)
+
+                # Run method with host and store output
+                if output is None:
+                    with span(method_name, **labels):
+                        output = getattr(con, method_name)(**kwargs)
+                    if inputs is not None:
+                        state_cache.set(host.id, method_name, inputs, marker, output)
+            logger.info(f"[{host.id}] closed connection to host")
+
+        # Return output results indexed by host id
+        return 0, {host.id: output}
+
+    except (DriverError, DriverConfigLoadError, DriverCommitDisconnectError) as e:
+        if isinstance(e, DriverCircuitOpenError):
+            logger.debug(f"[{host.id}] {e}")  # reported for site at end of run
+        else:
+            logger.error(f"[{host.id}] {e}")
+        increment("driver_errors", **labels)
+
+        if isinstance(e, DriverCommitDisconnectError):
+            # Return commit diff that caused disconnect
+            return 1, {host.id: e.diff}
+        return 1, {}
 
 
 def run_driver_method_on_hosts(
@@ -94,11 +200,23 @@ def run_driver_method_on_hosts(
     username: Optional[str] = None,
     password: Optional[str] = None,
     ssh_private_key_file: Optional[str] = None,
+    state_cache: Optional[DeviceStateCache] = None,
+    workers: int = 1,
 ) -> Tuple[int, Dict[str, Any]]:
     """
     Runs specified driver method on all supplied hosts. Driver method should be
     one of "compare_config", "apply_config" or "get_config".
 
+    When a state cache is supplied, results of hosts which report the same
+    change marker as the previous run are returned from the cache.
+
+    When 'adaptive_sessions' is enabled in settings, workers is the highest
+    number of open sessions and the number is adjusted globally and for each
+    site based on connect latency and overload errors.
+
+    Failed connections can be retried, and hosts at a site with too many
+    failed connections in a row can fail fast and are reported together.
+
     Args:
         settings (Settings): config settings.
         hosts (List[Host]): list of hosts to run method against.
@@ -107,6 +225,8 @@ def run_driver_method_on_hosts(
         username (str): override host username.
         password (str): override host password.
         ssh_private_key_file (str): override ssh private key file.
+        state_cache (DeviceStateCache): optional cache of previous results.
+        workers (int): total hosts to run method on at the same time.
 
     Returns:
         Tuple(int, Dict[str, Any]): total errors and dict with host.id and outputs.
@@ -114,59 +234,55 @@ def run_driver_method_on_hosts(
     host_outputs = {}
     errors = 0
 
+    host_kwargs = dict(
+        settings=settings,
+        method_name=method_name,
+        username=username,
+        password=password,
+        ssh_private_key_file=ssh_private_key_file,
+        state_cache=state_cache,
+        limiter=None,
+        breaker=None,
+    )
+    if settings.adaptive_sessions and workers > 1:
+        host_kwargs["limiter"] = SessionLimiter(
+            workers=workers,
+            site_max_sessions=settings.site_max_sessions,
+            latency_threshold=settings.session_latency_limit,
+        )
+    if settings.site_failure_limit > 0 and any(h.site for h in hosts):
+        host_kwargs["breaker"] = CircuitBreaker(
+            failure_limit=settings.site_failure_limit,
+            retry_timeout=settings.site_retry_timeout,
+        )
+
     ts_start = time.perf_counter()
-    logger.debug(f"start {description}")
+    logger.debug(f"start {description} workers={workers}")
 
-    for host in hosts:
-        # Skip hosts with no os_name or mgmt_ip
-        if not host.os_name or not host.mgmt_ip:
-            logger.warning(
-                f"[{host.id}] skipping due to missing 'os_name' or 'mgmt_ip'"
-            )
-            continue
-
-        # Create host driver
-        try:
-            driver = get_driver(settings=settings, os_name=host.os_name)(
-                host=host,
-                username=username if username else host.username,
-                password=password if password else host.password,
-                ssh_private_key_file=ssh_private_key_file,
-            )
-        except (DriverNotFoundError, DriverError) as e:
-            logger.error(f"[{host.id}] {e}")
-            errors += 1
-            continue  # skip host
-
-        # Prepare args
-        kwargs: Dict[str, Any] = {}
-        if method_name in ["compare_config", "apply_config"]:
-            kwargs["config_filepath"] = (
-                f"{settings.kit_path}/{settings.staged_configs_dir}/"
-                + f"{host.id}.{settings.configs_file_extension}"
+    if workers > 1 and len(hosts) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda host: _run_driver_method_on_host(host=host, **host_kwargs),
+                hosts,
             )
-        elif method_name == "get_config":
-            kwargs["format"] = settings.configs_format
-            kwargs["sanitized"] = settings.configs_sanitized
+            for host_errors, outputs in results:
+                errors += host_errors
+                host_outputs.update(outputs)
+    else:
+        for host in hosts:
+            host_errors, outputs = _run_driver_method_on_host(host=host, **host_kwargs)
+            errors += host_errors
+            host_outputs.update(outputs)
 
-        # Open connection to host
-        try:
-            with driver as con:
-                logger.info(f"[{host.id}] opened connection to host")
-                # Run method with host and store output
-                output = getattr(con, method_name)(**kwargs)
-            logger.info(f"[{host.id}] closed connection to host")
-
-            # Update dict to hold output results indexed by host id
-            host_outputs.update({host.id: output})
-
-        except (DriverError, DriverConfigLoadError, DriverCommitDisconnectError) as e:
-            logger.error(f"[{host.id}] {e}")
-            errors += 1
+    if host_kwargs["breaker"] is not None:
+        for site, host_ids in host_kwargs["breaker"].get_skipped().items():
+            logger.error(
+                f"site '{site}' has too many failed connections, skipped "
+                f"{len(host_ids)} hosts: {', '.join(host_ids)}"
+            )
 
-            if isinstance(e, DriverCommitDisconnectError):
-                # Update with commit diff that caused disconnect
-                host_outputs.update({host.id: e.diff})
+    if state_cache is not None:
+        state_cache.save()
 
     dur = f"{time.perf_counter()-ts_start:0.4f}"
     logger.info(f"finished {description} ({dur}s)")
@@ -16,7 +16,10 @@
 # along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
 
 import abc
+import time
+import threading
 from os import getenv
+from typing import Any, Dict, List, Optional
 
 from ...logging import get_logger
 from ...exceptions import DriverError, DriverNotConnectedError
@@ -31,19 +34,46 @@ logger = get_logger()
 def ensure_connected(func):
     """
     Wrapper used around methods which must only run when host is connected.
+
+    An open session is trusted to be live, so 'is_connected' is only checked
+    when the session has not been opened by the context manager or a previous
+    method raised an error. The session lock is held while the method runs so
+    keepalive checks do not use the connection at the same time.
     """
 
     def ensure_connected_wrapper(self, *args, **kwargs):
-        if not self.is_connected:
-            raise DriverNotConnectedError(
-                f"'{func.__name__}' must be run within context manager"
-            )
-        func(self, *args, **kwargs)
+        with self._session_lock:
+            if not (self._session_open and self._session_live):
+                if not self.is_connected:
+                    raise DriverNotConnectedError(
+                        f"'{func.__name__}' must be run within context manager"
+                    )
+                self._session_live = self._session_open
+
+            try:
+                return func(self, *args, **kwargs)
+            except Exception:
+                self._session_live = False  # check connection on next call
+                raise
+            finally:
+                self._last_activity = time.monotonic()
 
     return ensure_connected_wrapper
 
 
 class BaseDriver(metaclass=abc.ABCMeta):
+    def __new__(cls, *args, **kwargs):
+        # Session state is set here so drivers which do not call the base
+        # class __init__ can still use 'ensure_connected' and keepalive
+        self = super().__new__(cls)
+        self._session_open = False
+        self._session_live = False
+        self._session_lock = threading.RLock()
+        self._session_wait = threading.Condition(self._session_lock)
+        self._last_activity = 0.0
+        self._keepalive: Optional[threading.Event] = None
+        return self
+
     def __init__(
         self,
         host: Host,
@@ -125,11 +155,112 @@ class BaseDriver(metaclass=abc.ABCMeta):
             str: active vs staged diff.
         """
 
+    def get_state(self, getters: List[str]) -> Dict[str, Any]:
+        """
+        Returns operational state from the host. Drivers which support state
+        snapshots should override this method.
+
+        Args:
+            getters (List[str]): names of state getters, e.g. "interfaces".
+
+        Returns:
+            Dict[str, Any]: getter name as key and state data as value.
+
+        Raises:
+            DriverError: if driver does not support getting state.
+        """
+        raise DriverError(
+            f"driver '{self.__class__.__name__}' does not support getting state"
+        )
+
+    def get_change_marker(self) -> Optional[str]:
+        """
+        Returns a cheap value which changes whenever the host config changes,
+        such as the latest commit ID or timestamp. Drivers which can report
+        this should override this method.
+
+        Returns:
+            Optional[str]: change marker, or None if not supported.
+        """
+        return None
+
+    def start_keepalive(self, interval: float) -> None:
+        """
+        Starts a background thread which checks that the session is still
+        connected after it has been idle for interval seconds. Used for
+        sessions which are held open between uses, and stopped when the
+        connection is closed.
+
+        Args:
+            interval (float): idle seconds between checks, 0 disables.
+        """
+        if interval <= 0 or self._keepalive is not None:
+            return
+
+        self._keepalive = threading.Event()
+        threading.Thread(
+            target=self._run_keepalive,
+            args=(interval, self._keepalive),
+            name=f"keepalive-{self.host.id}",
+            daemon=True,
+        ).start()
+        logger.debug(f"[{self.host.id}] started keepalive every {interval}s")
+
+    def stop_keepalive(self) -> None:
+        """
+        Stops the keepalive thread if running.
+        """
+        if self._keepalive is not None:
+            self._keepalive.set()
+            self._keepalive = None
+            with self._session_lock:
+                pass  # wait for a running check to finish
+
+    def _sleep_unlocked(self, seconds: float) -> None:
+        """
+        Sleeps with the session lock released, so that keepalive checks can
+        use the connection during long waits such as before confirming a commit.
+
+        Args:
+            seconds (float): seconds to sleep.
+        """
+        with self._session_wait:
+            # Waiting releases the lock fully even when held by nested methods
+            self._session_wait.wait(timeout=seconds)
+
+    def _run_keepalive(self, interval: float, stopped: threading.Event) -> None:
+        while not stopped.wait(interval):
+            if time.monotonic() - self._last_activity < interval:
+                continue
+
+            # Skip check while a method is using the session
+            if not self._session_lock.acquire(blocking=False):
+                continue
+            try:
+                if stopped.is_set():
+                    return
+                try:
+                    live = bool(self.is_connected)
+                except Exception as e:  # pylint: disable=W0703
+                    logger.debug(f"[{self.host.id}] keepalive failed: {e}")
+                    live = False
+                self._session_live = live
+                self._last_activity = time.monotonic()
+            finally:
+                self._session_lock.release()
+
+            if not live:
+                logger.warning(f"[{self.host.id}] keepalive found session closed")
+                return
+
     @abc.abstractmethod
     def __enter__(self):
         """
         Open connection to host when context manager starts.
         """
+        self._session_open = True
+        self._session_live = True
+        self._last_activity = time.monotonic()
         logger.debug(f"[{self.host.id}] opened connection")
         return self
 
@@ -138,4 +269,7 @@ class BaseDriver(metaclass=abc.ABCMeta):
         """
         Close connection to host when context manager finishes.
         """
+        self.stop_keepalive()
+        self._session_open = False
+        self._session_live = False
         logger.debug(f"[{self.host.id}] closed connection")
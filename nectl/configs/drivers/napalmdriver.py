@@ -18,7 +18,8 @@
 
 import os
 import json
-import time
+import hashlib
+from typing import Any, Dict, List, Optional
 from napalm import get_network_driver
 from napalm.base.base import NetworkDriver
 from napalm.base.exceptions import (
@@ -34,15 +35,26 @@ from ncclient.transport.errors import AuthenticationError
 from ...logging import get_logger
 from ...exceptions import (
     DriverError,
+    DriverAuthError,
+    DriverConnectionError,
+    DriverLockError,
     DriverConfigLoadError,
     DriverCommitDisconnectError,
     DriverNotFoundError,
 )
 from ...datatree.hosts import Host
 from . import BaseDriver
-from .basedriver import COMMIT_COMMENT, COMMIT_WAIT_MULTIPLIER, CONNECT_TIMEOUT
+from .basedriver import (
+    COMMIT_COMMENT,
+    COMMIT_WAIT_MULTIPLIER,
+    CONNECT_TIMEOUT,
+    ensure_connected,
+)
 
 NAPALM_TIMEOUT = os.getenv("NAPALM_TIMEOUT", "90")
+NAPALM_CHANGE_MARKER_COMMANDS = {
+    "junos": "show system commit",  # commit history changes on each commit
+}
 
 logger = get_logger()
 
@@ -85,10 +97,19 @@ class NapalmDriver(BaseDriver):
 
     @property
     def is_connected(self) -> bool:
+        """
+        Returns True if napalm reports the connection is alive. This requires
+        a round trip to the host, so driver methods only check it when the
+        session has not been marked live.
+
+        Returns:
+            bool: True if OK.
+        """
         if self._driver:
             return self._driver.is_alive().get("is_alive", False)
         return False
 
+    @ensure_connected
     def get_config(self, format: str = None, sanitized: bool = True) -> str:
         """
         Returns the active configuration from the host.
@@ -105,6 +126,7 @@ class NapalmDriver(BaseDriver):
             "running"
         )
 
+    @ensure_connected
     def compare_config(self, config_filepath: str, format: str = None) -> str:
         """
         Returns the configuration diff between the active and supplied config.
@@ -127,6 +149,7 @@ class NapalmDriver(BaseDriver):
         )
         return diff
 
+    @ensure_connected
     def apply_config(
         self, config_filepath: str, format: str = None, commit_timer: int = 1
     ) -> str:
@@ -155,6 +178,57 @@ class NapalmDriver(BaseDriver):
         )
         return diff
 
+    @ensure_connected
+    def get_state(self, getters: List[str]) -> Dict[str, Any]:
+        """
+        Returns operational state using napalm getters. Getter names are the
+        napalm method names without the 'get_' prefix, e.g. "bgp_neighbors".
+
+        Args:
+            getters (List[str]): names of state getters.
+
+        Returns:
+            Dict[str, Any]: getter name as key and state data as value.
+
+        Raises:
+            DriverError: if a getter is not supported by the host.
+        """
+        state = {}
+        for getter in getters:
+            try:
+                state[getter] = getattr(self._driver, f"get_{getter}")()
+            except (AttributeError, NotImplementedError) as e:
+                raise DriverError(f"getter '{getter}' is not supported") from e
+        return state
+
+    @ensure_connected
+    def get_change_marker(self) -> Optional[str]:
+        """
+        Returns hash of a command output which changes whenever the host config
+        changes. The command is chosen by os_name and can be set using the
+        'napalm_change_marker_command' fact.
+
+        Returns:
+            Optional[str]: change marker, or None if not supported.
+        """
+        command = self.host.facts.get(
+            "napalm_change_marker_command",
+            NAPALM_CHANGE_MARKER_COMMANDS.get(self.host.os_name),
+        )
+        if not command:
+            return None
+
+        try:
+            output = self._driver.cli([command]).get(command)
+        except Exception as e:  # pylint: disable=W0703
+            logger.debug(
+                f"[{self.host.id}] change marker not supported: "
+                f"{e.__class__.__name__}: {e}"
+            )
+            return None
+
+        return hashlib.sha256(output.encode()).hexdigest() if output else None
+
     def _load_config(
         self,
         config_filepath: str,
@@ -252,7 +326,7 @@ class NapalmDriver(BaseDriver):
             logger.info(
                 f"[{self.host.id}] waiting {sleep_mins} minutes for config to settle"
             )
-            time.sleep(sleep_mins * 60)
+            self._sleep_unlocked(sleep_mins * 60)
 
             # Confirm previous commit
             self._driver.confirm_commit()
@@ -279,13 +353,17 @@ class NapalmDriver(BaseDriver):
                 "napalm driver '{self.host.os_name}' not found: {e}"
             ) from e
         except LockError as e:
-            raise DriverError(
+            raise DriverLockError(
                 "failed to take lock ensure no user in config mode"
             ) from e
         except AuthenticationError as e:
-            raise DriverError(f"host reachable but authentication failed: {e}") from e
+            raise DriverAuthError(
+                f"host reachable but authentication failed: {e}"
+            ) from e
         except ConnectionException as e:
-            raise DriverError(f"connection failed host is unreachable: {e}") from e
+            raise DriverConnectionError(
+                f"connection failed host is unreachable: {e}"
+            ) from e
 
         super().__enter__()
 
@@ -296,6 +374,7 @@ class NapalmDriver(BaseDriver):
         Close connection to host when context manager finishes.
         """
         logger.debug(f"[{self.host.id}] closing connection to host")
+        self.stop_keepalive()
         try:
             self._driver.close()
         except Exception as e:
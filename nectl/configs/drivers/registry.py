@@ -0,0 +1,143 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Registry which resolves host os_name to a driver class.
+
+Drivers are looked up in the kit, then in packages installed with a
+'nectl.drivers' entry point, then in core drivers, and finally the default
+driver. Kit and installed drivers are discovered once without importing them,
+and a driver module is only imported when a host needs it. Each os_name is
+resolved once and the result is reused for all other hosts.
+"""
+import threading
+from importlib.metadata import EntryPoint
+from typing import Dict, Optional, Tuple, Type
+
+from ...logging import get_logger
+from ...settings import Settings
+from ...exceptions import DriverNotFoundError
+from .basedriver import BaseDriver
+from .utils import (
+    find_kit_drivers,
+    load_kit_driver,
+    find_entry_point_drivers,
+    load_entry_point_driver,
+)
+
+logger = get_logger()
+
+
+class DriverRegistry:
+    """
+    Resolves os_name to drivers and caches the result.
+    """
+
+    def __init__(
+        self,
+        core_drivers: Dict[str, Type[BaseDriver]],
+        default_drivers: Dict[str, Type[BaseDriver]],
+    ) -> None:
+        """
+        Args:
+            core_drivers (Dict[str, Type[BaseDriver]]): os_name as key and
+                driver as value.
+            default_drivers (Dict[str, Type[BaseDriver]]): 'default_driver'
+                setting as key and driver as value.
+        """
+        self.core_drivers = core_drivers
+        self.default_drivers = default_drivers
+        self._settings_key: Optional[Tuple] = None
+        self._kit_drivers: Optional[Dict[str, str]] = None
+        self._entry_point_drivers: Optional[Dict[str, EntryPoint]] = None
+        self._resolved: Dict[str, Type[BaseDriver]] = {}
+        self._lock = threading.RLock()
+
+    def clear(self) -> None:
+        """
+        Clears discovered and resolved drivers.
+        """
+        with self._lock:
+            self._settings_key = None
+            self._kit_drivers = None
+            self._entry_point_drivers = None
+            self._resolved = {}
+
+    def get(self, settings: Settings, os_name: str) -> Type[BaseDriver]:
+        """
+        Returns driver of os_name.
+
+        Args:
+            settings (Settings): config settings.
+            os_name (str): host OS name.
+
+        Returns:
+            Type[BaseDriver]: driver class.
+
+        Raises:
+            DriverNotFoundError: if no driver matches os_name.
+            DriverLoadError: if matched driver cannot be loaded.
+        """
+        with self._lock:
+            # Discover drivers again when settings point to another kit
+            key = (settings.kit_path, settings.drivers_dirname, settings.default_driver)
+            if key != self._settings_key:
+                self.clear()
+                self._settings_key = key
+
+            driver = self._resolved.get(os_name)
+            if driver is None:
+                driver = self._resolve(settings, os_name)
+                logger.debug(f"resolved os_name '{os_name}' to {driver.__name__}")
+                self._resolved[os_name] = driver
+
+            return driver
+
+    def _resolve(self, settings: Settings, os_name: str) -> Type[BaseDriver]:
+        # Lookup custom drivers in kit
+        logger.debug(f"checking kit drivers for os_name: {os_name}")
+        if self._kit_drivers is None:
+            self._kit_drivers = find_kit_drivers(settings)
+        if os_name in self._kit_drivers:
+            driver = load_kit_driver(settings, os_name)
+            if driver is not None:
+                return driver
+
+        # Lookup drivers installed by other packages
+        logger.debug(f"checking installed drivers for os_name: {os_name}")
+        if self._entry_point_drivers is None:
+            self._entry_point_drivers = find_entry_point_drivers()
+        if os_name in self._entry_point_drivers:
+            return load_entry_point_driver(self._entry_point_drivers[os_name])
+
+        # Lookup core drivers
+        logger.debug(f"checking core drivers for os_name: {os_name}")
+        if os_name in self.core_drivers:
+            return self.core_drivers[os_name]
+
+        # Use a default driver
+        logger.debug("checking if default driver is defined")
+        if settings.default_driver:
+            if settings.default_driver in self.default_drivers:
+                return self.default_drivers[settings.default_driver]
+
+            # Default driver does not exist
+            raise DriverNotFoundError(
+                f"no default driver found matching name: {settings.default_driver}"
+            )
+
+        raise DriverNotFoundError(f"no driver found that matches os_name: {os_name}")
@@ -18,7 +18,8 @@
 import os
 import sys
 import importlib
-from typing import Dict
+from importlib.metadata import EntryPoint, entry_points
+from typing import Dict, Optional, Type
 
 from nectl.exceptions import DriverLoadError
 
@@ -26,18 +27,20 @@ from ...logging import get_logger
 from ...settings import Settings
 from .basedriver import BaseDriver
 
+DRIVERS_ENTRY_POINT_GROUP = "nectl.drivers"
 logger = get_logger()
 
 
-def load_drivers_from_kit(settings: Settings) -> Dict[str, BaseDriver]:
+def find_kit_drivers(settings: Settings) -> Dict[str, str]:
     """
-    Returns a dict of os_name and driver objects found in kit.
+    Returns a dict of os_name and driver module names found in kit without
+    importing them.
 
     Args:
         settings (Settings): config settings.
 
     Returns:
-        Dict[str,BaseDriver]: os_name as key and driver object as value.
+        Dict[str,str]: os_name as key and module name as value.
     """
     # Build drivers full path
     drivers_path = os.path.join(settings.kit_path, settings.drivers_dirname)
@@ -47,39 +50,119 @@ def load_drivers_from_kit(settings: Settings) -> Dict[str, BaseDriver]:
         logger.debug("no drivers directory found in kit")
         return {}
 
-    logger.info("loading drivers from kit")
+    modules = {}
+    for driver_filename in os.listdir(drivers_path):
+        if driver_filename.startswith(("_", ".")):
+            continue
+
+        # Remove extension from driver filename
+        driver_filename = driver_filename.replace(".py", "")
+        modules[driver_filename] = settings.drivers_dirname + "." + driver_filename
+
+    if modules:
+        logger.debug(f"found kit drivers: {list(modules)}")
 
+    return modules
+
+
+def load_kit_driver(settings: Settings, os_name: str) -> Optional[Type[BaseDriver]]:
+    """
+    Imports driver module from kit and returns the driver class named like the
+    module.
+
+    Args:
+        settings (Settings): config settings.
+        os_name (str): host OS name matching the driver filename.
+
+    Returns:
+        Optional[Type[BaseDriver]]: driver class, or None if module has no driver.
+
+    Raises:
+        DriverLoadError: if driver is not subclass of BaseDriver.
+    """
     # ensure kit path is in pythonpath
     if sys.path[0] != settings.kit_path:
         logger.debug(f"appending kit to PYTHONPATH: {settings.kit_path}")
         sys.path.insert(0, settings.kit_path)
 
+    # Import driver module
+    logger.info(f"loading driver from kit: {os_name}")
+    driver = importlib.import_module(settings.drivers_dirname + "." + os_name)
+
+    # Fetch driver class named like file
+    for var, obj in driver.__dict__.items():
+        # Look for class name '<filename>Driver'
+        if var.lower() == f"{os_name.lower()}driver":
+            # Ensure that driver is child of base driver
+            if not isinstance(obj, type) or not issubclass(obj, BaseDriver):
+                raise DriverLoadError(
+                    f"driver '{os_name}' must be subclass of 'BaseDriver'"
+                )
+            return obj
+
+    return None
+
+
+def load_drivers_from_kit(settings: Settings) -> Dict[str, Type[BaseDriver]]:
+    """
+    Returns a dict of os_name and driver objects found in kit.
+
+    Args:
+        settings (Settings): config settings.
+
+    Returns:
+        Dict[str,BaseDriver]: os_name as key and driver object as value.
+    """
     drivers = {}
+    for os_name in find_kit_drivers(settings):
+        driver = load_kit_driver(settings, os_name)
+        if driver is not None:
+            drivers[os_name] = driver
 
-    for driver_filename in os.listdir(drivers_path):
-        # Remove extension from driver filename
-        driver_filename = driver_filename.replace(".py", "")
+    return drivers
 
-        # Import driver module
-        driver = importlib.import_module(
-            settings.drivers_dirname + "." + driver_filename
-        )
 
-        # Fetch driver class named like file
-        for var, obj in driver.__dict__.items():
-            # Look for class name '<filename>Driver'
-            if var.lower() == f"{driver_filename.lower()}driver":
-                # Ensure that driver is child of base driver
-                if not issubclass(obj, BaseDriver):
-                    raise DriverLoadError(
-                        f"driver '{driver_filename}' must be subclass of 'BaseDriver'"
-                    )
+def find_entry_point_drivers() -> Dict[str, EntryPoint]:
+    """
+    Returns a dict of os_name and entry points of drivers installed by other
+    packages in the 'nectl.drivers' group, without importing them.
 
-                # Add driver
-                drivers[driver_filename] = obj
-                break
+    Returns:
+        Dict[str,EntryPoint]: os_name as key and entry point as value.
+    """
+    drivers = {ep.name: ep for ep in entry_points(group=DRIVERS_ENTRY_POINT_GROUP)}
 
     if drivers:
-        logger.debug(f"found kit drivers: {list(drivers)}")
+        logger.debug(f"found installed drivers: {list(drivers)}")
 
     return drivers
+
+
+def load_entry_point_driver(entry_point: EntryPoint) -> Type[BaseDriver]:
+    """
+    Imports and returns driver class of entry point.
+
+    Args:
+        entry_point (EntryPoint): driver entry point.
+
+    Returns:
+        Type[BaseDriver]: driver class.
+
+    Raises:
+        DriverLoadError: if driver cannot be imported or is not subclass of
+            BaseDriver.
+    """
+    logger.info(f"loading installed driver: {entry_point.name}={entry_point.value}")
+    try:
+        obj = entry_point.load()
+    except (ImportError, AttributeError) as e:
+        raise DriverLoadError(
+            f"driver '{entry_point.name}' could not be loaded: {e}"
+        ) from e
+
+    if not isinstance(obj, type) or not issubclass(obj, BaseDriver):
+        raise DriverLoadError(
+            f"driver '{entry_point.name}' must be subclass of 'BaseDriver'"
+        )
+
+    return obj
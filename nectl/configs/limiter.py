@@ -0,0 +1,182 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Adaptive limits on the number of driver sessions open at the same time.
+
+Limits use additive increase and multiplicative decrease (AIMD). The limit
+doubles while no overload has been seen, then grows by one session for each
+full limit of healthy sessions. Sessions which are slow to connect, time out,
+fail to take the config lock or fail authentication halve the limit, at most
+once for each limit of sessions so that one burst of failures only counts once.
+
+A global limit is shared by all hosts and each site has its own limit so that
+a slow site does not reduce sessions to other sites.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from ..logging import get_logger
+from ..metrics import increment
+from ..exceptions import DriverAuthError, DriverConnectionError, DriverLockError
+
+OVERLOAD_ERRORS = (DriverConnectionError, DriverLockError, DriverAuthError)
+logger = get_logger()
+
+
+class AdaptiveLimiter:
+    """
+    Limits concurrent sessions using AIMD.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        minimum: int = 1,
+        initial: int = 1,
+        decrease: float = 0.5,
+        name: str = "global",
+    ) -> None:
+        """
+        Args:
+            maximum (int): highest limit.
+            minimum (int): lowest limit.
+            initial (int): starting limit.
+            decrease (float): multiplier applied to limit on overload.
+            name (str): name used in logs and metrics.
+        """
+        self.maximum = maximum
+        self.minimum = minimum
+        self.decrease = decrease
+        self.name = name
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.in_flight = 0
+        self._slow_start = True
+        self._hold_decrease = 0  # sessions to finish before next decrease
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Waits until a session is allowed by the limit.
+        """
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, overloaded: bool = False) -> None:
+        """
+        Ends a session and adjusts the limit.
+
+        Args:
+            overloaded (bool): True if session was slow or failed from overload.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self._hold_decrease = max(0, self._hold_decrease - 1)
+
+            if overloaded:
+                if not self._hold_decrease:
+                    self._slow_start = False
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._hold_decrease = int(self.limit) + self.in_flight
+                    logger.debug(f"session limit '{self.name}' decreased to {self}")
+                    increment("session_limit_decrease", limiter=self.name)
+            elif self._slow_start:
+                self.limit = min(self.maximum, self.limit + 1)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+            self._cond.notify_all()
+
+    def __str__(self) -> str:
+        return str(int(self.limit))
+
+
+class SessionLimiter:
+    """
+    Combines a global limit with a limit for each site.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        site_max_sessions: Optional[int] = None,
+        latency_threshold: float = 10.0,
+    ) -> None:
+        """
+        Args:
+            workers (int): highest global limit.
+            site_max_sessions (int): highest limit of each site, else workers.
+            latency_threshold (float): seconds a connection can take before
+                it counts as overload.
+        """
+        self.latency_threshold = latency_threshold
+        self.site_max_sessions = site_max_sessions or workers
+        self.global_limiter = AdaptiveLimiter(maximum=workers)
+        self._sites: Dict[str, AdaptiveLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get_site_limiter(self, site: str) -> AdaptiveLimiter:
+        """
+        Returns limiter of site, which is created on first use.
+
+        Args:
+            site (str): host site.
+
+        Returns:
+            AdaptiveLimiter: site limiter.
+        """
+        with self._lock:
+            if site not in self._sites:
+                self._sites[site] = AdaptiveLimiter(
+                    maximum=self.site_max_sessions, name=f"site:{site}"
+                )
+            return self._sites[site]
+
+    @contextmanager
+    def session(self, site: Optional[str]) -> Iterator[Dict]:
+        """
+        Context manager which holds a session under the site and global limits.
+        Hosts with no site are only held under the global limit.
+
+        The yielded dict can be updated with the 'latency' of the connection.
+        Exceptions that indicate overload decrease both limits.
+
+        Args:
+            site (str): host site.
+
+        Yields:
+            Dict: session stats.
+        """
+        site_limiter = self.get_site_limiter(site) if site is not None else None
+        if site_limiter is not None:
+            site_limiter.acquire()
+        self.global_limiter.acquire()
+        stats: Dict = {"latency": 0.0}
+        overloaded = False
+        try:
+            yield stats
+        except OVERLOAD_ERRORS:
+            overloaded = True
+            raise
+        finally:
+            overloaded = overloaded or stats["latency"] > self.latency_threshold
+            self.global_limiter.release(overloaded=overloaded)
+            if site_limiter is not None:
+                site_limiter.release(overloaded=overloaded)
@@ -0,0 +1,144 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Render profiler which aggregates time, output size and calls for each template
+section and host across a render run.
+"""
+import os
+import json
+from typing import Dict, Optional
+
+from ..logging import get_logger
+from ..settings import Settings
+
+RENDER_PROFILE_FILENAME = "render_profile.json"
+logger = get_logger()
+
+
+def _new_stats() -> Dict:
+    return {"calls": 0, "time": 0.0, "max_time": 0.0, "bytes": 0, "errors": 0}
+
+
+class RenderProfiler:
+    """
+    Collects render stats for template sections and hosts.
+
+    Example:
+
+    profiler = RenderProfiler()
+    render_hosts(settings=settings, hosts=hosts, profiler=profiler)
+    print(profiler.format_table(limit=20))
+
+    """
+
+    def __init__(self) -> None:
+        self.sections: Dict[str, Dict] = {}
+        self.hosts: Dict[str, Dict] = {}
+
+    def record(
+        self,
+        host_id: str,
+        section: str,
+        duration: float,
+        size: int,
+        error: bool = False,
+    ) -> None:
+        """
+        Add render of one template section for a host.
+
+        Args:
+            host_id (str): host ID.
+            section (str): template and section name, e.g. 'junos:interfaces'.
+            duration (float): render time in seconds.
+            size (int): rendered output size in bytes.
+            error (bool): section raised an error.
+        """
+        for stats in (
+            self.sections.setdefault(section, _new_stats()),
+            self.hosts.setdefault(host_id, _new_stats()),
+        ):
+            stats["calls"] += 1
+            stats["time"] += duration
+            stats["max_time"] = max(stats["max_time"], duration)
+            stats["bytes"] += size
+            stats["errors"] += int(error)
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """
+        Returns stats sorted by total time with slowest first.
+
+        Returns:
+            Dict[str, Dict]: section and host stats.
+        """
+
+        def _sort(stats: Dict[str, Dict]) -> Dict[str, Dict]:
+            return dict(sorted(stats.items(), key=lambda i: i[1]["time"], reverse=True))
+
+        return {"sections": _sort(self.sections), "hosts": _sort(self.hosts)}
+
+    def write_json(self, filepath: str) -> None:
+        """
+        Write stats to JSON file.
+
+        Args:
+            filepath (str): output file path.
+        """
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(filepath, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, indent=2)
+        logger.debug(f"render profile written to file: {filepath}")
+
+    def format_table(self, limit: Optional[int] = None) -> str:
+        """
+        Returns summary table of template sections with slowest first.
+
+        Args:
+            limit (int): maximum sections to include, all if None.
+
+        Returns:
+            str: summary table.
+        """
+        sections = list(self.to_dict()["sections"].items())[:limit]
+        total = sum(stats["time"] for stats in self.sections.values()) or 1.0
+        width = max([len("section")] + [len(name) for name, _ in sections])
+
+        lines = [
+            f"{'section':<{width}}  {'calls':>7}  {'total(s)':>10}  "
+            f"{'mean(ms)':>9}  {'max(ms)':>9}  {'bytes':>10}  {'%':>6}"
+        ]
+        for name, stats in sections:
+            lines.append(
+                f"{name:<{width}}  {stats['calls']:>7}  {stats['time']:>10.4f}  "
+                f"{stats['time'] / stats['calls'] * 1000:>9.3f}  "
+                f"{stats['max_time'] * 1000:>9.3f}  {stats['bytes']:>10}  "
+                f"{stats['time'] / total * 100:>6.1f}"
+            )
+        return "\n".join(lines)
+
+
+def get_profile_filepath(settings: Settings) -> str:
+    """
+    Returns path to render profile file.
+
+    Args:
+        settings (Settings): config settings.
+
+    Returns:
+        str: render profile file path.
+    """
+    return os.path.join(settings.cache_path, RENDER_PROFILE_FILENAME)
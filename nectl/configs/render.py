@@ -19,13 +19,14 @@
 Render functions used to convert templates and facts into configs.
 """
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import inspect
 from contextlib import redirect_stdout
 from contextvars import ContextVar
 import io
 
 from ..logging import get_logger
+from ..metrics import record_span
 from ..settings import Settings
 from ..exceptions import (
     TemplateImportError,
@@ -34,6 +35,7 @@ from ..exceptions import (
 )
 from ..datatree.hosts import Host
 from .templates import Template, get_template
+from .profiler import RenderProfiler
 
 
 logger = get_logger()
@@ -50,7 +52,9 @@ def get_render_context() -> dict:
     return _render_context.get()
 
 
-def render_hosts(settings: Settings, hosts: List[Host]) -> Dict[str, str]:
+def render_hosts(
+    settings: Settings, hosts: List[Host], profiler: Optional[RenderProfiler] = None
+) -> Dict[str, str]:
     """
     Returns rendered configs for hosts using templates which are matched based
     on the 'os_name' value.
@@ -58,6 +62,7 @@ def render_hosts(settings: Settings, hosts: List[Host]) -> Dict[str, str]:
     Args:
         settings (Settings): config settings.
         hosts (List[Host]): hosts to render templates for.
+        profiler (RenderProfiler): optional profiler to record section stats.
 
     Returns:
         Dict[str,str]: dict with item per host with rendered template.
@@ -85,7 +90,7 @@ def render_hosts(settings: Settings, hosts: List[Host]) -> Dict[str, str]:
             template = get_template(os_name=host.os_name, settings=settings)
 
             # Render template and add to results
-            results[host.id] = render_template(template, host.facts)
+            results[host.id] = render_template(template, host.facts, profiler)
 
         except (TemplateMissingError, TemplateImportError) as e:
             raise RenderError(str(e)) from e
@@ -99,13 +104,18 @@ def render_hosts(settings: Settings, hosts: List[Host]) -> Dict[str, str]:
     return results
 
 
-def render_template(template: Template, facts: Dict[str, Any]) -> str:
+def render_template(
+    template: Template,
+    facts: Dict[str, Any],
+    profiler: Optional[RenderProfiler] = None,
+) -> str:
     """
     Returns rendered configuration for host facts using supplied template.
 
     Args:
         template: Template class.
         facts (Dict[str,Any]): host facts.
+        profiler (RenderProfiler): optional profiler to record section stats.
 
     Returns:
         rendered host configuration.
@@ -127,7 +137,7 @@ def render_template(template: Template, facts: Dict[str, Any]) -> str:
         if inspect.isfunction(func) and not name.startswith("_")
     }
     logger.debug(
-        f"[{host_id}] found {len(sections)} template sections: {list(sections.keys())}"
+        "[%s] found %d template sections: %s", host_id, len(sections), list(sections)
     )
 
     out = []
@@ -135,7 +145,10 @@ def render_template(template: Template, facts: Dict[str, Any]) -> str:
 
     # Loop through each template section
     for sname, section in sections.items():
-        logger.info(f"[{host_id}] rendering template: {template_name}:{sname}")
+        logger.info("[%s] rendering template: %s:%s", host_id, template_name, sname)
+        section_start = time.perf_counter()
+        render = ""
+        failed = False
         try:
             # Get args that template needs
             args = {}
@@ -166,6 +179,7 @@ def render_template(template: Template, facts: Dict[str, Any]) -> str:
                 f"needs fact: {str(e)}"
             )
             errors += 1  # increase errors counter
+            failed = True
             continue  # move to next template section
         except Exception as e:
             # Catch all other errors
@@ -174,9 +188,27 @@ def render_template(template: Template, facts: Dict[str, Any]) -> str:
             )
             logger.exception(e)
             errors += 1  # increase errors counter
+            failed = True
             continue  # move to next template section
+        finally:
+            if profiler is not None:
+                profiler.record(
+                    host_id=host_id,
+                    section=f"{template_name}:{sname}",
+                    duration=time.perf_counter() - section_start,
+                    size=len(render.encode()),
+                    error=failed,
+                )
         out.append(render)
 
+    record_span(
+        "render",
+        time.perf_counter() - ts_start,
+        "RenderError" if errors else None,
+        host=host_id,
+        site=facts.get("site"),
+    )
+
     dur = f"{time.perf_counter()-ts_start:0.4f}"
     logger.info(f"[{host_id}] finished render ({dur}s)")
 
@@ -0,0 +1,214 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Connection retries and circuit breakers for driver sessions.
+
+Failed connections are retried after a random delay of up to the backoff,
+which doubles for each attempt, so that hosts do not retry at the same time.
+
+Each site has a circuit breaker which opens after a number of hosts in a row
+fail to connect. Remaining hosts at the site then fail fast instead of each
+waiting for the connection timeout. After a timeout one host is allowed to
+try again and its result closes or opens the circuit.
+"""
+import time
+import random
+import threading
+from typing import Dict, List, Optional
+
+from ..logging import get_logger
+from ..metrics import increment
+from ..exceptions import DriverCircuitOpenError, DriverConnectionError
+from ..datatree.hosts import Host
+
+MAX_BACKOFF = 30.0
+logger = get_logger()
+
+
+class CircuitBreaker:
+    """
+    Tracks connection failures for each site.
+    """
+
+    def __init__(self, failure_limit: int, retry_timeout: float) -> None:
+        """
+        Args:
+            failure_limit (int): failures in a row which open a site circuit.
+            retry_timeout (float): seconds before an open circuit allows a retry.
+        """
+        self.failure_limit = failure_limit
+        self.retry_timeout = retry_timeout
+        self._failures: Dict[Optional[str], int] = {}
+        self._opened: Dict[Optional[str], float] = {}
+        self._trial: Dict[Optional[str], bool] = {}
+        self._skipped: Dict[Optional[str], List[str]] = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, site: Optional[str]) -> bool:
+        """
+        Returns True if site circuit is open.
+
+        Args:
+            site (str): host site.
+
+        Returns:
+            bool: True if open.
+        """
+        with self._lock:
+            return site in self._opened
+
+    def allow(self, host: Host) -> None:
+        """
+        Checks that host can connect. When the circuit has been open for the
+        retry timeout, one host is allowed to try.
+
+        Args:
+            host (Host): host instance.
+
+        Raises:
+            DriverCircuitOpenError: if site circuit is open.
+        """
+        with self._lock:
+            opened = self._opened.get(host.site)
+            if opened is None:
+                return
+            if not self._trial.get(host.site):
+                if time.monotonic() - opened >= self.retry_timeout:
+                    self._trial[host.site] = True
+                    return
+            self._skipped.setdefault(host.site, []).append(host.id)
+
+        increment("circuit_open_skips", site=host.site)
+        raise DriverCircuitOpenError(
+            f"skipped as site '{host.site}' has too many failed connections"
+        )
+
+    def record_success(self, site: Optional[str]) -> None:
+        """
+        Closes site circuit.
+
+        Args:
+            site (str): host site.
+        """
+        with self._lock:
+            self._failures.pop(site, None)
+            self._trial.pop(site, None)
+            if self._opened.pop(site, None) is not None:
+                logger.info(f"site '{site}' circuit closed")
+
+    def record_failure(self, site: Optional[str]) -> None:
+        """
+        Counts a failed connection and opens site circuit at the failure limit.
+
+        Args:
+            site (str): host site.
+        """
+        with self._lock:
+            self._failures[site] = self._failures.get(site, 0) + 1
+            if self._trial.pop(site, None) or (
+                site not in self._opened and self._failures[site] >= self.failure_limit
+            ):
+                self._opened[site] = time.monotonic()
+                logger.warning(
+                    f"site '{site}' circuit opened after "
+                    f"{self._failures[site]} failed connections"
+                )
+
+    def release_trial(self, site: Optional[str]) -> None:
+        """
+        Ends a retry trial without a connection result so that another host
+        can try, e.g. when the trial host fails authentication.
+
+        Args:
+            site (str): host site.
+        """
+        with self._lock:
+            self._trial.pop(site, None)
+
+    def get_skipped(self) -> Dict[Optional[str], List[str]]:
+        """
+        Returns IDs of hosts which failed fast for each site.
+
+        Returns:
+            Dict[str, List[str]]: site as key and host IDs as value.
+        """
+        with self._lock:
+            return {site: list(hosts) for site, hosts in self._skipped.items()}
+
+
+class RetrySession:
+    """
+    Context manager which opens a driver connection with retries.
+    """
+
+    def __init__(
+        self,
+        driver,
+        host: Host,
+        retries: int = 0,
+        backoff: float = 1.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        """
+        Args:
+            driver (BaseDriver): host driver.
+            host (Host): host instance.
+            retries (int): total retries after the first failed connection.
+            backoff (float): highest delay in seconds before the first retry.
+            breaker (CircuitBreaker): optional circuit breaker to record
+                connection results with.
+        """
+        self.driver = driver
+        self.host = host
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker
+
+    def __enter__(self):
+        attempt = 0
+        while True:
+            try:
+                con = self.driver.__enter__()
+            except DriverConnectionError as e:
+                site_open = self.breaker is not None and self.breaker.is_open(
+                    self.host.site
+                )
+                if attempt >= self.retries or site_open:
+                    if self.breaker is not None:
+                        self.breaker.record_failure(self.host.site)
+                    raise
+
+                delay = random.uniform(0, min(MAX_BACKOFF, self.backoff * 2**attempt))
+                attempt += 1
+                logger.warning(
+                    f"[{self.host.id}] {e} retrying in {delay:0.1f}s "
+                    f"attempt {attempt}/{self.retries}"
+                )
+                increment("connect_retries", host=self.host.id, site=self.host.site)
+                time.sleep(delay)
+            except BaseException:
+                if self.breaker is not None:
+                    self.breaker.release_trial(self.host.site)
+                raise
+            else:
+                if self.breaker is not None:
+                    self.breaker.record_success(self.host.site)
+                return con
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self.driver.__exit__(exc_type, exc_val, exc_tb)
@@ -0,0 +1,69 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Rollout waves which apply configs one deployment group at a time.
+
+Waves follow the 'rollout_order' setting, and any other deployment groups are
+applied afterwards in natural order, e.g. 'prod_2' before 'prod_10'. Hosts
+with no deployment group are applied in the last wave.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from ..logging import get_logger
+from ..datatree.hosts import Host
+
+UNGROUPED_WAVE = "ungrouped"
+logger = get_logger()
+
+
+def _natural_key(name: str) -> Tuple[Union[int, str], ...]:
+    return tuple(int(p) if p.isdigit() else p for p in re.split(r"(\d+)", name))
+
+
+def get_rollout_waves(
+    hosts: Iterable[Host], order: Optional[List[str]] = None
+) -> List[Tuple[str, List[Host]]]:
+    """
+    Returns hosts grouped into waves by deployment group.
+
+    Args:
+        hosts (Iterable[Host]): hosts to roll out.
+        order (List[str]): deployment groups to apply first and in this order.
+
+    Returns:
+        List[Tuple[str, List[Host]]]: deployment group and hosts of each wave.
+    """
+    groups: Dict[str, List[Host]] = {}
+    ungrouped: List[Host] = []
+    for host in hosts:
+        if host.deployment_group:
+            groups.setdefault(host.deployment_group, []).append(host)
+        else:
+            ungrouped.append(host)
+
+    order = [group for group in order or [] if group in groups]
+    order += sorted((g for g in groups if g not in order), key=_natural_key)
+
+    waves = [(group, groups[group]) for group in order]
+    if ungrouped:
+        waves.append((UNGROUPED_WAVE, ungrouped))
+
+    logger.debug(f"rollout waves: {', '.join(f'{g}={len(h)}' for g, h in waves)}")
+
+    return waves
@@ -0,0 +1,215 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Device state cache used to skip driver methods on hosts which have not changed
+since the previous run.
+
+Each result is stored with a change marker reported by the host driver, such
+as the latest commit ID, and a hash of the method inputs, such as the staged
+config. A result is reused when the host reports the same marker and the
+inputs are the same. Hosts whose driver does not report a marker are only
+answered from cache within the 'device_state_ttl' setting.
+"""
+import os
+import json
+import time
+import hashlib
+from typing import Any, Dict, Optional
+
+from ..logging import get_logger
+from ..settings import Settings
+
+DEVICE_STATE_FILENAME = "device_state.json"
+CACHED_METHODS = ("compare_config", "get_config")
+logger = get_logger()
+
+
+def hash_text(text: str) -> str:
+    """
+    Returns sha256 hash of text.
+
+    Args:
+        text (str): text to hash.
+
+    Returns:
+        str: hex digest.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DeviceStateCache:
+    """
+    Stores driver method results for each host with the change marker and
+    inputs they were produced with.
+
+    Diffs are kept in the cache, while active configs are kept as a hash and
+    read from the active config backup so the cache stays small.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        """
+        Args:
+            settings (Settings): config settings.
+        """
+        self.settings = settings
+        self.filepath = os.path.join(settings.cache_path, DEVICE_STATE_FILENAME)
+        self.ttl = settings.device_state_ttl
+        self._modified = False
+
+        try:
+            with open(self.filepath, "r", encoding="utf-8") as fh:
+                self._entries: Dict[str, Dict[str, Dict]] = json.load(fh)
+        except (FileNotFoundError, ValueError):
+            self._entries = {}
+
+    def get_inputs(self, host_id: str, method_name: str, kwargs: Dict) -> Optional[str]:
+        """
+        Returns hash of driver method inputs, or None if the method result
+        cannot be cached.
+
+        Args:
+            host_id (str): host ID.
+            method_name (str): name of driver method.
+            kwargs (Dict): driver method arguments.
+
+        Returns:
+            Optional[str]: inputs hash.
+        """
+        if method_name == "get_config":
+            return hash_text(f"{kwargs.get('format')}:{kwargs.get('sanitized')}")
+
+        if method_name == "compare_config":
+            try:
+                with open(kwargs["config_filepath"], "r", encoding="utf-8") as fh:
+                    return hash_text(fh.read())
+            except FileNotFoundError:
+                logger.debug(f"[{host_id}] no staged config to cache diff for")
+
+        return None
+
+    def get(
+        self,
+        host_id: str,
+        method_name: str,
+        inputs: str,
+        marker: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Returns cached result when the host reports the same change marker, or
+        when no marker is supplied and the result is within the ttl. The ttl
+        only applies to results of hosts which did not report a marker, so
+        hosts which report markers are always checked for changes.
+
+        Args:
+            host_id (str): host ID.
+            method_name (str): name of driver method.
+            inputs (str): inputs hash.
+            marker (str): change marker reported by the host.
+
+        Returns:
+            Optional[str]: cached result, or None if host may have changed.
+        """
+        entry = self._entries.get(host_id, {}).get(method_name)
+        if not entry or entry["inputs"] != inputs:
+            return None
+
+        if marker is None:
+            if entry["marker"] is not None:
+                return None  # host must be connected to check its marker
+            if time.time() - entry["timestamp"] > self.ttl:
+                return None
+        elif marker != entry["marker"]:
+            return None
+        else:
+            entry["timestamp"] = time.time()
+            self._modified = True
+
+        if method_name == "get_config":
+            return self._read_active_config(host_id, entry["output_hash"])
+        return entry["output"]
+
+    def set(
+        self,
+        host_id: str,
+        method_name: str,
+        inputs: str,
+        marker: Optional[str],
+        output: Any,
+    ) -> None:
+        """
+        Stores result produced by host.
+
+        Args:
+            host_id (str): host ID.
+            method_name (str): name of driver method.
+            inputs (str): inputs hash.
+            marker (str): change marker reported by the host.
+            output (Any): driver method result.
+        """
+        entry = {"inputs": inputs, "marker": marker, "timestamp": time.time()}
+        if method_name == "get_config":
+            entry["output_hash"] = hash_text(output or "")
+        else:
+            entry["output"] = output
+
+        self._entries.setdefault(host_id, {})[method_name] = entry
+        self._modified = True
+
+    def discard(self, host_id: str) -> None:
+        """
+        Removes cached results for host, e.g. after a config has been applied.
+
+        Args:
+            host_id (str): host ID.
+        """
+        if self._entries.pop(host_id, None) is not None:
+            self._modified = True
+
+    def save(self) -> None:
+        """
+        Writes cache to file if it has been modified.
+        """
+        if not self._modified:
+            return
+
+        os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+        with open(self.filepath, "w", encoding="utf-8") as fh:
+            json.dump(self._entries, fh)
+        self._modified = False
+        logger.debug(f"device state cache written to file: {self.filepath}")
+
+    def _read_active_config(self, host_id: str, output_hash: str) -> Optional[str]:
+        """
+        Returns active config backup if it matches the cached hash.
+        """
+        filepath = (
+            f"{self.settings.kit_path}/{self.settings.active_configs_dir}/"
+            f"{host_id}.{self.settings.configs_file_extension}"
+        )
+        try:
+            with open(filepath, "r", encoding="utf-8") as fh:
+                config = fh.read()
+        except FileNotFoundError:
+            return None
+
+        # Config files are written with a newline at EOF
+        config = config[:-1] if config.endswith("\n") else config
+        if hash_text(config) != output_hash:
+            logger.debug(f"[{host_id}] active config backup does not match cache")
+            return None
+        return config
@@ -0,0 +1,192 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Content addressed store which keeps the history of staged, active and diff
+configs written by each run.
+
+Configs are stored once as compressed blobs named by their hash, and each run
+writes a manifest which maps host.id to blob hash. A config which has not
+changed since the previous run only costs a manifest entry, and the config of
+a host at any run is found by reading one manifest and one blob.
+
+    store/
+        objects/ab/cdef...  # zlib compressed config named by sha256 hash
+        runs/20260101T000000-staged-1a2b3c.json.gz  # manifest for one run
+"""
+import os
+import gzip
+import json
+import time
+import uuid
+import zlib
+import hashlib
+from glob import glob, escape
+from typing import Dict, List, Literal, Optional
+
+from ..logging import get_logger
+from ..settings import Settings
+
+STORE_DIRNAME = "store"
+ConfigKind = Literal["staged", "active", "diffs"]
+logger = get_logger()
+
+
+class ConfigStore:
+    """
+    Stores configs by hash and maps hosts to configs for each run.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        """
+        Args:
+            settings (Settings): config settings.
+        """
+        self.path = os.path.join(settings.cache_path, STORE_DIRNAME)
+        self.objects_path = os.path.join(self.path, "objects")
+        self.runs_path = os.path.join(self.path, "runs")
+
+    def _get_object_filepath(self, digest: str) -> str:
+        return os.path.join(self.objects_path, digest[:2], digest[2:])
+
+    def _get_run_filepath(self, run_id: str) -> str:
+        return os.path.join(self.runs_path, f"{run_id}.json.gz")
+
+    def put(self, config: str) -> str:
+        """
+        Stores config if it is not already stored.
+
+        Args:
+            config (str): config text.
+
+        Returns:
+            str: config hash.
+        """
+        data = config.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        filepath = self._get_object_filepath(digest)
+
+        if not os.path.exists(filepath):
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            tmp_filepath = f"{filepath}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_filepath, "wb") as fh:
+                fh.write(zlib.compress(data))
+            os.replace(tmp_filepath, filepath)  # complete blobs only
+
+        return digest
+
+    def get(self, digest: str) -> str:
+        """
+        Returns config stored with hash.
+
+        Args:
+            digest (str): config hash.
+
+        Returns:
+            str: config text.
+
+        Raises:
+            FileNotFoundError: if config is not found.
+        """
+        with open(self._get_object_filepath(digest), "rb") as fh:
+            return zlib.decompress(fh.read()).decode("utf-8")
+
+    def write_run(self, kind: ConfigKind, configs: Dict[str, str]) -> str:
+        """
+        Stores configs and writes a manifest for the run. Hosts with an empty
+        config are kept in the manifest with no hash.
+
+        Args:
+            kind (str): 'staged', 'active' or 'diffs'.
+            configs (Dict[str, str]): host.id as key and config as value.
+
+        Returns:
+            str: run ID.
+        """
+        ts_start = time.perf_counter()
+        run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{kind}-{uuid.uuid4().hex[:6]}"
+        hosts = {
+            host_id: self.put(conf) if conf else None
+            for host_id, conf in configs.items()
+        }
+
+        os.makedirs(self.runs_path, exist_ok=True)
+        with gzip.open(self._get_run_filepath(run_id), "wt", encoding="utf-8") as fh:
+            json.dump(
+                {"id": run_id, "kind": kind, "timestamp": time.time(), "hosts": hosts},
+                fh,
+            )
+
+        dur = f"{time.perf_counter()-ts_start:0.4f}"
+        logger.info(f"stored {len(hosts)} {kind} configs in run: {run_id} ({dur}s)")
+
+        return run_id
+
+    def get_run(self, run_id: str) -> Dict:
+        """
+        Returns manifest of run.
+
+        Args:
+            run_id (str): run ID.
+
+        Returns:
+            Dict: manifest with run id, kind, timestamp and hosts.
+
+        Raises:
+            FileNotFoundError: if run is not found.
+        """
+        with gzip.open(self._get_run_filepath(run_id), "rt", encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def get_config(self, run_id: str, host_id: str) -> Optional[str]:
+        """
+        Returns config of host at run.
+
+        Args:
+            run_id (str): run ID.
+            host_id (str): host ID.
+
+        Returns:
+            Optional[str]: config text, empty if host had no config, or None if
+                host was not in run.
+
+        Raises:
+            FileNotFoundError: if run is not found.
+        """
+        hosts = self.get_run(run_id)["hosts"]
+        if host_id not in hosts:
+            return None
+        return self.get(hosts[host_id]) if hosts[host_id] else ""
+
+    def list_runs(self, kind: Optional[ConfigKind] = None) -> List[str]:
+        """
+        Returns run IDs from oldest to newest.
+
+        Args:
+            kind (str): optional filter by 'staged', 'active' or 'diffs'.
+
+        Returns:
+            List[str]: run IDs.
+        """
+        suffix = ".json.gz"
+        run_ids = [
+            os.path.basename(f)[: -len(suffix)]
+            for f in glob(f"{escape(self.runs_path)}/*{suffix}")
+        ]
+        if kind:
+            run_ids = [r for r in run_ids if r.split("-")[1] == kind]
+        return sorted(run_ids)
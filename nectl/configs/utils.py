@@ -21,6 +21,7 @@ import shutil
 from typing import Dict
 
 from ..logging import get_logger
+from ..metrics import record_span
 
 
 logger = get_logger()
@@ -68,6 +69,8 @@ def write_configs_to_dir(
                 logger.debug(f"config written to file: {filename}")
             total += 1
 
+    record_span("write", time.perf_counter() - ts_start, files=total)
+
     dur = f"{time.perf_counter()-ts_start:0.4f}"
     logger.info(f"finished writing config files ({dur}s)")
 
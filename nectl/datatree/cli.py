@@ -23,7 +23,7 @@ from tabulate import tabulate
 from .. import Nectl
 from ..logging import logging_opts
 from ..exceptions import DiscoveryError
-from .facts_utils import facts_to_json_string
+from .facts_utils import iter_host_facts, write_facts_json
 
 
 @click.group(help="Inventory and datatree commands.")
@@ -94,6 +94,19 @@ def list_hosts_cmd(
 @click.option("-r", "--role", help="Filter by role.")
 @click.option("-d", "--deployment-group", help="Filter by deployment group.")
 @click.option("--check", help="Check only with no JSON output.", is_flag=True)
+@click.option(
+    "--provenance",
+    help="Include the datatree modules and actions that set each fact.",
+    is_flag=True,
+)
+@click.option(
+    "-o",
+    "--output",
+    help="Output format, 'jsonl' writes one line per host.",
+    type=click.Choice(["json", "jsonl"]),
+    default="json",
+)
+@click.option("--compact", help="Compact JSON with no indentation.", is_flag=True)
 @click.pass_context
 @logging_opts
 def get_facts_cmd(
@@ -104,6 +117,9 @@ def get_facts_cmd(
     role: str,
     deployment_group: str,
     check: bool = False,
+    provenance: bool = False,
+    output: str = "json",
+    compact: bool = False,
 ):
     """
     Use this command to get facts for hosts defined in the datatree.
@@ -120,7 +136,47 @@ def get_facts_cmd(
         print(f"Error: {e}")
         sys.exit(1)
 
-    host_facts = {host.id: host.facts for host in hosts.values()}
+    # Facts are loaded and written one host at a time
+    host_facts = iter_host_facts(
+        settings=ctx.obj["settings"], hosts=hosts.values(), provenance=provenance
+    )
+
+    if check:
+        for _ in host_facts:
+            pass
+    else:
+        write_facts_json(
+            host_facts, sys.stdout, lines=(output == "jsonl"), compact=compact
+        )
+
+
+@datatree.command(
+    name="impacted-hosts", help="List hosts which load datatree files or directories."
+)
+@click.argument("paths", nargs=-1, required=True)
+@click.option("--rebuild", help="Force rebuild of dependency index.", is_flag=True)
+@click.option(
+    "-o",
+    "--output",
+    help="Output format.",
+    type=click.Choice(["text", "json"]),
+    default="text",
+)
+@click.pass_context
+@logging_opts
+def impacted_hosts_cmd(ctx, paths: tuple, rebuild: bool, output: str):
+    """
+    Use this command to list hosts which are impacted by changes to datatree paths.
+    """
+    try:
+        host_ids = Nectl(settings=ctx.obj["settings"]).get_impacted_hosts(
+            paths=list(paths), rebuild=rebuild
+        )
+    except DiscoveryError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
-    if not check:
-        print(facts_to_json_string(host_facts))
+    if output == "json":
+        print(json.dumps(host_ids, indent=4))
+    else:
+        print("\n".join(host_ids))
@@ -0,0 +1,257 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Datatree dependency index which maps datatree modules to the hosts that load them.
+"""
+import os
+import json
+import time
+import hashlib
+import pkgutil
+from glob import glob
+from typing import List, Dict, Iterable
+from dataclasses import dataclass, field
+
+from ..logging import get_logger
+from ..settings import Settings
+from .hosts import Host, get_all_hosts
+
+DEPENDENCY_INDEX_FILENAME = "datatree_index.json"
+logger = get_logger()
+
+
+@dataclass
+class DependencyIndex:
+    """
+    Defines a bipartite index of datatree module files and hosts.
+
+    Module files are stored relative to the kit path, for example:
+        datatree/sites/nyc/common/snmp.py
+    """
+
+    hosts: Dict[str, List[str]] = field(default_factory=dict)
+    signature: str = ""
+
+    def get_modules(self) -> Dict[str, List[str]]:
+        """
+        Returns the reverse index of module files mapped to host IDs.
+
+        Returns:
+            Dict[str, List[str]]: module file as key and list of host IDs.
+        """
+        modules: Dict[str, List[str]] = {}
+        for host_id, host_modules in self.hosts.items():
+            for module in host_modules:
+                modules.setdefault(module, []).append(host_id)
+        return modules
+
+    def get_impacted_hosts(self, paths: Iterable[str]) -> List[str]:
+        """
+        Returns IDs of hosts which load any of the supplied paths. A path can be
+        a datatree file or a directory in which case all files below it match.
+
+        Args:
+            paths (Iterable[str]): file or directory paths relative to kit.
+
+        Returns:
+            List[str]: sorted impacted host IDs.
+        """
+        prefixes = [os.path.normpath(p).rstrip("/") for p in paths]
+
+        return sorted(
+            host_id
+            for host_id, host_modules in self.hosts.items()
+            if any(
+                module == prefix or module.startswith(prefix + "/")
+                for module in host_modules
+                for prefix in prefixes
+            )
+        )
+
+    def dict(self) -> Dict:
+        """
+        Returns index as a dict.
+        """
+        return {"signature": self.signature, "hosts": self.hosts}
+
+
+def _get_module_files(kit_path: str, module_path: str) -> List[str]:
+    """
+    Returns the files which are loaded for a datatree module path. This mirrors
+    how facts are loaded where a package loads its __init__.py and any nested
+    files found one level below it.
+
+    Args:
+        kit_path (str): path to kit.
+        module_path (str): python import path of datatree module.
+
+    Returns:
+        List[str]: module file paths relative to kit.
+    """
+    base = os.path.join(kit_path, *module_path.split("."))
+    files = []
+
+    # Regular packages take precedence over modules and namespace packages
+    if os.path.isfile(os.path.join(base, "__init__.py")):
+        files.append(os.path.join(base, "__init__.py"))
+    elif os.path.isfile(base + ".py"):
+        return [os.path.relpath(base + ".py", kit_path)]
+    elif not os.path.isdir(base):
+        return []
+
+    # Nested files in package
+    for submod_info in pkgutil.iter_modules([base]):
+        if submod_info.ispkg:
+            files.append(os.path.join(base, submod_info.name, "__init__.py"))
+        else:
+            files.append(os.path.join(base, submod_info.name + ".py"))
+
+    return [os.path.relpath(f, kit_path) for f in files]
+
+
+def get_datatree_signature(settings: Settings) -> str:
+    """
+    Returns a signature of the datatree layout which changes when files are
+    added or removed, when host files are modified or when lookup settings
+    change. Changes to the contents of other files do not alter the index.
+
+    Args:
+        settings (Settings): config settings.
+
+    Returns:
+        str: datatree signature.
+    """
+    checksum = hashlib.sha256()
+    checksum.update(
+        json.dumps(
+            [
+                settings.datatree_lookup_paths,
+                settings.hosts_glob_pattern,
+                settings.hosts_hostname_regex,
+                settings.hosts_site_regex,
+                settings.hosts_customer_regex,
+            ]
+        ).encode()
+    )
+
+    # Datatree layout
+    for root, dirs, files in os.walk(settings.datatree_path):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        checksum.update(os.path.relpath(root, settings.kit_path).encode())
+        for filename in sorted(files):
+            if filename.endswith(".py"):
+                checksum.update(filename.encode())
+
+    # Host files hold the core vars used in lookup paths
+    for host_path in sorted(
+        glob(f"{settings.datatree_path}/{settings.hosts_glob_pattern}")
+    ):
+        if os.path.isdir(host_path):
+            host_path = os.path.join(host_path, "__init__.py")
+        if os.path.isfile(host_path):
+            checksum.update(f"{host_path}:{os.stat(host_path).st_mtime_ns}".encode())
+
+    return checksum.hexdigest()
+
+
+def build_dependency_index(
+    settings: Settings, hosts: Iterable[Host]
+) -> DependencyIndex:
+    """
+    Returns a dependency index built from resolved datatree lookup paths without
+    loading any host facts.
+
+    Args:
+        settings (Settings): config settings.
+        hosts (Iterable[Host]): hosts to index.
+
+    Returns:
+        DependencyIndex: datatree dependency index.
+    """
+    index = DependencyIndex()
+    resolved: Dict[str, List[str]] = {}  # module files are shared between hosts
+
+    ts_start = time.perf_counter()
+    logger.debug("start building datatree dependency index")
+
+    for host in hosts:
+        host_modules = []
+        for raw_path in settings.datatree_lookup_paths:
+            try:
+                path = raw_path.format(**host.dict(include_facts=False))
+            except KeyError as e:
+                logger.warning(
+                    f"[{host.id}] datatree path variable missing {e}: {raw_path}"
+                )
+                continue
+
+            if path not in resolved:
+                resolved[path] = _get_module_files(settings.kit_path, path)
+            host_modules.extend(resolved[path])
+
+        index.hosts[host.id] = host_modules
+
+    dur = f"{time.perf_counter()-ts_start:0.4f}"
+    logger.info(
+        f"finished building datatree dependency index for {len(index.hosts)} hosts "
+        f"({dur}s)"
+    )
+
+    return index
+
+
+def get_dependency_index(settings: Settings, rebuild: bool = False) -> DependencyIndex:
+    """
+    Returns the datatree dependency index. A persisted index is used when the
+    datatree signature is unchanged, otherwise it is rebuilt and persisted.
+
+    Args:
+        settings (Settings): config settings.
+        rebuild (bool): force rebuild of index. Defaults to False.
+
+    Returns:
+        DependencyIndex: datatree dependency index.
+
+    Raises:
+        DiscoveryError: if hosts cannot be successfully discovered.
+    """
+    index_filepath = os.path.join(settings.cache_path, DEPENDENCY_INDEX_FILENAME)
+    signature = get_datatree_signature(settings)
+
+    if not rebuild:
+        try:
+            with open(index_filepath, "r", encoding="utf-8") as fh:
+                index = DependencyIndex(**json.load(fh))
+            if index.signature == signature:
+                logger.debug(f"using datatree dependency index: {index_filepath}")
+                return index
+            logger.info("datatree changed, rebuilding dependency index")
+        except (FileNotFoundError, ValueError, TypeError):
+            logger.debug(f"no valid datatree dependency index: {index_filepath}")
+
+    index = build_dependency_index(
+        settings=settings, hosts=get_all_hosts(settings=settings).values()
+    )
+    index.signature = signature
+
+    os.makedirs(settings.cache_path, exist_ok=True)
+    with open(index_filepath, "w", encoding="utf-8") as fh:
+        json.dump(index.dict(), fh)
+    logger.debug(f"datatree dependency index written to file: {index_filepath}")
+
+    return index
@@ -0,0 +1,136 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Fact merge functions which share unchanged data between hosts.
+
+Values defined in datatree modules are imported once and referenced by every
+host that loads them. Merges never modify either side, instead a merge copies
+only the dicts along the paths that change and references everything else.
+This means memory grows with the amount of unique data rather than with the
+number of hosts, so merged facts should be treated as read-only.
+"""
+from collections.abc import MutableMapping, MutableSequence
+from typing import Any, Dict, List, Optional
+
+LEAF_TYPES = (bytes, str, int, float, bool, type(None))
+
+Owned = Dict[int, Any]  # Containers created by merges mapped by id.
+
+
+def merge_facts(dst: Dict, src: Dict, owned: Optional[Owned] = None) -> Dict:
+    """
+    Returns a dict with src merged into dst using additive semantics:
+
+    - keys missing from dst are added.
+    - dicts are merged recursively.
+    - lists are appended with src items after dst items.
+    - values of different types and leaf values are replaced by src.
+    - any other values of the same type keep the dst value.
+
+    Neither dst or src are modified and any unchanged values are shared with
+    them rather than copied.
+
+    When an owned dict is supplied merges run in accumulate mode. Containers
+    created by a merge are recorded in owned and updated in place by later
+    merges instead of being copied again. Owned keeps a reference to each
+    container so that ids cannot be reused while it is in use.
+
+    Args:
+        dst (Dict): facts being merged into.
+        src (Dict): facts to merge.
+        owned (Owned): optional containers which can be updated in place.
+
+    Returns:
+        Dict: merged facts.
+    """
+    if owned is None:
+        merged = dict(dst)
+    elif id(dst) in owned:
+        merged = dst
+    else:
+        merged = dict(dst)
+        owned[id(merged)] = merged
+
+    for key, value in src.items():
+        if key in merged:
+            merged[key] = _merge_value(merged[key], value, owned)
+        else:
+            merged[key] = value
+
+    return merged
+
+
+def merge_list(dst: List, src: List, owned: Optional[Owned] = None) -> List:
+    """
+    Returns a list with src items followed by dst items. This is the order used
+    when merging top-level list facts where the most specific values are first.
+
+    Args:
+        dst (List): facts being merged into.
+        src (List): facts to merge.
+        owned (Owned): optional containers which can be updated in place.
+
+    Returns:
+        List: merged facts.
+    """
+    if owned is not None and id(dst) in owned:
+        dst[:0] = src
+        return dst
+
+    merged = src + dst
+    if owned is not None:
+        owned[id(merged)] = merged
+    return merged
+
+
+def _merge_value(target: Any, value: Any, owned: Optional[Owned]) -> Any:
+    """
+    Returns the merged result of an existing value and a new value.
+    """
+    target_type = type(target)
+    value_type = type(value)
+
+    # Fast paths for builtin containers
+    if target_type is dict and value_type is dict:
+        return merge_facts(target, value, owned)
+    if target_type is list and value_type is list:
+        return _extend_list(target, value, owned)
+
+    if isinstance(target, MutableMapping) and isinstance(value, MutableMapping):
+        return merge_facts(target, value, owned)
+    if isinstance(target, MutableSequence) and isinstance(value, MutableSequence):
+        return _extend_list(target, value, owned)
+
+    if target_type is not value_type or isinstance(target, LEAF_TYPES):
+        return value
+
+    return target
+
+
+def _extend_list(target: Any, value: Any, owned: Optional[Owned]) -> Any:
+    """
+    Returns target list followed by value items.
+    """
+    if owned is not None and id(target) in owned:
+        target.extend(value)
+        return target
+
+    merged = target + value
+    if owned is not None:
+        owned[id(merged)] = merged
+    return merged
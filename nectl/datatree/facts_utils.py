@@ -24,22 +24,34 @@ import time
 import importlib
 import pkgutil
 from types import ModuleType
-from typing import List, Dict, TYPE_CHECKING
+from typing import (
+    Any,
+    Callable,
+    List,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    TextIO,
+    Tuple,
+    TYPE_CHECKING,
+)
 from dataclasses import is_dataclass
 from enum import Enum
 from ipaddress import IPv4Interface
 from pydantic import BaseModel  # pylint: disable=E0611
-from dpath import merge, MergeType
 
 from ..logging import get_logger
+from ..metrics import record_span
 from ..settings import Settings
 from .actions import Actions
+from .facts_merge import merge_facts, merge_list, Owned
 
 if TYPE_CHECKING:
     from .hosts import Host
 
 VALID_DATA_TYPES = (list, dict, str, int, float)
-MERGE_TYPE = MergeType.ADDITIVE
+_SERIALIZERS: Dict[type, Callable[[Any], Any]] = {}
 logger = get_logger()
 
 
@@ -73,13 +85,20 @@ def get_facts_for_hosts(
     return facts
 
 
-def load_host_facts(settings: Settings, host: "Host") -> Dict:
+def load_host_facts(
+    settings: Settings, host: "Host", provenance: Optional[Dict[str, Dict]] = None
+) -> Dict:
     """
     Loads datatree and returns facts for a single host.
 
+    When a provenance dict is supplied it is populated with an item per top-level
+    fact containing the action and module that last wrote it and the chain of
+    modules that were merged to produce the value.
+
     Args:
         settings (Settings): config settings.
         host (BaseHost): host instance.
+        provenance (Dict[str, Dict]): optional dict used to capture provenance.
 
     Returns:
         Dict: host facts.
@@ -90,10 +109,12 @@ def load_host_facts(settings: Settings, host: "Host") -> Dict:
         sys.path.insert(0, settings.kit_path)
 
     frozen_vars = []  # Used for immutable/protected vars.
+    owned: Owned = {}  # Merged containers only used by this host.
     facts = {**host.dict(include_facts=False)}  # Add host inventory facts.
 
+    host_id = host.id  # used in hot path log messages
     ts_start = time.perf_counter()
-    logger.debug(f"[{host.id}] start loading facts")
+    logger.debug(f"[{host_id}] start loading facts")
 
     def _load_vars(mod: ModuleType):
         """
@@ -124,6 +145,12 @@ def load_host_facts(settings: Settings, host: "Host") -> Dict:
             if var_action == Actions.frozen and var not in frozen_vars:
                 frozen_vars.append(var)
                 facts[var] = getattr(mod, var)  # set value first and only time
+                if provenance is not None:
+                    provenance[var] = {
+                        "action": var_action,
+                        "module": mod.__name__,
+                        "chain": [mod.__name__],
+                    }
                 continue
 
             # Skip frozen variables
@@ -135,18 +162,29 @@ def load_host_facts(settings: Settings, host: "Host") -> Dict:
 
             # List explicit merge
             if var_type == list and var_action == Actions.merge_with:
-                facts[var] = getattr(mod, var) + facts.get(var, [])
+                facts[var] = merge_list(facts.get(var, []), getattr(mod, var), owned)
 
             # Dict explicit merge
             elif var_type == dict and var_action == Actions.merge_with:
-                facts[var] = merge(
-                    facts.get(var, {}), getattr(mod, var), flags=MERGE_TYPE
-                )
+                facts[var] = merge_facts(facts.get(var, {}), getattr(mod, var), owned)
 
             # Replace
             else:
                 facts[var] = getattr(mod, var)
 
+            if provenance is not None:
+                # Merges extend the chain and anything else starts a new chain
+                chain = provenance.get(var, {}).get("chain", [])
+                provenance[var] = {
+                    "action": var_action,
+                    "module": mod.__name__,
+                    "chain": (
+                        chain + [mod.__name__]
+                        if var_action == Actions.merge_with and var_type in (list, dict)
+                        else [mod.__name__]
+                    ),
+                }
+
     for raw_path in settings.datatree_lookup_paths:
         try:
             path = raw_path.format(
@@ -164,17 +202,17 @@ def load_host_facts(settings: Settings, host: "Host") -> Dict:
 
             # Check if directory
             if getattr(mod, "__name__") == getattr(mod, "__package__"):
-                logger.debug(f"[{host.id}] imported directory module: {path}")
+                logger.debug("[%s] imported directory module: %s", host_id, path)
             else:
-                logger.debug(f"[{host.id}] imported file module: {path}")
+                logger.debug("[%s] imported file module: %s", host_id, path)
 
             # Load python file or module __init__.py if is directory
-            logger.debug(f"[{host.id}] loading facts file: {path}")
+            logger.debug("[%s] loading facts file: %s", host_id, path)
             _load_vars(mod)
 
         except ModuleNotFoundError:
             logger.debug(
-                f"[{host.id}] module not found path='{path}' raw_path='{raw_path}'"
+                "[%s] module not found path='%s' raw_path='%s'", host_id, path, raw_path
             )
             continue
 
@@ -189,7 +227,7 @@ def load_host_facts(settings: Settings, host: "Host") -> Dict:
             for submod_info in pkgutil.iter_modules(getattr(mod, "__path__")):
                 try:
                     logger.debug(
-                        f"[{host.id}] loading facts file: {path}.{submod_info.name}"
+                        "[%s] loading facts file: %s.%s", host_id, path, submod_info.name
                     )
                     submod = importlib.import_module(path + "." + submod_info.name)
                     _load_vars(submod)
@@ -200,36 +238,141 @@ def load_host_facts(settings: Settings, host: "Host") -> Dict:
                     logger.exception(e)
                     sys.exit(1)
 
+    record_span("facts", time.perf_counter() - ts_start, host=host.id, site=host.site)
+
     dur = f"{time.perf_counter()-ts_start:0.4f}"
     logger.info(f"[{host.id}] finished loading facts ({dur}s)")
 
     return facts
 
 
-def facts_to_json_string(facts: Dict) -> str:
+def iter_host_facts(
+    settings: Settings, hosts: Iterable["Host"], provenance: bool = False
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yields facts for one host at a time so that facts for all hosts do not
+    need to be held in memory. Facts already loaded by a host, such as when
+    evaluating a filter, are reused instead of loaded again.
+
+    Args:
+        settings (Settings): config settings.
+        hosts (Iterable[Host]): hosts to load facts for.
+        provenance (bool): include fact provenance. Defaults to False.
+
+    Yields:
+        Tuple[str, Dict]: host ID and facts, or facts and provenance when
+            provenance is True.
+    """
+    for host in hosts:
+        if provenance and host._provenance is not None:
+            yield host.id, {"provenance": host._provenance, "facts": host._facts}
+        elif provenance:
+            host_provenance: Dict[str, Dict] = {}
+            facts = load_host_facts(
+                settings=settings, host=host, provenance=host_provenance
+            )
+            yield host.id, {"provenance": host_provenance, "facts": facts}
+        elif host._facts is not None:
+            yield host.id, host._facts
+        else:
+            yield host.id, load_host_facts(settings=settings, host=host)
+
+
+def _get_type_serializer(data_type: type) -> Callable[[Any], Any]:
+    """
+    Returns function used to help JSON encoder with an unfamiliar type.
+    """
+    if issubclass(data_type, BaseModel):
+        if hasattr(data_type, "model_dump"):
+            return data_type.model_dump
+        return data_type.dict
+    if issubclass(data_type, Enum):
+        return lambda data: data.value
+    if issubclass(data_type, IPv4Interface):
+        return str
+    if is_dataclass(data_type):
+        return vars
+
+    return str
+
+
+def _serializer(data: Any) -> Any:
+    """
+    Method used to help JSON encoder with unfamiliar objects. Serializers are
+    resolved once per type and cached.
+    """
+    data_type = type(data)
+    try:
+        serializer = _SERIALIZERS[data_type]
+    except KeyError:
+        serializer = _SERIALIZERS[data_type] = _get_type_serializer(data_type)
+    return serializer(data)
+
+
+def _get_json_encoder(compact: bool = False) -> json.JSONEncoder:
+    """
+    Returns JSON encoder used for facts.
+    """
+    if compact:
+        return json.JSONEncoder(separators=(",", ":"), default=_serializer)
+    return json.JSONEncoder(indent=4, default=_serializer)
+
+
+def facts_to_json_string(facts: Dict, compact: bool = False) -> str:
     """
     Returns string encoded JSON dump from facts
 
     Args:
         facts (Dict): facts data.
+        compact (bool): use compact output with no indentation.
 
     Returns:
         str: JSON encoded string.
     """
+    return _get_json_encoder(compact=compact).encode(facts)
 
-    def _serializer(data):
-        """
-        Method used to help JSON encoder with unfamiliar objects.
-        """
-        if isinstance(data, BaseModel):
-            return data.dict()
-        if isinstance(data, Enum):
-            return data.value
-        if isinstance(data, IPv4Interface):
-            return str(data)
-        if is_dataclass(data):
-            return vars(data)
-
-        return str(data)
-
-    return json.dumps(facts, indent=4, default=_serializer)
+
+def write_facts_json(
+    host_facts: Iterable[Tuple[str, Dict]],
+    fh: TextIO,
+    lines: bool = False,
+    compact: bool = False,
+) -> int:
+    """
+    Writes facts to a file one host at a time. The output is a single JSON
+    object which matches facts_to_json_string, or when using lines one JSON
+    object per line for each host.
+
+    Args:
+        host_facts (Iterable[Tuple[str, Dict]]): host ID and facts pairs.
+        fh (TextIO): file to write to.
+        lines (bool): write JSON lines. Defaults to False.
+        compact (bool): use compact output with no indentation.
+
+    Returns:
+        int: total hosts written.
+    """
+    encoder = _get_json_encoder(compact=compact or lines)
+    total = 0
+
+    for host_id, facts in host_facts:
+        if lines:
+            fh.write("{" + json.dumps(host_id) + ":" + encoder.encode(facts) + "}\n")
+        elif compact:
+            fh.write(("," if total else "{") + json.dumps(host_id) + ":")
+            fh.write(encoder.encode(facts))
+        else:
+            fh.write(("," if total else "{") + "\n    " + json.dumps(host_id) + ": ")
+            fh.write(encoder.encode(facts).replace("\n", "\n    "))
+        total += 1
+
+    if not lines:
+        if not total:
+            fh.write("{}")
+        elif compact:
+            fh.write("}")
+        else:
+            fh.write("\n}")
+        fh.write("\n")
+
+    return total
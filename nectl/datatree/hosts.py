@@ -18,6 +18,7 @@
 import re
 import sys
 import time
+import logging
 import importlib
 from typing import Optional, Union, Any, List, Dict
 from glob import glob
@@ -25,6 +26,7 @@ from dataclasses import dataclass, field
 from ipaddress import AddressValueError, IPv4Address
 
 from ..logging import get_logger
+from ..metrics import record_span
 from ..exceptions import DiscoveryError
 from ..settings import Settings, get_settings
 from .facts_utils import load_host_facts
@@ -54,6 +56,7 @@ class Host:
     username: Optional[str] = None
     password: Optional[str] = None
     _facts: Union[Dict, None] = None
+    _provenance: Union[Dict, None] = None
     _settings: Settings = field(default_factory=get_settings)
 
     def __post_init__(self):
@@ -92,13 +95,27 @@ class Host:
             self._facts = load_host_facts(host=self, settings=self._settings)
         return self._facts
 
+    @property
+    def provenance(self) -> Dict:
+        """
+        Returns provenance of top-level facts. Facts are reloaded the first
+        time this is accessed so that provenance can be captured.
+        """
+        if self._provenance is None:
+            self._provenance = {}
+            self._facts = load_host_facts(
+                host=self, settings=self._settings, provenance=self._provenance
+            )
+        return self._provenance
+
     def __getattr__(self, name):
         """
         Handles access to attributes that are not explicitly defined. If an
         attribute exists in host facts then the value will be returned.
         """
         if not name.startswith("_") and name in self.facts:
-            logger.debug(f"[{self.id}] fetching fact '{name}'")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] fetching fact '%s'", self.id, name)
             return self.facts[name]
 
         if not name.startswith("_") and name not in self.facts:
@@ -117,10 +134,12 @@ class Host:
             "role",
             "mgmt_ip",
             "_facts",
+            "_provenance",
             "_settings",
         )  # don't try find value in facts
         if object.__getattribute__(self, name) is None and name not in ignored_attrs:
-            logger.debug(f"[{self.id}] fetching fact '{name}'")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] fetching fact '%s'", self.id, name)
             return object.__getattribute__(self, "facts").get(name)
 
         return object.__getattribute__(self, name)
@@ -361,6 +380,8 @@ def get_all_hosts(settings: Settings) -> Dict[str, Host]:
         logger.debug(f"found host '{new_host.id}' in: {host_dir}")
         hosts[new_host.id] = new_host
 
+    record_span("discovery", time.perf_counter() - ts_start, hosts=len(hosts))
+
     dur = f"{time.perf_counter()-ts_start:0.4f}"
     logger.info(f"finished discovery of {len(hosts)} hosts ({dur}s)")
 
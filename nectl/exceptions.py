@@ -66,6 +66,30 @@ class DriverError(Exception):
     """
 
 
+class DriverConnectionError(DriverError):
+    """
+    Indicates that the host driver failed to connect or timed out.
+    """
+
+
+class DriverLockError(DriverError):
+    """
+    Indicates that the host driver failed to take the config lock.
+    """
+
+
+class DriverAuthError(DriverError):
+    """
+    Indicates that the host was reachable but authentication failed.
+    """
+
+
+class DriverCircuitOpenError(DriverError):
+    """
+    Indicates that a host was skipped as its site has too many failed connections.
+    """
+
+
 class DriverNotConnectedError(Exception):
     """
     Indicates that a driver method has been run with no connection to host.
@@ -91,6 +115,12 @@ class DriverCommitDisconnectError(Exception):
         self.diff = diff
 
 
+class RolloutHaltedError(Exception):
+    """
+    Indicates that a rollout stopped after a wave exceeded error thresholds.
+    """
+
+
 class ChecksError(Exception):
     """
     Indicates that an error has been encountered during checks execution.
@@ -15,12 +15,18 @@
 # You should have received a copy of the GNU General Public License
 # along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
 import sys
+import zlib
+import queue
+import atexit
 import logging
 import logging.config
+import logging.handlers
 import platform
 import functools
-from typing import Callable, TypeVar
+from collections import OrderedDict
+from typing import Callable, List, Optional, TypeVar
 import click
 
 from .settings import get_settings
@@ -30,7 +36,11 @@ from .exceptions import SettingsFileError
 T = TypeVar("T")
 
 CONSOLE_LOGGING_LEVEL = logging.WARNING
-FILE_LOGGING_LEVEL = logging.DEBUG
+FILE_LOGGING_LEVEL = logging.getLevelName(os.getenv("NECTL_LOG_LEVEL", "DEBUG").upper())
+if not isinstance(FILE_LOGGING_LEVEL, int):
+    FILE_LOGGING_LEVEL = logging.DEBUG  # unknown level names are ignored
+HOSTS_LOGGING_DIR = os.getenv("NECTL_LOG_HOSTS_DIR", "")
+HOSTS_LOGGING_MAX_OPEN = 64
 try:
     FILE_LOGGING_FILENAME = get_settings().kit_path + "/nectl.log"
 except SettingsFileError:
@@ -47,7 +57,7 @@ LOGGING_CONFIG = {
             "handlers": ["file"],
         },
         "nectl": {
-            "level": "DEBUG",
+            "level": min(FILE_LOGGING_LEVEL, CONSOLE_LOGGING_LEVEL),
             "handlers": ["console"],
         },
     },
@@ -79,7 +89,210 @@ LOGGING_CONFIG = {
         },
     },
 }
+
+
+def get_record_host(record: logging.LogRecord) -> Optional[str]:
+    """
+    Returns host ID of a log record which is read from the 'host' extra or
+    from a message that starts with '[host.id]'.
+
+    Args:
+        record (logging.LogRecord): log record.
+
+    Returns:
+        Optional[str]: host ID, or None if record is not for a host.
+    """
+    host = getattr(record, "host", None)
+    if host:
+        return str(host)
+
+    msg = record.msg
+    if not isinstance(msg, str) or not msg.startswith("["):
+        return None
+    if msg.startswith("[%s]") and record.args:
+        return str(record.args[0])
+    end = msg.find("]")
+    return msg[1:end] if end > 1 else None
+
+
+class HostSampleFilter(logging.Filter):
+    """
+    Keeps records below WARNING for a sample of hosts. Hosts are sampled using
+    a hash of their ID so that all records for a sampled host are kept.
+    """
+
+    def __init__(self, rate: float) -> None:
+        """
+        Args:
+            rate (float): fraction of hosts to keep between 0 and 1.
+        """
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        host = get_record_host(record)
+        if host is None:
+            return True
+        return zlib.crc32(host.encode()) / 0xFFFFFFFF < self.rate
+
+
+class HostFileHandler(logging.Handler):
+    """
+    Writes host records to a log file per host. Least recently used files are
+    closed when too many are open.
+    """
+
+    def __init__(self, directory: str, max_open: int = HOSTS_LOGGING_MAX_OPEN):
+        """
+        Args:
+            directory (str): directory to write host log files to.
+            max_open (int): maximum open files.
+        """
+        super().__init__()
+        self.directory = directory
+        self.max_open = max_open
+        self._handlers: OrderedDict[str, logging.FileHandler] = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        host = get_record_host(record)
+        if host is None:
+            return
+
+        handler = self._handlers.pop(host, None)
+        if handler is None:
+            handler = logging.FileHandler(
+                os.path.join(self.directory, f"{host}.log"), encoding="utf-8"
+            )
+            handler.setFormatter(self.formatter)
+            if len(self._handlers) >= self.max_open:
+                self._handlers.popitem(last=False)[1].close()
+        self._handlers[host] = handler
+        handler.emit(record)
+
+    def close(self) -> None:
+        for handler in self._handlers.values():
+            handler.close()
+        self._handlers.clear()
+        super().close()
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler which leaves message formatting to the listener thread.
+    Records are not pickled so they are passed to the queue unchanged.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class QueueLogging:
+    """
+    Moves root logger handlers behind a queue so that formatting and disk
+    writes happen in a listener thread instead of the caller.
+    """
+
+    def __init__(self, handlers: List[logging.Handler]) -> None:
+        """
+        Args:
+            handlers (List[logging.Handler]): handlers used by the listener.
+        """
+        self.handlers = handlers
+        self.queue_handler = LazyQueueHandler(queue.SimpleQueue())
+        self.listener = logging.handlers.QueueListener(
+            self.queue_handler.queue, *handlers, respect_handler_level=True
+        )
+
+    def start(self) -> None:
+        """
+        Start listener and replace root handlers with queue handler.
+        """
+        root = logging.getLogger("")
+        for handler in self.handlers:
+            root.removeHandler(handler)
+        root.addHandler(self.queue_handler)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """
+        Stop listener once queued records have been written.
+        """
+        if self.listener._thread is not None:  # pylint: disable=W0212
+            self.listener.stop()
+
+    def after_fork(self) -> None:
+        """
+        Forked processes have no listener thread and may exit without running
+        exit handlers, so they write to the handlers directly.
+        """
+        self.listener._thread = None  # pylint: disable=W0212
+        root = logging.getLogger("")
+        root.removeHandler(self.queue_handler)
+        for handler in self.handlers:
+            root.addHandler(handler)
+
+
+def get_hosts_logging_sample() -> float:
+    """
+    Returns fraction of hosts to keep records below WARNING for, read from the
+    NECTL_LOG_SAMPLE env var.
+
+    Returns:
+        float: sample rate between 0 and 1, or 1 if env var is invalid.
+    """
+    value = os.getenv("NECTL_LOG_SAMPLE", "1.0")
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = -1.0
+
+    if not 0.0 <= rate <= 1.0:
+        get_logger().warning(
+            f"ignoring NECTL_LOG_SAMPLE '{value}' must be a number between 0 and 1"
+        )
+        return 1.0
+
+    return rate
+
+
+def _setup_queue_logging() -> QueueLogging:
+    """
+    Add optional host handler and filters then start queue logging. Queue
+    logging is only started once for each process.
+    """
+    global QUEUE_LOGGING  # pylint: disable=W0603
+    if QUEUE_LOGGING is not None:
+        return QUEUE_LOGGING
+
+    root = logging.getLogger("")
+    handlers = list(root.handlers)
+
+    if HOSTS_LOGGING_DIR:
+        host_handler = HostFileHandler(HOSTS_LOGGING_DIR)
+        host_handler.setLevel(FILE_LOGGING_LEVEL)
+        host_handler.setFormatter(handlers[0].formatter)
+        handlers.append(host_handler)
+
+    sample = get_hosts_logging_sample()
+    if sample < 1.0:
+        for handler in handlers:
+            handler.addFilter(HostSampleFilter(sample))
+
+    queue_logging = QueueLogging(handlers)
+    queue_logging.start()
+    atexit.register(queue_logging.stop)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=queue_logging.after_fork)
+
+    QUEUE_LOGGING = queue_logging
+    return queue_logging
+
+
 logging.config.dictConfig(LOGGING_CONFIG)
+QUEUE_LOGGING: Optional[QueueLogging] = None  # started by setup_logging
 
 
 def get_logger() -> logging.Logger:
@@ -120,11 +333,13 @@ def logging_opts(func: Callable[..., T]) -> Callable[..., T]:
 
 def setup_logging(v: int = 0) -> None:
     """
-    Setup logging level based on verbosity flags.
+    Setup logging level based on verbosity flags and start queue logging.
 
     Args:
         v (int): verbosity level.
     """
+    _setup_queue_logging()
+
     # Nectl logger verbosity flag count levels
     nectl_log_levels = {
         0: logging.WARNING,
@@ -136,6 +351,9 @@ def setup_logging(v: int = 0) -> None:
     # Set nectl logger console level, file log level is not changed.
     logging.getLogger("nectl").handlers[0].setLevel(nectl_log_level)
 
+    # Skip creating records that no handler will write
+    logging.getLogger("nectl").setLevel(min(nectl_log_level, FILE_LOGGING_LEVEL))
+
     # All loggers verbosity flag count levels
     all_log_levels = {
         0: logging.ERROR,
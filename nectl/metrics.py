@@ -0,0 +1,259 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Metrics used to instrument fleet operations with spans and counters.
+
+Records are only created when a sink has been added, for example:
+
+    sink = MemorySink()
+    add_sink(sink)
+
+    with span("connect", host="core0.nyc", site="nyc"):
+        ...
+
+    sink.percentiles("connect", 99, by="site")
+"""
+import os
+import json
+import math
+import time
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .logging import get_logger
+
+logger = get_logger()
+_sinks: List["BaseSink"] = []
+
+
+class BaseSink(ABC):
+    """
+    Base class for metrics sinks.
+    """
+
+    @abstractmethod
+    def emit(self, record: Dict[str, Any]) -> None:
+        """
+        Handle a span or counter record.
+
+        Args:
+            record (Dict[str, Any]): metrics record.
+        """
+
+    def close(self) -> None:
+        """
+        Release any resources used by the sink.
+        """
+
+
+class MemorySink(BaseSink):
+    """
+    Sink that keeps records in memory.
+    """
+
+    def __init__(self) -> None:
+        self.records: List[Dict[str, Any]] = []
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        self.records.append(record)
+
+    def spans(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Returns span records with name.
+
+        Args:
+            name (str): span name.
+
+        Returns:
+            List[Dict[str, Any]]: span records.
+        """
+        return [r for r in self.records if r["type"] == "span" and r["name"] == name]
+
+    def counter(self, name: str, by: Optional[str] = None) -> Dict[Any, float]:
+        """
+        Returns counter totals grouped by a label.
+
+        Args:
+            name (str): counter name.
+            by (str): label to group by, totals are keyed on None if not set.
+
+        Returns:
+            Dict[Any, float]: label value as key and total as value.
+        """
+        totals: Dict[Any, float] = {}
+        for record in self.records:
+            if record["type"] == "counter" and record["name"] == name:
+                key = record["labels"].get(by) if by else None
+                totals[key] = totals.get(key, 0) + record["value"]
+        return totals
+
+    def percentiles(
+        self, name: str, q: float, by: Optional[str] = None
+    ) -> Dict[Any, float]:
+        """
+        Returns span duration percentile grouped by a label using the nearest
+        rank method.
+
+        Args:
+            name (str): span name.
+            q (float): percentile between 0 and 100.
+            by (str): label to group by, results are keyed on None if not set.
+
+        Returns:
+            Dict[Any, float]: label value as key and duration as value.
+        """
+        groups: Dict[Any, List[float]] = {}
+        for record in self.spans(name):
+            key = record["labels"].get(by) if by else None
+            groups.setdefault(key, []).append(record["duration"])
+
+        results = {}
+        for key, durations in groups.items():
+            durations.sort()
+            rank = max(1, math.ceil(len(durations) * q / 100))
+            results[key] = durations[rank - 1]
+        return results
+
+
+class FileSink(BaseSink):
+    """
+    Sink that appends records to a JSON lines file.
+    """
+
+    def __init__(self, filepath: str) -> None:
+        """
+        Args:
+            filepath (str): JSON lines file to append records to.
+        """
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        self._fh = open(filepath, "a", encoding="utf-8")
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            self._fh.write(line)
+            self._fh.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._fh.close()
+
+
+def add_sink(sink: BaseSink) -> None:
+    """
+    Add sink that all metrics records are sent to.
+
+    Args:
+        sink (BaseSink): metrics sink.
+    """
+    _sinks.append(sink)
+
+
+def remove_sink(sink: BaseSink) -> None:
+    """
+    Remove and close a sink.
+
+    Args:
+        sink (BaseSink): metrics sink.
+    """
+    if sink in _sinks:
+        _sinks.remove(sink)
+        sink.close()
+
+
+def _emit(record: Dict[str, Any]) -> None:
+    """
+    Send record to all sinks. Sink errors are logged and never raised so that
+    metrics cannot break an operation.
+    """
+    record["timestamp"] = time.time()
+    record["pid"] = os.getpid()
+    for sink in list(_sinks):
+        try:
+            sink.emit(record)
+        except Exception as e:  # pylint: disable=W0703
+            logger.error(f"failed to emit metrics record to {sink}: {e}")
+
+
+def record_span(
+    name: str, duration: float, error: Optional[str] = None, **labels: Any
+) -> None:
+    """
+    Record a span which was timed by the caller.
+
+    Args:
+        name (str): span name.
+        duration (float): duration in seconds.
+        error (str): error type if the operation failed.
+        labels (Any): record labels, e.g. host and site.
+    """
+    if _sinks:
+        _emit(
+            {
+                "type": "span",
+                "name": name,
+                "duration": duration,
+                "error": error,
+                "labels": labels,
+            }
+        )
+
+
+@contextmanager
+def span(name: str, **labels: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a block of code and record it as a span. Labels can be added to the
+    yielded dict inside the block.
+
+    Args:
+        name (str): span name.
+        labels (Any): record labels, e.g. host and site.
+
+    Yields:
+        Dict[str, Any]: span labels.
+    """
+    if not _sinks:
+        yield labels
+        return
+
+    error = None
+    ts_start = time.perf_counter()
+    try:
+        yield labels
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        record_span(name, time.perf_counter() - ts_start, error, **labels)
+
+
+def increment(name: str, value: float = 1, **labels: Any) -> None:
+    """
+    Increment a counter.
+
+    Args:
+        name (str): counter name.
+        value (float): amount to increment by.
+        labels (Any): record labels, e.g. host and site.
+    """
+    if _sinks:
+        _emit({"type": "counter", "name": name, "value": value, "labels": labels})
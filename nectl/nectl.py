@@ -17,18 +17,41 @@
 
 import os
 import time
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import pytest
 
 from .logging import get_logger
 from .settings import load_settings, Settings
-from .exceptions import DriverError, ChecksError
+from .exceptions import DriverError, ChecksError, RolloutHaltedError
 from .datatree.hosts import Host
 from .datatree.hosts import get_filtered_hosts
+from .datatree.dependencies import get_dependency_index
 from .configs.render import render_hosts
+from .configs.profiler import RenderProfiler
 from .configs.utils import write_configs_to_dir
+from .configs.diffs import (
+    DiffGroup,
+    diff_configs_offline,
+    group_diffs,
+    iter_diff_files,
+    write_diff_report,
+)
 from .configs.drivers import run_driver_method_on_hosts
+from .configs.state import DeviceStateCache
+from .configs.store import ConfigStore, ConfigKind
+from .configs.rollout import get_rollout_waves
 from .checks.plugins import ChecksPlugin
+from .checks.runner import run_checks_parallel, PYTEST_NO_TESTS_COLLECTED
+from .checks.reports import (
+    ChecksReporter,
+    get_completed_checks,
+    get_shard_reports,
+    merge_shard_reports,
+    write_junit_report,
+)
+from .checks.snapshots import collect_snapshots
+from .checks.manifest import list_checks_from_manifest, UnsupportedCheckError
+from .checks.incremental import load_check_results, save_check_results
 
 logger = get_logger()
 
@@ -75,12 +98,46 @@ class Nectl:
             deployment_group=deployment_group,
         )
 
-    def render_configs(self, hosts: List[Host]) -> str:
+    def get_impacted_hosts(self, paths: List[str], rebuild: bool = False) -> List[str]:
+        """
+        Get hosts which load any of the supplied datatree files or directories.
+
+        Args:
+            paths (List[str]): datatree file or directory paths.
+            rebuild (bool): force rebuild of the datatree dependency index.
+
+        Returns:
+            List[str]: impacted host IDs.
+
+        Raises:
+            DiscoveryError: when an error has been encountered during data tree discovery.
+        """
+        index = get_dependency_index(settings=self.settings, rebuild=rebuild)
+        return index.get_impacted_hosts(
+            [
+                os.path.relpath(path, self.settings.kit_path)
+                if os.path.isabs(path)
+                else path
+                for path in paths
+            ]
+        )
+
+    def _store_configs(self, kind: ConfigKind, configs: Dict[str, str]) -> None:
+        """
+        Keep configs in the config history store when enabled in settings.
+        """
+        if self.settings.configs_history:
+            ConfigStore(self.settings).write_run(kind=kind, configs=configs)
+
+    def render_configs(
+        self, hosts: List[Host], profiler: Optional[RenderProfiler] = None
+    ) -> str:
         """
         Render configs for hosts and write them to the staged configs directory.
 
         Args:
             hosts (List[Hosts]): hosts to render templates for.
+            profiler (RenderProfiler): optional profiler to record section stats.
 
         Returns:
             str: configs output directory.
@@ -88,13 +145,14 @@ class Nectl:
         Raises:
             RenderError: when render of hosts has encountered an error.
         """
-        configs = render_hosts(settings=self.settings, hosts=hosts)
+        configs = render_hosts(settings=self.settings, hosts=hosts, profiler=profiler)
         output_dir = f"{self.settings.kit_path}/{self.settings.staged_configs_dir}"
         write_configs_to_dir(
             configs=configs,
             output_dir=output_dir,
             extension=self.settings.configs_file_extension,
         )
+        self._store_configs(kind="staged", configs=configs)
         return output_dir
 
     def diff_configs(
@@ -103,31 +161,53 @@ class Nectl:
         username: Optional[str] = None,
         password: Optional[str] = None,
         ssh_private_key_file: Optional[str] = None,
+        offline: bool = False,
+        workers: int = 1,
+        use_cache: bool = False,
     ) -> str:
         """
         Compare rendered config and active configurations on hosts.
 
+        The offline mode compares staged configs to the active config backups
+        in the kit without connecting to hosts.
+
+        When using cache, hosts which report no changes since the previous run
+        and have the same staged config are answered from the device state
+        cache.
+
         Args:
             hosts (List[Hosts]): hosts to generate diff for.
             username (str): optional host username, else reads fact from datatree.
             password (str): optional host username, else reads fact from datatree.
             ssh_private_key_file (str): optional ssh private key file.
+            offline (bool): compare with active config backups.
+            workers (int): total hosts compared at the same time, using worker
+                processes in offline mode.
+            use_cache (bool): reuse diffs of hosts which have not changed.
 
         Returns:
             str: diffs output directory.
 
         Raises:
-            DriverError: when an error has been encountered by the host driver.
+            DriverError: when an error has been encountered by the host driver
+                or when a config backup is missing in offline mode.
         """
-        total_errors, host_outputs = run_driver_method_on_hosts(
-            settings=self.settings,
-            hosts=hosts,
-            method_name="compare_config",
-            description="comparing host configurations",
-            username=username,
-            password=password,
-            ssh_private_key_file=ssh_private_key_file,
-        )
+        if offline:
+            total_errors, host_outputs = diff_configs_offline(
+                settings=self.settings, hosts=hosts, workers=workers
+            )
+        else:
+            total_errors, host_outputs = run_driver_method_on_hosts(
+                settings=self.settings,
+                hosts=hosts,
+                method_name="compare_config",
+                description="comparing host configurations",
+                username=username,
+                password=password,
+                ssh_private_key_file=ssh_private_key_file,
+                state_cache=DeviceStateCache(self.settings) if use_cache else None,
+                workers=workers,
+            )
 
         output_dir = f"{self.settings.kit_path}/{self.settings.config_diffs_dir}"
         write_configs_to_dir(
@@ -135,18 +215,48 @@ class Nectl:
             output_dir=output_dir,
             extension="diff." + self.settings.configs_file_extension,
         )
+        self._store_configs(kind="diffs", configs=host_outputs)
 
         if total_errors:
             raise DriverError(f"{total_errors} errors encountered, see logs above.")
 
         return output_dir
 
+    def report_diffs(self) -> Tuple[List[DiffGroup], str]:
+        """
+        Group hosts with the same config diff and write a report which has
+        each distinct diff once with its hosts.
+
+        Returns:
+            Tuple(List[DiffGroup], str): grouped diffs and report file.
+        """
+        ts_start = time.perf_counter()
+        diffs_dir = f"{self.settings.kit_path}/{self.settings.config_diffs_dir}"
+        groups = group_diffs(
+            iter_diff_files(
+                diffs_dir=diffs_dir,
+                extension="diff." + self.settings.configs_file_extension,
+            )
+        )
+
+        report_filepath = f"{diffs_dir}/{self.settings.diffs_report_filename}"
+        write_diff_report(groups=groups, filepath=report_filepath)
+
+        dur = f"{time.perf_counter()-ts_start:0.4f}"
+        logger.info(
+            f"grouped {sum(len(g.hosts) for g in groups)} host diffs "
+            f"into {len(groups)} distinct diffs ({dur}s)"
+        )
+
+        return groups, report_filepath
+
     def apply_configs(
         self,
         hosts: List[Host],
         username: Optional[str] = None,
         password: Optional[str] = None,
         ssh_private_key_file: Optional[str] = None,
+        workers: int = 1,
     ) -> str:
         """
         Apply rendered config onto hosts.
@@ -156,6 +266,7 @@ class Nectl:
             username (str): optional host username, else reads fact from datatree.
             password (str): optional host username, else reads fact from datatree.
             ssh_private_key_file (str): optional ssh private key file.
+            workers (int): total hosts to apply config on at the same time.
 
         Returns:
             str: diffs output directory.
@@ -171,6 +282,8 @@ class Nectl:
             username=username,
             password=password,
             ssh_private_key_file=ssh_private_key_file,
+            state_cache=DeviceStateCache(self.settings),
+            workers=workers,
         )
 
         output_dir = f"{self.settings.kit_path}/{self.settings.config_diffs_dir}"
@@ -179,27 +292,151 @@ class Nectl:
             output_dir=output_dir,
             extension="diff." + self.settings.configs_file_extension,
         )
+        self._store_configs(kind="diffs", configs=host_outputs)
 
         if total_errors:
             raise DriverError(f"{total_errors} errors encountered, see logs above.")
 
         return output_dir
 
+    def rollout_configs(
+        self,
+        hosts: List[Host],
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        ssh_private_key_file: Optional[str] = None,
+        workers: int = 1,
+        max_error_rate: Optional[float] = None,
+        checks: bool = False,
+        pytest_expression: str = "",
+    ) -> List[Dict]:
+        """
+        Apply rendered config onto hosts in waves ordered by deployment group.
+
+        Each wave is applied to its hosts at the same time using workers. The
+        rollout halts when the fraction of hosts which failed in a wave is more
+        than the max error rate, or when checks are enabled and any checks on
+        the hosts of the wave fail.
+
+        Args:
+            hosts (List[Hosts]): hosts to apply config to.
+            username (str): optional host username, else reads fact from datatree.
+            password (str): optional host username, else reads fact from datatree.
+            ssh_private_key_file (str): optional ssh private key file.
+            workers (int): total hosts to apply config on at the same time.
+            max_error_rate (float): optional override of rollout_max_error_rate.
+            checks (bool): run checks on hosts after each wave.
+            pytest_expression (str): optional pytest match expression for checks.
+
+        Returns:
+            List[Dict]: group, total hosts, errors and failed checks of waves.
+
+        Raises:
+            RolloutHaltedError: when a wave exceeds the error thresholds.
+            DriverError: when errors within the threshold have been encountered.
+        """
+        if max_error_rate is None:
+            max_error_rate = self.settings.rollout_max_error_rate
+
+        waves = get_rollout_waves(hosts=hosts, order=self.settings.rollout_order)
+        state_cache = DeviceStateCache(self.settings)
+        host_outputs: Dict[str, str] = {}
+        summary: List[Dict] = []
+        halted = None
+
+        ts_start = time.perf_counter()
+        logger.info(f"starting rollout of {len(waves)} waves workers={workers}")
+
+        for num, (group, wave_hosts) in enumerate(waves, start=1):
+            errors, outputs = run_driver_method_on_hosts(
+                settings=self.settings,
+                hosts=wave_hosts,
+                method_name="apply_config",
+                description=f"applying host configurations wave {num} '{group}'",
+                username=username,
+                password=password,
+                ssh_private_key_file=ssh_private_key_file,
+                state_cache=state_cache,
+                workers=workers,
+            )
+            host_outputs.update(outputs)
+            wave = {"group": group, "hosts": len(wave_hosts), "errors": errors}
+            summary.append(wave)
+
+            error_rate = errors / len(wave_hosts)
+            if error_rate > max_error_rate:
+                halted = (
+                    f"wave {num} '{group}' error rate {error_rate:0.2f} "
+                    f"is above {max_error_rate:0.2f}"
+                )
+                break
+
+            if checks:
+                try:
+                    result = self.run_checks(
+                        hosts=wave_hosts,
+                        pytest_expression=pytest_expression,
+                        username=username,
+                        password=password,
+                        ssh_private_key_file=ssh_private_key_file,
+                    )
+                except ChecksError as e:
+                    halted = f"wave {num} '{group}' checks error: {e}"
+                    break
+                wave["checks_failed"] = result["failed"]
+                if result["failed"]:
+                    halted = (
+                        f"wave {num} '{group}' has {result['failed']} failed checks"
+                    )
+                    break
+
+            logger.info(f"rollout wave {num} '{group}' completed")
+
+        output_dir = f"{self.settings.kit_path}/{self.settings.config_diffs_dir}"
+        write_configs_to_dir(
+            configs=host_outputs,
+            output_dir=output_dir,
+            extension="diff." + self.settings.configs_file_extension,
+        )
+        self._store_configs(kind="diffs", configs=host_outputs)
+
+        dur = f"{time.perf_counter()-ts_start:0.4f}"
+        logger.info(f"finished rollout of {len(summary)} waves ({dur}s)")
+
+        if halted:
+            remaining = len(waves) - len(summary)
+            raise RolloutHaltedError(
+                f"rollout halted {halted}, {remaining} waves not applied"
+            )
+
+        total_errors = sum(wave["errors"] for wave in summary)
+        if total_errors:
+            raise DriverError(f"{total_errors} errors encountered, see logs above.")
+
+        return summary
+
     def get_configs(
         self,
         hosts: List[Host],
         username: Optional[str] = None,
         password: Optional[str] = None,
         ssh_private_key_file: Optional[str] = None,
+        use_cache: bool = False,
+        workers: int = 1,
     ) -> str:
         """
         Get active configs from hosts.
 
+        When using cache, hosts which report no changes since the previous run
+        keep their active config backup instead of downloading it again.
+
         Args:
             hosts (List[Hosts]): hosts to generate diff for.
             username (str): optional host username, else reads fact from datatree.
             password (str): optional host username, else reads fact from datatree.
             ssh_private_key_file (str): optional ssh private key file.
+            use_cache (bool): reuse backups of hosts which have not changed.
+            workers (int): total hosts to get config from at the same time.
 
         Returns:
             str: active configs output directory.
@@ -215,6 +452,8 @@ class Nectl:
             username=username,
             password=password,
             ssh_private_key_file=ssh_private_key_file,
+            state_cache=DeviceStateCache(self.settings) if use_cache else None,
+            workers=workers,
         )
 
         output_dir = f"{self.settings.kit_path}/{self.settings.active_configs_dir}"
@@ -223,6 +462,7 @@ class Nectl:
             output_dir=output_dir,
             extension=self.settings.configs_file_extension,
         )
+        self._store_configs(kind="active", configs=host_outputs)
 
         if total_errors:
             raise DriverError(f"{total_errors} errors encountered, see logs above.")
@@ -233,13 +473,41 @@ class Nectl:
         self,
         hosts: List[Host],
         pytest_expression: str = "",
+        workers: int = 1,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        ssh_private_key_file: Optional[str] = None,
+        offline: bool = False,
+        incremental: bool = False,
+        resume: bool = False,
     ) -> dict:
         """
         Run checks on hosts.
 
+        When state getters are configured a snapshot of device state is
+        collected once for each host before checks run, unless a snapshot
+        within the TTL already exists. In offline mode no snapshots are
+        collected and checks that use a device are skipped.
+
+        Each result is stored with a fingerprint of the check file and host
+        facts. In incremental mode checks with an unchanged fingerprint are not
+        run and their previous result is reused.
+
+        Results are streamed to a JSON lines report as each check finishes,
+        which is converted to a junit xml report at the end. When resuming,
+        checks already in the JSON lines report from an interrupted run are
+        not run again.
+
         Args:
             hosts (List[Hosts]): hosts to generate diff for.
             pytest_expression (str): optional pytest match expression.
+            workers (int): total worker processes to shard hosts across.
+            username (str): optional host username used by device fixture.
+            password (str): optional host password used by device fixture.
+            ssh_private_key_file (str): optional ssh private key file.
+            offline (bool): use last snapshots and do not connect to hosts.
+            incremental (bool): reuse results of unchanged checks.
+            resume (bool): continue an interrupted run.
 
         Returns:
             dict: {"passed": int, "failed": int, "report": str}
@@ -250,12 +518,19 @@ class Nectl:
         ts_start = time.perf_counter()
         logger.debug("starting checks run")
 
-        # Register plugin with hosts
-        checks_plugin = ChecksPlugin(hosts=hosts)
-
         report_filepath = os.path.join(
             self.settings.kit_path, self.settings.checks_report_filename
         )
+        stream_filepath = os.path.splitext(report_filepath)[0] + ".jsonl"
+
+        completed = None
+        if resume:
+            merge_shard_reports(stream_filepath)  # from interrupted workers
+            completed = get_completed_checks(stream_filepath)
+        else:
+            for filepath in [stream_filepath] + get_shard_reports(stream_filepath):
+                if os.path.exists(filepath):
+                    os.remove(filepath)
 
         pytest_args = [
             "-c=''",
@@ -266,7 +541,6 @@ class Nectl:
             f"-o=python_files={self.settings.checks_prefix}_*.py",
             f"-o=python_classes={self.settings.checks_prefix.capitalize()}",
             f"-o=python_functions={self.settings.checks_prefix}_*",
-            f"--junitxml={report_filepath}",
         ]
 
         if pytest_expression:
@@ -277,20 +551,63 @@ class Nectl:
                 ]
             )
 
-        # Run pytest using checks plugin
-        rc = pytest.main(
-            (
-                pytest_args
-                + [os.path.join(self.settings.kit_path, self.settings.checks_dirname)]
+        checks_path = os.path.join(self.settings.kit_path, self.settings.checks_dirname)
+
+        snapshots_since = time.time()
+        if self.settings.checks_state_getters and not offline:
+            collect_snapshots(
+                settings=self.settings,
+                hosts=hosts,
+                workers=self.settings.checks_max_sessions,
+                username=username,
+                password=password,
+                ssh_private_key_file=ssh_private_key_file,
+            )
+
+        plugin_options = {
+            "settings": self.settings,
+            "username": username,
+            "password": password,
+            "ssh_private_key_file": ssh_private_key_file,
+            "offline": offline,
+            "snapshots_since": snapshots_since,
+            "previous_results": (
+                load_check_results(self.settings) if incremental else None
             ),
-            plugins=[checks_plugin],
-        )
+        }
+
+        if workers > 1 and len(hosts) > 1:
+            # Run pytest in worker processes with hosts sharded between them
+            rc, results = run_checks_parallel(
+                hosts=list(hosts),
+                pytest_args=pytest_args + [checks_path],
+                stream_filepath=stream_filepath,
+                workers=workers,
+                plugin_options=plugin_options,
+                completed=completed,
+            )
+        else:
+            # Register plugin with hosts
+            checks_plugin = ChecksPlugin(hosts=hosts, **plugin_options)
+            reporter = ChecksReporter(filepath=stream_filepath, completed=completed)
+
+            # Run pytest using checks plugin
+            rc = pytest.main(
+                pytest_args + [checks_path],
+                plugins=[checks_plugin, reporter],
+            )
+            results = checks_plugin.results
+
+        # Nothing is left to run when resuming a completed run
+        if resume and rc == PYTEST_NO_TESTS_COLLECTED:
+            rc = 0
+
+        if incremental:
+            save_check_results(self.settings, results)
+        passed, failed = write_junit_report(stream_filepath, report_filepath)
 
         dur = f"{time.perf_counter()-ts_start:0.4f}"
-        logger.info(
-            "finished checks run "
-            f"pass={checks_plugin.passed} fail={checks_plugin.failed} rc={rc} ({dur}s)"
-        )
+        logger.info(f"finished checks run pass={passed} fail={failed} rc={rc} ({dur}s)")
 
         if rc not in [0, 1]:
             raise ChecksError(
@@ -298,8 +615,8 @@ class Nectl:
             )
 
         return {
-            "passed": checks_plugin.passed,
-            "failed": checks_plugin.failed,
+            "passed": passed,
+            "failed": failed,
             "report": report_filepath,
         }
 
@@ -307,13 +624,20 @@ class Nectl:
         self,
         hosts: List[Host],
         pytest_expression: str = "",
+        fast: bool = False,
     ) -> List[str]:
         """
         List checks that will run on hosts.
 
+        The fast mode lists checks using a cached manifest of check files
+        instead of pytest collection. Pytest is still used when a pytest
+        expression is supplied or when checks cannot be determined from the
+        check file source.
+
         Args:
             hosts (List[Hosts]): hosts to generate diff for.
             pytest_expression (str): optional pytest match expression.
+            fast (bool): list checks without pytest collection where possible.
 
         Returns:
             List[str]: list of check names that would run.
@@ -324,8 +648,18 @@ class Nectl:
         ts_start = time.perf_counter()
         logger.debug("starting checks list")
 
+        if fast and not pytest_expression:
+            try:
+                return list_checks_from_manifest(settings=self.settings, hosts=hosts)
+            except UnsupportedCheckError as e:
+                logger.info(f"using pytest to list checks: {e}")
+            except SyntaxError as e:
+                raise ChecksError(f"check file is not valid: {e}") from e
+        elif fast:
+            logger.info("using pytest to list checks with pytest expression")
+
         # Register plugin with hosts
-        checks_plugin = ChecksPlugin(hosts=hosts)
+        checks_plugin = ChecksPlugin(hosts=hosts, settings=self.settings)
 
         pytest_args = [
             "-p",
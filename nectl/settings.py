@@ -86,6 +86,11 @@ class Settings(BaseSettings):
         default="configs/diffs", description="Default configs diffs directory"
     )
 
+    diffs_report_filename: str = Field(
+        default="report.txt",
+        description="Filename in configs diffs directory used for grouped diffs report",
+    )
+
     active_configs_dir: str = Field(
         default="configs/active", description="Default active configs directory"
     )
@@ -94,6 +99,11 @@ class Settings(BaseSettings):
         default="txt", description="Default configs file extension"
     )
 
+    configs_history: bool = Field(
+        default=False,
+        description="Defines whether configs written by each run are kept in the config store",
+    )
+
     configs_format: str = Field(
         default="", description="Config format variable passed to driver methods"
     )
@@ -108,6 +118,16 @@ class Settings(BaseSettings):
         description="Defines a default driver if one is not found (test and use at own risk)",
     )
 
+    rollout_order: List[str] = Field(
+        default=[],
+        description="Deployment groups applied first and in this order by a rollout",
+    )
+
+    rollout_max_error_rate: float = Field(
+        default=0.0,
+        description="Fraction of hosts in a rollout wave that can fail before halting",
+    )
+
     checks_prefix: str = Field(
         default="check",
         description="Check files/functions/classes must start with this value (classes use capitalized value)",
@@ -118,6 +138,76 @@ class Settings(BaseSettings):
         description="Default filename used for checks junit xml report",
     )
 
+    checks_max_sessions: int = Field(
+        default=10,
+        description="Maximum driver sessions kept open by each checks run",
+    )
+
+    checks_keepalive: float = Field(
+        default=0.0,
+        description="Idle seconds before checking a kept open session is connected, 0 disables",
+    )
+
+    checks_state_getters: List[str] = Field(
+        default=[],
+        description="Driver state getters collected once per host before checks run",
+    )
+
+    checks_state_ttl: int = Field(
+        default=300,
+        description="Seconds that a host state snapshot is reused before collecting again",
+    )
+
+    adaptive_sessions: bool = Field(
+        default=False,
+        description="Adjust open driver sessions globally and per site based on host health",
+    )
+
+    site_max_sessions: int = Field(
+        default=0,
+        description="Maximum driver sessions open to one site, 0 uses total workers",
+    )
+
+    session_latency_limit: float = Field(
+        default=10.0,
+        description="Seconds a connection can take before open sessions are reduced",
+    )
+
+    connect_retries: int = Field(
+        default=0,
+        description="Retries of a driver connection which failed or timed out",
+    )
+
+    connect_backoff: float = Field(
+        default=1.0,
+        description="Highest seconds before first connection retry which doubles each retry",
+    )
+
+    site_failure_limit: int = Field(
+        default=0,
+        description="Failed connections in a row before other hosts at site fail fast, 0 disables",
+    )
+
+    site_retry_timeout: float = Field(
+        default=60.0,
+        description="Seconds before a host at a site which failed fast can connect again",
+    )
+
+    device_state_ttl: int = Field(
+        default=0,
+        description="Seconds that cached results are reused without connecting to a host",
+    )
+
+    metrics_filename: Optional[str] = Field(
+        default=None,
+        description="File in kit that metrics spans and counters are appended to",
+    )
+
+    cache_dirname: str = Field(
+        default=".nectl",
+        description="Directory used to store nectl cache and state files",
+    )
+
     @property
     def datatree_path(self) -> str:
         """
@@ -125,6 +215,13 @@ class Settings(BaseSettings):
         """
         return os.path.join(self.kit_path, self.datatree_dirname)
 
+    @property
+    def cache_path(self) -> str:
+        """
+        Returns cache path using kit_path and cache directory name
+        """
+        return os.path.join(self.kit_path, self.cache_dirname)
+
 
 def get_settings() -> Settings:
     """
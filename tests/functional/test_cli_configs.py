@@ -15,11 +15,16 @@
 # You should have received a copy of the GNU General Public License
 # along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import json
 import pytest
-from unittest.mock import patch
+from unittest.mock import patch, ANY
 import click
 
 from nectl.cli import cli_root
+from nectl.configs.diffs import DiffGroup
+from nectl.configs.store import ConfigStore
+from nectl.exceptions import RolloutHaltedError
 
 
 def test_should_return_config_when_running_cli_configs_render_command(
@@ -58,6 +63,77 @@ def test_should_return_config_when_running_cli_configs_render_command(
         assert fh.read() == rendered_config
 
 
+def test_should_write_profile_when_running_cli_configs_render_command_with_profile(
+    cli_runner, mock_settings, mock_template_generator
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN args
+    args = [
+        "configs",
+        "render",
+        "-h",
+        "core0",
+        "-s",
+        "london",
+        "-c",
+        "acme",
+        "--profile",
+    ]
+
+    # GIVEN template exists in kit directory
+    mock_template_generator(settings)
+
+    # WHEN cli command is run
+    result = cli_runner.invoke(cli_root, args)
+
+    # THEN expect to be successful
+    assert result.exit_code == 0
+
+    # THEN expect summary table of sections to be printed
+    assert "fakeos:hostname_section" in result.output
+    assert "fakeos:end_section" in result.output
+
+    # THEN expect profile file to be written
+    profile_filepath = os.path.join(settings.cache_path, "render_profile.json")
+    assert f"render profile written to: {profile_filepath}" in result.output
+    with open(profile_filepath, "r", encoding="utf-8") as fh:
+        profile = json.load(fh)
+    assert profile["sections"]["fakeos:os_section"]["calls"] == 1
+    assert set(profile["hosts"]) == {"core0.london.acme"}
+
+
+def test_should_write_metrics_when_running_cli_configs_render_command_with_metrics_file(
+    cli_runner, mock_settings, mock_template_generator
+):
+    # GIVEN mock settings with metrics file
+    settings = mock_settings
+    settings.metrics_filename = "nectl_metrics.jsonl"
+
+    # GIVEN args
+    args = ["configs", "render", "-h", "core0", "-s", "london", "-c", "acme"]
+
+    # GIVEN template exists in kit directory
+    mock_template_generator(settings)
+
+    # WHEN cli command is run
+    result = cli_runner.invoke(cli_root, args)
+
+    # THEN expect to be successful
+    assert result.exit_code == 0
+
+    # THEN expect metrics file with render span for host
+    with open(
+        os.path.join(settings.kit_path, "nectl_metrics.jsonl"), "r", encoding="utf-8"
+    ) as fh:
+        records = [json.loads(line) for line in fh]
+    assert {"discovery", "facts", "render", "write"} <= {r["name"] for r in records}
+    assert [r["labels"]["host"] for r in records if r["name"] == "render"] == [
+        "core0.london.acme"
+    ]
+
+
 @patch("nectl.configs.cli.Nectl")
 def test_should_run_get_when_running_cli_configs_get_command(
     mock_nectl, cli_runner, mock_settings
@@ -104,6 +180,32 @@ def test_should_run_diff_when_running_cli_configs_diff_command(
     assert "0 config diffs created." in result.output
 
 
+@patch("nectl.configs.cli.Nectl")
+def test_should_run_report_when_running_cli_configs_diff_report_command(
+    mock_nectl, cli_runner, mock_settings, tmp_path
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN report method returns groups and report file
+    group = DiffGroup(digest="abc", diff="+foo", hosts=["core0", "core1"])
+    report_filepath = str(tmp_path / "report.txt")
+    mock_nectl.return_value.report_diffs.return_value = ([group], report_filepath)
+
+    # GIVEN args
+    args = ["configs", "diff-report"]
+
+    # WHEN cli command is run
+    result = cli_runner.invoke(cli_root, args)
+
+    # THEN expect to be successful
+    assert result.exit_code == 0
+
+    # THEN expect output to mention grouped diffs and report file
+    assert "2 config diffs grouped into 1 distinct diffs." in result.output
+    assert f"diff report written to: {report_filepath}" in result.output
+
+
 @patch("nectl.configs.cli.Nectl")
 def test_should_run_apply_when_running_cli_configs_apply_command(
     mock_nectl, cli_runner, mock_settings, tmp_path
@@ -132,3 +234,118 @@ def test_should_run_apply_when_running_cli_configs_apply_command(
 
     # THEN expect output to mention 1 diff was created
     assert "1 config diffs created." in result.output
+
+
+@patch("nectl.configs.cli.Nectl")
+def test_should_run_rollout_when_running_cli_configs_apply_command_with_waves(
+    mock_nectl, cli_runner, mock_settings
+):
+    # GIVEN mock settings
+    settings = mock_settings
+    mock_nectl.return_value.settings = settings
+    os.makedirs(f"{settings.kit_path}/{settings.config_diffs_dir}")
+
+    # GIVEN rollout method returns wave summary
+    mock_nectl.return_value.rollout_configs.return_value = [
+        {"group": "prod_1", "hosts": 2, "errors": 0}
+    ]
+
+    # GIVEN args
+    args = ["configs", "apply", "-y", "--waves", "-w", "4", "--max-error-rate", "0.1"]
+
+    # WHEN cli command is run
+    result = cli_runner.invoke(cli_root, args)
+
+    # THEN expect rollout to be called with options
+    mock_nectl.return_value.rollout_configs.assert_called_with(
+        hosts=ANY,
+        username=None,
+        password=None,
+        ssh_private_key_file=None,
+        workers=4,
+        max_error_rate=0.1,
+        checks=False,
+        pytest_expression=None,
+    )
+
+    # THEN expect to be successful
+    assert result.exit_code == 0
+    assert "1 waves applied." in result.output
+
+    # GIVEN rollout is halted
+    mock_nectl.return_value.rollout_configs.side_effect = RolloutHaltedError("foo")
+
+    # WHEN cli command is run
+    result = cli_runner.invoke(cli_root, args)
+
+    # THEN expect error
+    assert result.exit_code == 1
+    assert "Error: foo" in result.output
+
+
+@pytest.mark.parametrize(
+    "opts", (["--checks"], ["-k", "bgp"], ["--max-error-rate", "0.1"])
+)
+@patch("nectl.configs.cli.Nectl")
+def test_should_error_when_running_cli_configs_apply_command_with_wave_opts_only(
+    mock_nectl, cli_runner, mock_settings, opts
+):
+    # GIVEN args with wave option but without waves
+    args = ["configs", "apply", "-y", *opts]
+
+    # WHEN cli command is run
+    result = cli_runner.invoke(cli_root, args)
+
+    # THEN expect usage error
+    assert result.exit_code == 2
+    assert f"{opts[0]} can only be used with --waves" in result.output
+
+    # THEN expect config not to be applied
+    mock_nectl.return_value.apply_configs.assert_not_called()
+
+
+def test_should_show_history_when_running_cli_configs_history_command(
+    cli_runner, mock_settings
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN stored runs
+    store = ConfigStore(settings)
+    run_id = store.write_run(
+        kind="active", configs={"core0": "ntp 1.1.1.1", "core1": ""}
+    )
+    store.write_run(kind="staged", configs={"core0": "ntp 2.2.2.2"})
+
+    # WHEN listing active runs
+    result = cli_runner.invoke(cli_root, ["configs", "history", "-k", "active"])
+
+    # THEN expect active run only
+    assert result.exit_code == 0
+    assert result.output.split() == [run_id]
+
+    # WHEN showing hosts in run
+    result = cli_runner.invoke(cli_root, ["configs", "history", "--run", run_id])
+
+    # THEN expect host with config hash and host with empty config
+    assert result.exit_code == 0
+    assert result.output.startswith("core0 ")
+    assert "core1 (empty)\n" in result.output
+
+    # WHEN showing host config in run
+    result = cli_runner.invoke(
+        cli_root, ["configs", "history", "--run", run_id, "--host", "core0"]
+    )
+
+    # THEN expect host config
+    assert result.exit_code == 0
+    assert result.output == "ntp 1.1.1.1\n"
+
+    # WHEN showing host config in unknown run
+    result = cli_runner.invoke(
+        cli_root, ["configs", "history", "--run", "foo", "--host", "core0"]
+    )
+
+    # THEN expect error
+    assert result.exit_code == 1
+    assert "Error: run not found: foo" in result.output
@@ -106,3 +106,66 @@ def test_should_return_hosts_when_running_cli_datatree_get_facts_command(
 
     # THEN expect output to match facts
     assert json.loads(result.output) == expected_facts
+
+
+def test_should_return_hosts_when_running_cli_datatree_impacted_hosts_command(
+    cli_runner, mock_settings
+):
+    # GIVEN args with site directory
+    args = [
+        "datatree",
+        "impacted-hosts",
+        "datatree/customers/acme/sites/newyork",
+        "--output",
+        "json",
+    ]
+
+    # WHEN cli command is run
+    result = cli_runner.invoke(cli_root, args)
+
+    # THEN expect to be successful
+    assert result.exit_code == 0
+
+    # THEN expect newyork acme hosts
+    assert json.loads(result.output) == ["core0.newyork.acme", "core1.newyork.acme"]
+
+
+def test_should_return_json_lines_when_running_cli_datatree_get_facts_command(
+    cli_runner, mock_settings
+):
+    # GIVEN args with JSON lines output
+    args = ["datatree", "get-facts", "-s", "london", "-c", "acme", "-o", "jsonl"]
+
+    # WHEN cli command is run
+    result = cli_runner.invoke(cli_root, args)
+
+    # THEN expect to be successful
+    assert result.exit_code == 0
+
+    # THEN expect one compact JSON object per host
+    lines = result.output.splitlines()
+    assert sorted(list(json.loads(line))[0] for line in lines) == [
+        "core0.london.acme",
+        "core1.london.acme",
+    ]
+    assert all(" " not in line for line in lines)
+
+
+def test_should_return_compact_json_when_running_cli_datatree_get_facts_command(
+    cli_runner, mock_settings
+):
+    # GIVEN args with compact output
+    args = ["datatree", "get-facts", "-s", "london", "-c", "acme", "--compact"]
+
+    # WHEN cli command is run
+    result = cli_runner.invoke(cli_root, args)
+
+    # THEN expect to be successful
+    assert result.exit_code == 0
+
+    # THEN expect single line of JSON with both hosts
+    assert len(result.output.splitlines()) == 1
+    assert sorted(json.loads(result.output)) == [
+        "core0.london.acme",
+        "core1.london.acme",
+    ]
@@ -17,14 +17,23 @@
 
 import pytest
 import pathlib
+import os
+import importlib
+import json
+import time
 from unittest.mock import patch, ANY
+from xml.etree import ElementTree
 
 from nectl import Nectl
 from nectl.datatree.hosts import Host
+from nectl.checks.incremental import get_results_filepath
+from nectl.checks.snapshots import get_snapshot_filepath
 from nectl.exceptions import (
+    ChecksError,
     DriverCommitDisconnectError,
     DriverError,
     DriverNotFoundError,
+    RolloutHaltedError,
 )
 
 
@@ -186,6 +195,92 @@ def test_should_create_file_when_running_nectl_diff_configs_method(
         assert fh.read() == "foodiff\n"
 
 
+@pytest.mark.parametrize("workers", (1, 2))
+@patch("nectl.nectl.run_driver_method_on_hosts")
+def test_should_create_diff_files_when_running_nectl_diff_configs_offline(
+    mock_driver_method, mock_settings, workers
+):
+    # GIVEN mock settings
+    settings = mock_settings
+    extension = settings.configs_file_extension
+
+    # GIVEN hosts
+    hosts = [
+        Host(hostname=hostname, site="london", _facts={}, _settings=None)
+        for hostname in ("core0", "core1", "core2")
+    ]
+
+    # GIVEN active config backups and staged configs
+    for host, staged in zip(hosts, ("ntp server 1.1.1.1", "ntp server 2.2.2.2")):
+        for dirname, config in (
+            (settings.active_configs_dir, "ntp server 1.1.1.1"),
+            (settings.staged_configs_dir, staged),
+        ):
+            os.makedirs(f"{settings.kit_path}/{dirname}", exist_ok=True)
+            with open(
+                f"{settings.kit_path}/{dirname}/{host.id}.{extension}",
+                "w",
+                encoding="utf-8",
+            ) as fh:
+                fh.write(config)
+
+    # WHEN running diff method offline
+    with pytest.raises(DriverError) as error:
+        Nectl(settings=settings).diff_configs(
+            hosts=hosts, offline=True, workers=workers
+        )
+
+    # THEN expect error for host with no configs
+    assert "1 errors encountered" in str(error.value)
+
+    # THEN expect no connection to hosts
+    assert not mock_driver_method.called
+
+    # THEN expect diff file only for host with changes
+    diffs_dir = f"{settings.kit_path}/{settings.config_diffs_dir}"
+    assert os.listdir(diffs_dir) == [f"core1.london.diff.{extension}"]
+    with open(
+        f"{diffs_dir}/core1.london.diff.{extension}", "r", encoding="utf-8"
+    ) as fh:
+        assert fh.read() == "- ntp server 1.1.1.1\n+ ntp server 2.2.2.2\n"
+
+
+def test_should_write_report_when_running_nectl_report_diffs_method(mock_settings):
+    # GIVEN mock settings
+    settings = mock_settings
+    extension = settings.configs_file_extension
+
+    # GIVEN diff files where two hosts have the same change
+    diffs_dir = f"{settings.kit_path}/{settings.config_diffs_dir}"
+    os.makedirs(diffs_dir)
+    for host_id, diff in (
+        ("core0.london", "+ ntp server 2.2.2.2"),
+        ("core1.london", "+ ntp server 2.2.2.2  "),
+        ("edge0.london", "- snmp location old"),
+    ):
+        with open(
+            f"{diffs_dir}/{host_id}.diff.{extension}", "w", encoding="utf-8"
+        ) as fh:
+            fh.write(diff + "\n")
+
+    # WHEN running report diffs method
+    groups, report_filepath = Nectl(settings=settings).report_diffs()
+
+    # THEN expect hosts grouped by diff
+    assert [group.hosts for group in groups] == [
+        ["core0.london", "core1.london"],
+        ["edge0.london"],
+    ]
+
+    # THEN expect report with one copy of each diff
+    assert report_filepath == f"{diffs_dir}/{settings.diffs_report_filename}"
+    with open(report_filepath, "r", encoding="utf-8") as fh:
+        report = fh.read()
+    assert report.startswith("# 2 distinct diffs for 3 hosts\n")
+    assert report.count("+ ntp server 2.2.2.2") == 1
+    assert "core0.london\ncore1.london\n\n+ ntp server 2.2.2.2\n" in report
+
+
 @patch("nectl.nectl.run_driver_method_on_hosts")
 def test_should_raise_error_and_create_file_when_running_nectl_diff_with_driver_errors(
     mock_driver_method, mock_settings
@@ -260,6 +355,77 @@ def test_should_create_file_when_running_nectl_apply_configs(
         assert fh.read() == "foodiff\n"
 
 
+@pytest.mark.parametrize(
+    "max_error_rate,checks_failed,expected_groups",
+    (
+        (0.0, 0, ["prod_1", "prod_2"]),
+        (0.5, 0, ["prod_1", "prod_2", "prod_3"]),
+        (0.5, 1, ["prod_1"]),
+    ),
+)
+@patch("nectl.nectl.Nectl.run_checks")
+@patch("nectl.nectl.run_driver_method_on_hosts")
+def test_should_apply_waves_until_halted_when_running_nectl_rollout_configs(
+    mock_driver_method,
+    mock_run_checks,
+    mock_settings,
+    max_error_rate,
+    checks_failed,
+    expected_groups,
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN two hosts in each deployment group
+    hosts = [
+        Host(
+            hostname=f"core{num}",
+            site=group,
+            deployment_group=group,
+            _facts={},
+            _settings=None,
+        )
+        for group in ("prod_3", "prod_1", "prod_2")
+        for num in range(2)
+    ]
+
+    # GIVEN one host fails in wave two
+    def apply(hosts, **kwargs):
+        errors = int(hosts[0].deployment_group == "prod_2")
+        return errors, {host.id: "foodiff" for host in hosts[errors:]}
+
+    mock_driver_method.side_effect = apply
+
+    # GIVEN checks results
+    mock_run_checks.return_value = {"passed": 1, "failed": checks_failed}
+
+    # WHEN running rollout
+    with pytest.raises((RolloutHaltedError, DriverError)) as error:
+        Nectl(settings=settings).rollout_configs(
+            hosts=hosts, workers=4, max_error_rate=max_error_rate, checks=True
+        )
+
+    # THEN expect waves applied in order until halted
+    applied = [
+        c.kwargs["hosts"][0].deployment_group for c in mock_driver_method.call_args_list
+    ]
+    assert applied == expected_groups
+    assert all(c.kwargs["workers"] == 4 for c in mock_driver_method.call_args_list)
+
+    # THEN expect halt error unless every wave was applied
+    if len(expected_groups) < 3:
+        assert error.type is RolloutHaltedError
+        assert f"{3 - len(expected_groups)} waves not applied" in str(error.value)
+    else:
+        assert str(error.value) == "1 errors encountered, see logs above."
+
+    # THEN expect diff files for applied hosts
+    diffs_dir = pathlib.Path(settings.kit_path) / settings.config_diffs_dir
+    assert len(list(diffs_dir.iterdir())) == 2 * len(expected_groups) - (
+        "prod_2" in expected_groups
+    )
+
+
 @patch("nectl.nectl.run_driver_method_on_hosts")
 def test_should_raise_error_and_create_file_when_running_nectl_apply_with_driver_errors(
     mock_driver_method, mock_settings
@@ -369,3 +535,363 @@ def test_should_return_check_results_when_running_nectl_run_checks(
         "failed": 2,
         "report": f"{settings.kit_path}/{settings.checks_report_filename}",
     }
+
+
+def test_should_return_check_results_when_running_nectl_run_checks_with_workers(
+    mock_settings, mock_checks_generator
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN checks exist in kit directory
+    mock_checks_generator(settings)
+
+    # GIVEN hosts
+    hosts = Nectl(settings=mock_settings).get_hosts(customer="acme")
+
+    # WHEN running checks with workers
+    result = Nectl(settings=mock_settings).run_checks(
+        hosts=list(hosts.values()), workers=3
+    )
+
+    # THEN expect results from all workers
+    assert result == {
+        "passed": 12,
+        "failed": 0,
+        "report": f"{settings.kit_path}/{settings.checks_report_filename}",
+    }
+
+    # THEN expect single report with all results
+    report = ElementTree.parse(result["report"]).getroot()
+    assert len(report.findall("./testsuite/testcase")) == 12
+    assert report.find("./testsuite").get("tests") == "12"
+
+
+@pytest.mark.parametrize("workers", (1, 3))
+def test_should_raise_error_when_running_nectl_run_checks_and_no_checks_collected(
+    mock_settings, mock_checks_generator, workers
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN checks exist in kit directory
+    mock_checks_generator(settings)
+
+    # GIVEN hosts
+    hosts = list(Nectl(settings=settings).get_hosts(customer="acme").values())
+
+    # WHEN running checks with expression which matches no checks
+    # THEN expect error
+    with pytest.raises(ChecksError):
+        Nectl(settings=settings).run_checks(
+            hosts=hosts, pytest_expression="check_foo", workers=workers
+        )
+
+    # WHEN resuming a completed run
+    Nectl(settings=settings).run_checks(hosts=hosts)
+    result = Nectl(settings=settings).run_checks(
+        hosts=hosts, workers=workers, resume=True
+    )
+
+    # THEN expect results without error
+    assert result["passed"] == 12
+
+
+def write_fakeos_driver(settings):
+    """
+    Adds mgmt ip to hosts and writes a kit driver which records sessions
+    opened and state collected.
+    """
+    for host_file in pathlib.Path(settings.datatree_path).glob(
+        "customers/*/sites/*/hosts/*/__init__.py"
+    ):
+        host_file.write_text(host_file.read_text() + "\nmgmt_ip = '10.0.0.1'\n")
+
+    drivers_path = pathlib.Path(settings.kit_path) / settings.drivers_dirname
+    drivers_path.mkdir()
+    (drivers_path / "fakeos.py").write_text(
+        "from nectl import BaseDriver\n"
+        "class FakeOsDriver(BaseDriver):\n"
+        "    opened = []\n"
+        "    is_connected = True\n"
+        "    def get_config(self, format=None, sanitized=True):\n"
+        "        return f'hostname {self.host.hostname}'\n"
+        "    compare_config = apply_config = None\n"
+        "    def get_state(self, getters):\n"
+        "        return {g: {'hostname': self.host.hostname} for g in getters}\n"
+        "    def __enter__(self):\n"
+        "        FakeOsDriver.opened.append(self.host.id)\n"
+        "        return self\n"
+        "    def __exit__(self, *args):\n"
+        "        pass\n"
+    )
+
+
+def test_should_share_device_session_when_running_nectl_run_checks_with_device(
+    mock_settings,
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN hosts with kit driver which counts sessions
+    write_fakeos_driver(settings)
+
+    # GIVEN checks using device fixture
+    checks_path = pathlib.Path(settings.kit_path) / settings.checks_dirname
+    checks_path.mkdir()
+    (checks_path / "check_device.py").write_text(
+        "def check_hostname(host, device):\n"
+        "    assert device.get_config() == f'hostname {host.hostname}'\n"
+        "\n"
+        "def check_same_device(host, device):\n"
+        "    assert device.host is host\n"
+    )
+
+    # GIVEN hosts
+    hosts = Nectl(settings=settings).get_hosts(customer="acme")
+
+    # WHEN running checks
+    result = Nectl(settings=settings).run_checks(hosts=list(hosts.values()))
+
+    # THEN expect all checks to pass
+    assert result["passed"] == 8
+    assert result["failed"] == 0
+
+    # THEN expect one session opened per host
+    from drivers.fakeos import FakeOsDriver  # pylint: disable=E0401
+
+    assert sorted(FakeOsDriver.opened) == sorted(hosts)
+
+
+def test_should_open_one_session_per_host_when_running_checks_with_more_hosts_than_sessions(
+    mock_settings,
+):
+    # GIVEN mock settings with fewer sessions than hosts
+    settings = mock_settings
+    settings.checks_max_sessions = 2
+
+    # GIVEN hosts with kit driver which counts sessions
+    write_fakeos_driver(settings)
+
+    # GIVEN check modules using device fixture
+    checks_path = pathlib.Path(settings.kit_path) / settings.checks_dirname
+    checks_path.mkdir()
+    for name in ("check_config.py", "check_host.py"):
+        (checks_path / name).write_text(
+            "def check_device(host, device):\n    assert device.host is host\n"
+        )
+
+    # GIVEN hosts
+    hosts = Nectl(settings=settings).get_hosts(customer="acme")
+    assert len(hosts) > settings.checks_max_sessions
+
+    # WHEN running checks
+    result = Nectl(settings=settings).run_checks(hosts=list(hosts.values()))
+
+    # THEN expect all checks to pass
+    assert result["passed"] == 8
+    assert result["failed"] == 0
+
+    # THEN expect checks ordered by host so one session is opened per host
+    from drivers.fakeos import FakeOsDriver  # pylint: disable=E0401
+
+    assert sorted(FakeOsDriver.opened) == sorted(hosts)
+
+
+def test_should_collect_snapshots_once_when_running_nectl_run_checks_with_snapshot(
+    mock_settings,
+):
+    # GIVEN mock settings with state getters
+    settings = mock_settings
+    settings.checks_state_getters = ["facts"]
+
+    # GIVEN hosts with kit driver which counts sessions
+    write_fakeos_driver(settings)
+
+    # GIVEN checks using snapshot fixture
+    checks_path = pathlib.Path(settings.kit_path) / settings.checks_dirname
+    checks_path.mkdir()
+    (checks_path / "check_state.py").write_text(
+        "def check_hostname(host, snapshot):\n"
+        "    assert snapshot['facts']['hostname'] == host.hostname\n"
+        "\n"
+        "def check_snapshot_has_facts(snapshot):\n"
+        "    assert 'facts' in snapshot\n"
+        "\n"
+        "def check_device(device):\n"
+        "    assert device\n"
+    )
+
+    # GIVEN hosts
+    hosts = Nectl(settings=settings).get_hosts(customer="acme")
+
+    # WHEN running checks twice within snapshot TTL
+    for _ in range(2):
+        result = Nectl(settings=settings).run_checks(hosts=list(hosts.values()))
+
+        # THEN expect all checks to pass
+        assert result["passed"] == 12
+        assert result["failed"] == 0
+
+    from drivers.fakeos import FakeOsDriver  # pylint: disable=E0401
+
+    # THEN expect one snapshot and two device sessions per host
+    assert sorted(FakeOsDriver.opened) == sorted(list(hosts) * 3)
+
+    # WHEN running checks offline after snapshot has expired
+    settings.checks_state_ttl = 0
+    result = Nectl(settings=settings).run_checks(
+        hosts=list(hosts.values()), offline=True
+    )
+
+    # THEN expect snapshot checks to pass and device checks to be skipped
+    assert result["passed"] == 8
+    assert result["failed"] == 0
+
+    # THEN expect no new sessions
+    assert len(FakeOsDriver.opened) == 12
+
+    # WHEN running checks online after snapshot has expired and collection fails
+    with patch("nectl.nectl.collect_snapshots") as mock_collect_snapshots:
+        result = Nectl(settings=settings).run_checks(hosts=list(hosts.values()))
+    mock_collect_snapshots.assert_called_once()
+
+    # THEN expect only device checks to pass and not use the expired snapshot
+    assert result["passed"] == 4
+    assert result["failed"] == 0
+
+
+def test_should_use_snapshot_fresh_at_start_when_running_nectl_run_checks_longer_than_ttl(
+    mock_settings,
+):
+    # GIVEN mock settings with state getters and TTL
+    settings = mock_settings
+    settings.checks_state_getters = ["facts"]
+    settings.checks_state_ttl = 300
+
+    # GIVEN checks using snapshot fixture
+    checks_path = pathlib.Path(settings.kit_path) / settings.checks_dirname
+    checks_path.mkdir()
+    (checks_path / "check_state.py").write_text(
+        "def check_hostname(host, snapshot):\n"
+        "    assert snapshot['facts']['hostname'] == host.hostname\n"
+    )
+
+    # GIVEN hosts
+    hosts = Nectl(settings=settings).get_hosts(customer="acme")
+
+    # GIVEN snapshots which were 100 seconds old when the run started 250 seconds ago
+    real_time = time.time
+    for host in hosts.values():
+        filepath = get_snapshot_filepath(settings, host)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "host": host.id,
+                    "timestamp": real_time() - 350,
+                    "state": {"facts": {"hostname": host.hostname}},
+                },
+                fh,
+            )
+
+    # WHEN running checks for longer than the TTL
+    with patch("nectl.nectl.time", wraps=time) as mock_time, patch(
+        "nectl.nectl.collect_snapshots"
+    ):
+        mock_time.time.side_effect = lambda: real_time() - 250
+        result = Nectl(settings=settings).run_checks(hosts=list(hosts.values()))
+
+    # THEN expect snapshots which were fresh at run start to be used
+    assert result["passed"] == 4
+    assert result["failed"] == 0
+
+
+def test_should_only_run_changed_checks_when_running_nectl_run_checks_incremental(
+    mock_settings,
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN checks which log hosts they run against
+    runs_log = pathlib.Path(settings.kit_path) / "runs.log"
+    checks_path = pathlib.Path(settings.kit_path) / settings.checks_dirname
+    checks_path.mkdir()
+    (checks_path / "check_versions.py").write_text(
+        f"RUNS_LOG = {str(runs_log)!r}\n"
+        "\n"
+        "def check_os_version(host):\n"
+        "    with open(RUNS_LOG, 'a') as fh:\n"
+        "        fh.write(host.id + '\\n')\n"
+        "    assert host.os_version == '1.2.3'\n"
+        "\n"
+        "def check_os_name(host):\n"
+        "    assert host.os_name == 'junos'\n"
+    )
+
+    # GIVEN hosts
+    hosts = list(Nectl(settings=settings).get_hosts(customer="acme").values())
+
+    # WHEN running checks
+    result = Nectl(settings=settings).run_checks(hosts=hosts, incremental=True)
+
+    # THEN expect all checks to run
+    assert result["passed"] == 4
+    assert result["failed"] == 4
+    assert len(runs_log.read_text().splitlines()) == 4
+
+    # WHEN running checks again with no changes
+    runs_log.write_text("")
+    result = Nectl(settings=settings).run_checks(hosts=hosts, incremental=True)
+
+    # THEN expect previous results and no checks to run
+    assert result["passed"] == 4
+    assert result["failed"] == 4
+    assert runs_log.read_text() == ""
+
+    # THEN expect original failure in report
+    report = ElementTree.parse(result["report"]).getroot()
+    failure = report.find("./testsuite/testcase/failure")
+    assert "unchanged since previous run" in failure.get("message")
+    assert "assert 'fakeos' == 'junos'" in failure.get("message")
+
+    # WHEN running checks again after host facts change
+    (
+        pathlib.Path(settings.datatree_path)
+        / "customers/acme/sites/london/hosts/core0/fact.py"
+    ).write_text("ntp_servers = ['10.0.0.123']\n")
+    importlib.invalidate_caches()
+    hosts = list(Nectl(settings=settings).get_hosts(customer="acme").values())
+    result = Nectl(settings=settings).run_checks(hosts=hosts, incremental=True)
+
+    # THEN expect only checks for changed host to run
+    assert result["passed"] == 4
+    assert result["failed"] == 4
+    assert runs_log.read_text() == "core0.london.acme\n"
+
+
+@patch("nectl.checks.plugins.Fingerprinter.get")
+def test_should_not_fingerprint_checks_when_running_nectl_run_checks_not_incremental(
+    mock_fingerprinter_get,
+    mock_settings,
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN checks
+    checks_path = pathlib.Path(settings.kit_path) / settings.checks_dirname
+    checks_path.mkdir()
+    (checks_path / "check_versions.py").write_text(
+        "def check_os_name(host):\n    assert host.os_name == 'fakeos'\n"
+    )
+
+    # GIVEN hosts
+    hosts = list(Nectl(settings=settings).get_hosts(customer="acme").values())
+
+    # WHEN running checks
+    result = Nectl(settings=settings).run_checks(hosts=hosts)
+
+    # THEN expect checks to run without fingerprints or stored results
+    assert result["passed"] == 4
+    mock_fingerprinter_get.assert_not_called()
+    assert not os.path.exists(get_results_filepath(settings))
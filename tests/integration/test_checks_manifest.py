@@ -0,0 +1,201 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import pathlib
+import pytest
+from unittest.mock import patch
+
+from nectl import Nectl
+from nectl.checks.manifest import (
+    UnsupportedCheckError,
+    get_checks_manifest,
+    list_checks_from_manifest,
+)
+
+
+@pytest.fixture
+def checks_path(mock_settings, mock_checks_generator) -> pathlib.Path:
+    """
+    Generates mock checks with extra check files.
+    """
+    mock_checks_generator(mock_settings)
+    checks = pathlib.Path(mock_settings.kit_path) / mock_settings.checks_dirname
+
+    (checks / "check_five.py").write_text(
+        "__hosts_filter__ = {'site': 'london', 'role': ['primary', 'spare']}\n"
+        "\n"
+        "def check_primary(host):\n"
+        "    assert host.role == 'primary'\n"
+        "\n"
+        "def check_no_host():\n"
+        "    assert True\n"
+        "\n"
+        "class CheckNewyork:\n"
+        "    __hosts_filter__ = {'site': 'newyork'}\n"
+        "\n"
+        "    def check_site(self, host):\n"
+        "        assert host.site == 'newyork'\n"
+    )
+    (checks / "check_six.py").write_text(
+        "__hosts_filter__: dict = {'site': 'paris'}\n"
+        "\n"
+        "def check_paris(host):\n"
+        "    assert host.site == 'paris'\n"
+    )
+    (checks / "nested").mkdir()
+    (checks / "nested" / "check_seven.py").write_text(
+        "def check_nested(device):\n" "    assert device\n"
+    )
+
+    return checks
+
+
+def test_should_match_pytest_when_listing_checks_fast(mock_settings, checks_path):
+    # GIVEN nectl with hosts
+    nectl = Nectl(settings=mock_settings)
+    hosts = list(nectl.get_hosts().values())
+
+    # WHEN listing checks with pytest and fast mode
+    checks = nectl.list_checks(hosts=hosts)
+    fast_checks = nectl.list_checks(hosts=hosts, fast=True)
+
+    # THEN expect the same checks
+    assert len(fast_checks) == 39
+    assert sorted(fast_checks) == sorted(checks)
+
+
+def test_should_match_pytest_when_listing_checks_fast_and_fixtures_use_host(
+    mock_settings, checks_path
+):
+    # GIVEN check file with fixtures which depend on host fixture
+    (checks_path / "check_fixtures.py").write_text(
+        "import pytest\n"
+        "\n"
+        "@pytest.fixture\n"
+        "def hn(host):\n"
+        "    return host.hostname\n"
+        "\n"
+        "@pytest.fixture(scope='module')\n"
+        "def upper_hn(hn):\n"
+        "    return hn.upper()\n"
+        "\n"
+        "@pytest.fixture()\n"
+        "def value():\n"
+        "    return 1\n"
+        "\n"
+        "def check_hn(hn):\n"
+        "    assert hn\n"
+        "\n"
+        "def check_upper_hn(upper_hn, value):\n"
+        "    assert upper_hn\n"
+        "\n"
+        "def check_value(value):\n"
+        "    assert value\n"
+    )
+
+    # GIVEN nectl with hosts
+    nectl = Nectl(settings=mock_settings)
+    hosts = list(nectl.get_hosts().values())
+
+    # WHEN listing checks with pytest and fast mode
+    checks = nectl.list_checks(hosts=hosts)
+    fast_checks = list_checks_from_manifest(mock_settings, hosts)
+
+    # THEN expect checks using host fixtures through fixtures to be per host
+    assert f"check_fixtures.py::check_hn[{hosts[0].id}]" in fast_checks
+    assert f"check_fixtures.py::check_upper_hn[{hosts[0].id}]" in fast_checks
+    assert "check_fixtures.py::check_value" in fast_checks
+
+    # THEN expect the same checks
+    assert sorted(fast_checks) == sorted(checks)
+
+
+def test_should_only_parse_modified_files_when_getting_checks_manifest(
+    mock_settings, checks_path
+):
+    # GIVEN manifest has been cached
+    get_checks_manifest(mock_settings)
+
+    # GIVEN check file is modified
+    check_file = checks_path / "check_six.py"
+    check_file.write_text("def check_one_more(host):\n    pass\n")
+    os.utime(check_file, ns=(0, 1))
+
+    # WHEN getting manifest
+    with patch(
+        "nectl.checks.manifest.build_file_manifest", return_value={"checks": []}
+    ) as mock_build:
+        manifest = get_checks_manifest(mock_settings)
+
+    # THEN expect only modified file to be parsed
+    mock_build.assert_called_once()
+    assert mock_build.call_args.kwargs["filepath"] == str(check_file)
+    assert len(manifest) == 7
+
+
+@pytest.mark.parametrize(
+    "filename,content",
+    (
+        (
+            "check_mark.py",
+            "import pytest\n"
+            "@pytest.mark.parametrize('x', [1, 2])\n"
+            "def check_x(host, x):\n"
+            "    pass\n",
+        ),
+        (
+            "check_params.py",
+            "import pytest\n"
+            "@pytest.fixture(params=[1, 2])\n"
+            "def x(request):\n"
+            "    return request.param\n"
+            "def check_x(x):\n"
+            "    pass\n",
+        ),
+        (
+            "check_class_fixture.py",
+            "import pytest\n"
+            "class CheckX:\n"
+            "    @pytest.fixture\n"
+            "    def x(self, host):\n"
+            "        return host\n"
+            "    def check_x(self, x):\n"
+            "        pass\n",
+        ),
+        ("conftest.py", ""),
+    ),
+)
+def test_should_use_pytest_when_listing_checks_fast_and_checks_unsupported(
+    mock_settings, checks_path, filename, content
+):
+    # GIVEN check file which cannot be listed from manifest
+    (checks_path / filename).write_text(content)
+
+    # GIVEN nectl with hosts
+    nectl = Nectl(settings=mock_settings)
+    hosts = list(nectl.get_hosts().values())
+
+    # WHEN listing checks from manifest
+    with pytest.raises(UnsupportedCheckError):
+        list_checks_from_manifest(mock_settings, hosts)
+
+    # WHEN listing checks with fast mode
+    fast_checks = nectl.list_checks(hosts=hosts, fast=True)
+
+    # THEN expect checks listed by pytest
+    assert sorted(fast_checks) == sorted(nectl.list_checks(hosts=hosts))
@@ -0,0 +1,104 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import pathlib
+from xml.etree import ElementTree
+
+from nectl import Nectl
+
+
+def test_should_stream_records_when_running_nectl_run_checks(
+    mock_settings, mock_checks_generator
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN checks exist in kit directory
+    mock_checks_generator(settings)
+
+    # GIVEN hosts
+    hosts = list(Nectl(settings=settings).get_hosts(customer="acme").values())
+
+    # WHEN running checks
+    result = Nectl(settings=settings).run_checks(hosts=hosts)
+
+    # THEN expect a record per check with host and duration
+    stream = pathlib.Path(settings.kit_path) / "nectl_checks.jsonl"
+    records = [json.loads(line) for line in stream.read_text().splitlines()]
+    assert len(records) == 12
+    assert {r["host"] for r in records} == {host.id for host in hosts}
+    assert all(r["outcome"] == "passed" and r["duration"] >= 0 for r in records)
+    assert result["passed"] == 12
+
+    # THEN expect junit report with a test case per record
+    report = ElementTree.parse(result["report"]).getroot()
+    testcases = report.findall("./testsuite/testcase")
+    assert len(testcases) == 12
+    assert report.find("./testsuite").get("tests") == "12"
+    assert {t.get("classname") for t in testcases} == {
+        "check_one",
+        "check_two",
+        "check_three.CheckOsVersion",
+        "check_four.CheckLondon",
+    }
+    assert {
+        t.find("./properties/property[@name='host']").get("value") for t in testcases
+    } == {host.id for host in hosts}
+
+
+def test_should_only_run_remaining_checks_when_running_nectl_run_checks_resume(
+    mock_settings,
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN checks which log hosts they run against
+    runs_log = pathlib.Path(settings.kit_path) / "runs.log"
+    checks_path = pathlib.Path(settings.kit_path) / settings.checks_dirname
+    checks_path.mkdir()
+    (checks_path / "check_versions.py").write_text(
+        f"RUNS_LOG = {str(runs_log)!r}\n"
+        "\n"
+        "def check_os_version(host):\n"
+        "    with open(RUNS_LOG, 'a') as fh:\n"
+        "        fh.write(host.id + '\\n')\n"
+        "    assert host.site == 'london'\n"
+    )
+
+    # GIVEN hosts
+    hosts = list(Nectl(settings=settings).get_hosts().values())
+
+    # GIVEN run was interrupted after 3 checks and while writing a record
+    Nectl(settings=settings).run_checks(hosts=hosts)
+    stream = pathlib.Path(settings.kit_path) / "nectl_checks.jsonl"
+    lines = stream.read_text().splitlines(keepends=True)
+    stream.write_text("".join(lines[:3]) + lines[3][:20])
+    runs_log.write_text("")
+
+    # WHEN resuming checks
+    result = Nectl(settings=settings).run_checks(hosts=hosts, resume=True)
+
+    # THEN expect only remaining checks to run
+    assert len(runs_log.read_text().splitlines()) == 5
+
+    # THEN expect results for all checks
+    assert result["passed"] == 4
+    assert result["failed"] == 4
+    report = ElementTree.parse(result["report"]).getroot()
+    assert len(report.findall("./testsuite/testcase")) == 8
+    assert len(report.findall("./testsuite/testcase/failure")) == 4
@@ -0,0 +1,94 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+import pathlib
+import pytest
+
+from nectl import Nectl
+from nectl.configs.store import ConfigStore
+
+
+def test_should_store_each_config_once_when_writing_runs(mock_settings):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN config store
+    store = ConfigStore(settings)
+
+    # WHEN writing two runs where one host config has changed
+    first = store.write_run(
+        kind="active", configs={"core0": "ntp 1.1.1.1", "core1": "ntp 1.1.1.1"}
+    )
+    second = store.write_run(
+        kind="active", configs={"core0": "ntp 1.1.1.1", "core1": "ntp 2.2.2.2"}
+    )
+    store.write_run(kind="staged", configs={"core0": "ntp 3.3.3.3", "core1": ""})
+
+    # THEN expect a compressed blob per distinct config
+    objects = [p for p in pathlib.Path(store.objects_path).rglob("*") if p.is_file()]
+    assert len(objects) == 3
+    assert b"ntp" not in objects[0].read_bytes()
+
+    # THEN expect config of each host at each run
+    assert store.get_config(run_id=first, host_id="core1") == "ntp 1.1.1.1"
+    assert store.get_config(run_id=second, host_id="core1") == "ntp 2.2.2.2"
+    assert store.get_config(run_id=second, host_id="foo") is None
+
+    # THEN expect host with empty config to be kept in run
+    staged = store.list_runs(kind="staged")[0]
+    assert store.get_run(staged)["hosts"]["core1"] is None
+    assert store.get_config(run_id=staged, host_id="core1") == ""
+
+    # THEN expect runs from oldest to newest filtered by kind
+    assert store.list_runs(kind="active") == sorted([first, second])
+    assert len(store.list_runs()) == 3
+
+    # THEN expect error for unknown run
+    with pytest.raises(FileNotFoundError):
+        store.get_run("foo")
+
+
+@pytest.mark.parametrize("configs_history", (True, False))
+def test_should_store_staged_configs_when_running_nectl_render_configs(
+    mock_settings, mock_template_generator, configs_history
+):
+    # GIVEN mock settings with configs history
+    settings = mock_settings
+    settings.configs_history = configs_history
+
+    # GIVEN template exists in kit directory
+    mock_template_generator(settings)
+
+    # GIVEN hosts
+    nectl = Nectl(settings=settings)
+    hosts = nectl.get_hosts(customer="acme", site="london").values()
+
+    # WHEN rendering configs
+    nectl.render_configs(hosts=hosts)
+
+    # THEN expect staged run only when history is enabled
+    store = ConfigStore(settings)
+    runs = store.list_runs(kind="staged")
+    assert len(runs) == int(configs_history)
+
+    # THEN expect stored config to match staged config
+    if configs_history:
+        host = next(iter(hosts))
+        staged = pathlib.Path(
+            f"{settings.kit_path}/{settings.staged_configs_dir}/{host.id}.txt"
+        ).read_text()
+        assert store.get_config(run_id=runs[0], host_id=host.id) + "\n" == staged
@@ -0,0 +1,123 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import pathlib
+from unittest.mock import patch
+
+from nectl.datatree.hosts import get_all_hosts
+from nectl.datatree.dependencies import (
+    build_dependency_index,
+    get_dependency_index,
+    DEPENDENCY_INDEX_FILENAME,
+)
+
+
+def test_should_return_host_modules_when_building_dependency_index(mock_settings):
+    # GIVEN settings using mock kit
+    settings = mock_settings
+
+    # GIVEN datatree path
+    data = pathlib.Path(settings.datatree_path)
+
+    # GIVEN NTP servers defined globally and at london site for acme
+    (data / "glob" / "common" / "ntp.py").write_text("ntp_servers = []")
+    (data / "customers" / "acme" / "sites" / "london" / "common" / "ntp.py").write_text(
+        "ntp_servers = []"
+    )
+
+    # WHEN building dependency index
+    index = build_dependency_index(
+        settings=settings, hosts=get_all_hosts(settings).values()
+    )
+
+    # THEN expect host to depend on global and site files and its own files
+    assert index.hosts["core0.london.acme"] == [
+        "datatree/glob/common/ntp.py",
+        "datatree/customers/acme/sites/london/common/deployment_group.py",
+        "datatree/customers/acme/sites/london/common/ntp.py",
+        "datatree/customers/acme/sites/london/hosts/core0/__init__.py",
+    ]
+
+    # THEN expect reverse index to map global file to all hosts
+    assert len(index.get_modules()["datatree/glob/common/ntp.py"]) == 8
+
+
+def test_should_return_impacted_hosts_when_querying_dependency_index(mock_settings):
+    # GIVEN settings using mock kit
+    settings = mock_settings
+
+    # GIVEN datatree path
+    data = pathlib.Path(settings.datatree_path)
+
+    # GIVEN NTP servers defined at london site for acme
+    (data / "customers" / "acme" / "sites" / "london" / "common" / "ntp.py").write_text(
+        "ntp_servers = []"
+    )
+
+    # GIVEN dependency index
+    index = get_dependency_index(settings)
+
+    # WHEN querying impacted hosts of file
+    hosts = index.get_impacted_hosts(
+        ["datatree/customers/acme/sites/london/common/ntp.py"]
+    )
+
+    # THEN expect only london acme hosts
+    assert hosts == ["core0.london.acme", "core1.london.acme"]
+
+    # WHEN querying impacted hosts of directory
+    hosts = index.get_impacted_hosts(["./datatree/customers/hooli/"])
+
+    # THEN expect all hooli hosts
+    assert hosts == [
+        "core0.london.hooli",
+        "core0.newyork.hooli",
+        "core1.london.hooli",
+        "core1.newyork.hooli",
+    ]
+
+
+def test_should_use_persisted_index_when_datatree_layout_unchanged(mock_settings):
+    # GIVEN settings using mock kit
+    settings = mock_settings
+
+    # GIVEN dependency index has been built and persisted
+    index = get_dependency_index(settings)
+    assert os.path.exists(
+        os.path.join(settings.cache_path, DEPENDENCY_INDEX_FILENAME)
+    )
+
+    # WHEN getting dependency index again
+    with patch("nectl.datatree.dependencies.build_dependency_index") as mock_build:
+        cached_index = get_dependency_index(settings)
+
+    # THEN expect index not to be rebuilt
+    mock_build.assert_not_called()
+    assert cached_index == index
+
+    # GIVEN new file is added to datatree
+    (pathlib.Path(settings.datatree_path) / "glob" / "common" / "dns.py").write_text(
+        "dns_servers = []"
+    )
+
+    # WHEN getting dependency index again
+    new_index = get_dependency_index(settings)
+
+    # THEN expect index to be rebuilt with new file
+    assert new_index.signature != index.signature
+    assert "datatree/glob/common/dns.py" in new_index.get_modules()
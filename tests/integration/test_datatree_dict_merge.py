@@ -293,3 +293,43 @@ def test_should_return_merged_ntp_servers_dict_when_loading_facts_with_nested_ty
         "enabled": True,
         "opts": {"iface": "eth1", "debug": True},
     }
+
+
+def test_should_not_modify_shared_facts_when_merging_dicts_for_other_hosts(
+    mock_settings,
+):
+    # GIVEN settings using mock kit
+    settings = mock_settings
+
+    # GIVEN datatree path
+    data = pathlib.Path(settings.datatree_path)
+
+    # GIVEN switch and router hosts
+    switch = Host(hostname="core0", site="london", customer="acme", role="switch")
+    router = Host(hostname="core1", site="london", customer="acme", role="router")
+
+    # GIVEN NTP servers has been defined in datatree globally
+    (data / "glob" / "common" / "ntp.py").write_text(
+        'ntp_servers = {"global": {"servers": ["global.ntp.com"]}}'
+    )
+
+    # GIVEN additional NTP servers have been defined for switches only
+    (data / "glob" / "roles" / "switch").mkdir()
+    (data / "glob" / "roles" / "switch" / "ntp.py").write_text(
+        "from nectl import actions\n"
+        "ntp_servers: actions.merge_with = "
+        '{"global": {"servers": ["switch.ntp.com"]}, "switch": {}}'
+    )
+
+    # WHEN loading facts for switch and then router
+    switch_facts = load_host_facts(host=switch, settings=settings)
+    router_facts = load_host_facts(host=router, settings=settings)
+
+    # THEN expect switch to have merged NTP servers
+    assert switch_facts["ntp_servers"] == {
+        "global": {"servers": ["global.ntp.com", "switch.ntp.com"]},
+        "switch": {},
+    }
+
+    # THEN expect router to only have global NTP servers
+    assert router_facts["ntp_servers"] == {"global": {"servers": ["global.ntp.com"]}}
@@ -16,9 +16,10 @@
 # along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
 
 import pathlib
+from unittest.mock import patch
 
 from nectl.datatree.hosts import Host
-from nectl.datatree.facts_utils import load_host_facts
+from nectl.datatree.facts_utils import load_host_facts, iter_host_facts
 
 
 def test_should_return_str_fact_from_host_when_loading_facts(mock_settings):
@@ -330,3 +331,73 @@ def test_should_return_dataclass_list_fact_from_host_when_loading_facts(mock_set
     # THEN expect custom fact values
     assert vars(facts.get("custom_type")[0]) == {"name": "foo", "enabled": True}
     assert vars(facts.get("custom_type")[1]) == {"name": "bar", "enabled": False}
+
+
+def test_should_return_provenance_when_loading_facts_with_provenance(mock_settings):
+    # GIVEN settings using mock kit
+    settings = mock_settings
+
+    # GIVEN datatree path
+    data = pathlib.Path(settings.datatree_path)
+
+    # GIVEN host
+    host = Host(
+        hostname="core0", site="london", customer="acme", role="switch", _settings=settings
+    )
+
+    # GIVEN NTP servers defined globally and merged at role level
+    (data / "glob" / "common" / "ntp.py").write_text('ntp_servers = ["10.0.0.1"]')
+    (data / "glob" / "roles" / "switch").mkdir()
+    (data / "glob" / "roles" / "switch" / "ntp.py").write_text(
+        "from nectl import actions\n"
+        'ntp_servers: actions.merge_with = ["10.0.0.2"]'
+    )
+
+    # GIVEN NTP source replaced at host level
+    (data / "glob" / "common" / "source.py").write_text("ntp_source = 'lo0'")
+    (
+        data / "customers" / "acme" / "sites" / "london" / "hosts" / "core0" / "ntp.py"
+    ).write_text("ntp_source = 'em0'")
+
+    # WHEN getting host provenance
+    provenance = host.provenance
+
+    # THEN expect merged fact to have merge chain
+    assert provenance["ntp_servers"] == {
+        "action": "merge_with",
+        "module": "datatree.glob.roles.switch.ntp",
+        "chain": ["datatree.glob.common.ntp", "datatree.glob.roles.switch.ntp"],
+    }
+
+    # THEN expect replaced fact to have only last module
+    assert provenance["ntp_source"] == {
+        "action": "replace_with",
+        "module": "datatree.customers.acme.sites.london.hosts.core0.ntp",
+        "chain": ["datatree.customers.acme.sites.london.hosts.core0.ntp"],
+    }
+
+    # THEN expect facts to be loaded
+    assert host.facts["ntp_servers"] == ["10.0.0.2", "10.0.0.1"]
+
+
+def test_should_reuse_loaded_facts_when_iterating_host_facts(mock_settings):
+    # GIVEN settings using mock kit
+    settings = mock_settings
+
+    # GIVEN host with facts already loaded and host without
+    loaded = Host(hostname="core0", site="london", customer="acme", _settings=settings)
+    assert loaded.facts
+    unloaded = Host(
+        hostname="core1", site="london", customer="acme", _settings=settings
+    )
+
+    # WHEN iterating host facts
+    with patch(
+        "nectl.datatree.facts_utils.load_host_facts", wraps=load_host_facts
+    ) as mock_load_host_facts:
+        host_facts = dict(iter_host_facts(settings, [loaded, unloaded]))
+
+    # THEN expect facts loaded only for host without loaded facts
+    mock_load_host_facts.assert_called_once_with(settings=settings, host=unloaded)
+    assert host_facts[loaded.id] is loaded.facts
+    assert host_facts[unloaded.id]["hostname"] == "core1"
@@ -15,13 +15,19 @@
 # You should have received a copy of the GNU General Public License
 # along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import threading
 import pytest
-from unittest.mock import patch, ANY
+from unittest.mock import patch, ANY, MagicMock
 
 from nectl.datatree.hosts import Host
+from nectl.metrics import MemorySink, add_sink, remove_sink
 from nectl.configs.drivers import run_driver_method_on_hosts
+from nectl.configs.state import DeviceStateCache
+from nectl.configs.utils import write_configs_to_dir
 from nectl.exceptions import (
     DriverCommitDisconnectError,
+    DriverConnectionError,
     DriverError,
     DriverNotFoundError,
 )
@@ -250,3 +256,496 @@ def test_should_return_errors_when_running_driver_methods_on_host_with_no_matchi
 
     # THEN expect 1 total errors
     assert total_errors == 1
+
+
+@patch("nectl.configs.drivers.get_driver")
+def test_should_record_connect_and_method_spans_when_running_driver_method_on_hosts(
+    mock_get_driver, mock_settings
+):
+    # GIVEN hosts in two sites
+    hosts = [
+        Host(
+            hostname="core0",
+            site=site,
+            customer="acme",
+            mgmt_ip="10.0.0.1",
+            os_name="fakeos",
+            _facts={},
+            _settings=None,
+        )
+        for site in ("london", "nyc")
+    ]
+
+    # GIVEN metrics sink
+    sink = MemorySink()
+    add_sink(sink)
+
+    # WHEN running method
+    try:
+        run_driver_method_on_hosts(
+            settings=mock_settings,
+            hosts=hosts,
+            method_name="get_config",
+            description="test get_config desc",
+        )
+    finally:
+        remove_sink(sink)
+
+    # THEN expect connect and method spans per host with site label
+    for name in ("connect", "get_config"):
+        assert set(sink.percentiles(name, 99, by="site")) == {"london", "nyc"}
+    assert sink.spans("get_config")[0]["labels"] == {
+        "host": "core0.london.acme",
+        "site": "london",
+        "os_name": "fakeos",
+    }
+
+
+@patch("nectl.configs.drivers.get_driver")
+def test_should_record_failed_connect_spans_when_running_driver_method_on_hosts(
+    mock_get_driver, mock_settings
+):
+    # GIVEN hosts in two sites
+    hosts = [
+        Host(
+            hostname="core0",
+            site=site,
+            customer="acme",
+            mgmt_ip="10.0.0.1",
+            os_name="fakeos",
+            _facts={},
+            _settings=None,
+        )
+        for site in ("london", "nyc")
+    ]
+
+    # GIVEN hosts in one site are unreachable
+    def create_driver(host, **kwargs):
+        driver = MagicMock()
+        driver.__enter__.return_value.get_config.return_value = "foo config"
+        if host.site == "nyc":
+            driver.__enter__.side_effect = DriverConnectionError("timed out")
+        return driver
+
+    mock_get_driver.return_value.side_effect = create_driver
+
+    # GIVEN metrics sink
+    sink = MemorySink()
+    add_sink(sink)
+
+    # WHEN running method
+    try:
+        total_errors, _ = run_driver_method_on_hosts(
+            settings=mock_settings,
+            hosts=hosts,
+            method_name="get_config",
+            description="test get_config desc",
+        )
+    finally:
+        remove_sink(sink)
+
+    # THEN expect error from unreachable site
+    assert total_errors == 1
+
+    # THEN expect connect spans for both hosts with failed connect error
+    errors = {s["labels"]["site"]: s["error"] for s in sink.spans("connect")}
+    assert errors == {"london": None, "nyc": "DriverConnectionError"}
+
+    # THEN expect method span only for connected host
+    assert [s["labels"]["site"] for s in sink.spans("get_config")] == ["london"]
+
+
+@patch("nectl.configs.drivers.get_driver")
+def test_should_use_cached_diff_when_running_driver_method_on_unchanged_host(
+    mock_get_driver, mock_settings
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN host with staged config
+    host = Host(
+        hostname="core0",
+        site="london",
+        customer="acme",
+        mgmt_ip="10.0.0.1",
+        os_name="fakeos",
+        _facts={},
+        _settings=None,
+    )
+    staged_dir = f"{settings.kit_path}/{settings.staged_configs_dir}"
+    os.makedirs(staged_dir)
+    with open(f"{staged_dir}/{host.id}.txt", "w", encoding="utf-8") as fh:
+        fh.write("ntp server 10.0.0.1\n")
+
+    # GIVEN driver returns change marker and diff
+    con = mock_get_driver.return_value.return_value.__enter__.return_value
+    con.get_change_marker.return_value = "commit1"
+    con.compare_config.return_value = "foodiff"
+
+    def run():
+        return run_driver_method_on_hosts(
+            settings=settings,
+            hosts=[host],
+            method_name="compare_config",
+            description="test compare_config desc",
+            state_cache=DeviceStateCache(settings),
+        )
+
+    # WHEN running method twice with unchanged host
+    run()
+    total_errors, outputs = run()
+
+    # THEN expect diff from cache and method called once
+    assert outputs == {host.id: "foodiff"}
+    assert total_errors == 0
+    assert con.compare_config.call_count == 1
+
+    # WHEN running method after host has changed
+    con.get_change_marker.return_value = "commit2"
+    run()
+
+    # THEN expect method to be called again
+    assert con.compare_config.call_count == 2
+
+    # WHEN running method after staged config has changed
+    with open(f"{staged_dir}/{host.id}.txt", "w", encoding="utf-8") as fh:
+        fh.write("ntp server 10.0.0.2\n")
+    run()
+
+    # THEN expect method to be called again
+    assert con.compare_config.call_count == 3
+
+    # WHEN running method on host with no change marker
+    con.get_change_marker.return_value = None
+    run()
+    run()
+
+    # THEN expect method to be called every run
+    assert con.compare_config.call_count == 5
+
+
+@patch("nectl.configs.drivers.get_driver")
+def test_should_skip_connection_when_running_driver_method_within_state_ttl(
+    mock_get_driver, mock_settings
+):
+    # GIVEN mock settings with state ttl
+    settings = mock_settings
+    settings.device_state_ttl = 300
+
+    # GIVEN host
+    host = Host(
+        hostname="core0",
+        site="london",
+        customer="acme",
+        mgmt_ip="10.0.0.1",
+        os_name="fakeos",
+        _facts={},
+        _settings=None,
+    )
+
+    # GIVEN driver returns config and has no change marker
+    driver = mock_get_driver.return_value.return_value
+    driver.__enter__.return_value.get_change_marker.return_value = None
+    driver.__enter__.return_value.get_config.return_value = "foo config"
+    driver.__enter__.return_value.apply_config.return_value = ""
+
+    def run(method_name="get_config"):
+        total_errors, outputs = run_driver_method_on_hosts(
+            settings=settings,
+            hosts=[host],
+            method_name=method_name,
+            description=f"test {method_name} desc",
+            state_cache=DeviceStateCache(settings),
+        )
+        write_configs_to_dir(
+            configs=outputs,
+            output_dir=f"{settings.kit_path}/{settings.active_configs_dir}",
+            extension=settings.configs_file_extension,
+        )
+        return outputs
+
+    # WHEN getting config twice within ttl
+    run()
+    outputs = run()
+
+    # THEN expect config read from backup without connecting again
+    assert outputs == {host.id: "foo config"}
+    assert driver.__enter__.call_count == 1
+
+    # WHEN config is applied
+    run(method_name="apply_config")
+    run()
+
+    # THEN expect cache discarded and config collected again
+    assert driver.__enter__.return_value.get_config.call_count == 2
+
+
+@patch("nectl.configs.drivers.get_driver")
+def test_should_check_marker_when_running_driver_method_within_state_ttl(
+    mock_get_driver, mock_settings
+):
+    # GIVEN mock settings with state ttl
+    settings = mock_settings
+    settings.device_state_ttl = 300
+
+    # GIVEN host
+    host = Host(
+        hostname="core0",
+        site="london",
+        customer="acme",
+        mgmt_ip="10.0.0.1",
+        os_name="fakeos",
+        _facts={},
+        _settings=None,
+    )
+
+    staged_dir = f"{settings.kit_path}/{settings.staged_configs_dir}"
+    os.makedirs(staged_dir)
+    with open(f"{staged_dir}/{host.id}.txt", "w", encoding="utf-8") as fh:
+        fh.write("ntp server 10.0.0.1\n")
+
+    # GIVEN driver returns diff and a change marker
+    con = mock_get_driver.return_value.return_value.__enter__.return_value
+    con.get_change_marker.return_value = "commit-1"
+    con.compare_config.return_value = "foo diff"
+
+    def run():
+        return run_driver_method_on_hosts(
+            settings=settings,
+            hosts=[host],
+            method_name="compare_config",
+            description="test compare_config desc",
+            state_cache=DeviceStateCache(settings),
+        )[1]
+
+    # WHEN comparing config twice within ttl
+    run()
+    outputs = run()
+
+    # THEN expect host connected to check marker and cached diff used
+    assert outputs == {host.id: "foo diff"}
+    assert con.get_change_marker.call_count == 2
+    assert con.compare_config.call_count == 1
+
+    # WHEN host changes out of band within ttl
+    con.get_change_marker.return_value = "commit-2"
+    con.compare_config.return_value = "bar diff"
+    outputs = run()
+
+    # THEN expect change detected
+    assert outputs == {host.id: "bar diff"}
+    assert con.compare_config.call_count == 2
+
+
+@patch("nectl.configs.drivers.get_driver")
+def test_should_run_hosts_at_same_time_when_running_driver_method_with_workers(
+    mock_get_driver, mock_settings
+):
+    # GIVEN hosts
+    hosts = [
+        Host(
+            hostname=f"core{num}",
+            site="london",
+            customer="acme",
+            mgmt_ip="10.0.0.1",
+            os_name="fakeos",
+            _facts={},
+            _settings=None,
+        )
+        for num in range(9)
+    ]
+
+    # GIVEN driver method waits for other hosts and fails for one host
+    barrier = threading.Barrier(4, timeout=5)
+
+    def get_config(**kwargs):
+        barrier.wait()
+        return "foo config"
+
+    con = mock_get_driver.return_value.return_value.__enter__.return_value
+    con.get_config.side_effect = get_config
+    driver = mock_get_driver.return_value.return_value
+
+    def create_driver(host, **kwargs):
+        if host.hostname == "core3":
+            raise DriverError("foo")
+        return driver
+
+    mock_get_driver.return_value.side_effect = create_driver
+
+    # WHEN running method with workers
+    total_errors, outputs = run_driver_method_on_hosts(
+        settings=mock_settings,
+        hosts=hosts,
+        method_name="get_config",
+        description="test get_config desc",
+        workers=4,
+    )
+
+    # THEN expect outputs and errors from all hosts
+    assert total_errors == 1
+    assert len(outputs) == 8
+    assert "core3.london.acme" not in outputs
+
+
+@patch("nectl.configs.drivers.get_driver")
+def test_should_decrease_sessions_when_running_driver_method_on_overloaded_site(
+    mock_get_driver, mock_settings
+):
+    # GIVEN mock settings with adaptive sessions and no connect retries
+    settings = mock_settings
+    settings.adaptive_sessions = True
+    settings.connect_retries = 0
+
+    # GIVEN hosts in two sites
+    hosts = [
+        Host(
+            hostname=f"core{num}",
+            site=site,
+            customer="acme",
+            mgmt_ip="10.0.0.1",
+            os_name="fakeos",
+            _facts={},
+            _settings=None,
+        )
+        for site in ("london", "nyc")
+        for num in range(4)
+    ]
+
+    # GIVEN hosts in one site are unreachable
+    def create_driver(host, **kwargs):
+        driver = MagicMock()
+        driver.__enter__.return_value.get_config.return_value = "foo config"
+        if host.site == "nyc":
+            driver.__enter__.side_effect = DriverConnectionError("timed out")
+        return driver
+
+    mock_get_driver.return_value.side_effect = create_driver
+
+    # GIVEN metrics sink
+    sink = MemorySink()
+    add_sink(sink)
+
+    # WHEN running method with workers
+    try:
+        total_errors, outputs = run_driver_method_on_hosts(
+            settings=settings,
+            hosts=hosts,
+            method_name="get_config",
+            description="test get_config desc",
+            workers=2,
+        )
+    finally:
+        remove_sink(sink)
+
+    # THEN expect errors from unreachable site
+    assert total_errors == 4
+    assert set(outputs) == {h.id for h in hosts if h.site == "london"}
+
+    # THEN expect sessions to unreachable site decreased
+    assert sink.counter("session_limit_decrease", by="limiter")["site:nyc"] >= 1
+    assert "site:london" not in sink.counter("session_limit_decrease", by="limiter")
+
+
+@patch("nectl.configs.resilience.time.sleep")
+@patch("nectl.configs.drivers.get_driver")
+def test_should_fail_fast_when_running_driver_method_on_unreachable_site(
+    mock_get_driver, mock_sleep, mock_settings, caplog
+):
+    # GIVEN mock settings with one connect retry and site failure limit
+    settings = mock_settings
+    settings.connect_retries = 1
+    settings.site_failure_limit = 2
+
+    # GIVEN hosts in two sites
+    hosts = [
+        Host(
+            hostname=f"core{num}",
+            site=site,
+            customer="acme",
+            mgmt_ip="10.0.0.1",
+            os_name="fakeos",
+            _facts={},
+            _settings=None,
+        )
+        for site in ("london", "nyc")
+        for num in range(5)
+    ]
+
+    # GIVEN hosts in one site are unreachable
+    drivers = {}
+
+    def create_driver(host, **kwargs):
+        driver = MagicMock()
+        driver.__enter__.return_value.get_config.return_value = "foo config"
+        if host.site == "nyc":
+            driver.__enter__.side_effect = DriverConnectionError("timed out")
+        drivers[host.id] = driver
+        return driver
+
+    mock_get_driver.return_value.side_effect = create_driver
+
+    # WHEN running method
+    total_errors, outputs = run_driver_method_on_hosts(
+        settings=settings,
+        hosts=hosts,
+        method_name="get_config",
+        description="test get_config desc",
+    )
+
+    # THEN expect errors from unreachable site and outputs from other site
+    assert total_errors == 5
+    assert set(outputs) == {h.id for h in hosts if h.site == "london"}
+
+    # THEN expect first hosts in unreachable site to retry connection
+    assert drivers["core0.nyc.acme"].__enter__.call_count == 2
+    assert drivers["core1.nyc.acme"].__enter__.call_count == 2
+    assert mock_sleep.call_count == 2
+
+    # THEN expect remaining hosts in unreachable site to not connect
+    for num in range(2, 5):
+        drivers[f"core{num}.nyc.acme"].__enter__.assert_not_called()
+
+    # THEN expect skipped hosts to be reported together
+    assert (
+        "site 'nyc' has too many failed connections, skipped 3 hosts: "
+        "core2.nyc.acme, core3.nyc.acme, core4.nyc.acme"
+    ) in caplog.text
+
+
+@patch("nectl.configs.drivers.get_driver")
+def test_should_connect_all_hosts_when_running_driver_method_on_hosts_with_no_site(
+    mock_get_driver, mock_settings
+):
+    # GIVEN mock settings with site failure limit
+    settings = mock_settings
+    settings.site_failure_limit = 2
+
+    # GIVEN unreachable hosts with no site
+    hosts = [
+        Host(
+            hostname=f"core{num}",
+            customer="acme",
+            mgmt_ip="10.0.0.1",
+            os_name="fakeos",
+            _facts={},
+            _settings=None,
+        )
+        for num in range(5)
+    ]
+    mock_get_driver.return_value.return_value.__enter__.side_effect = (
+        DriverConnectionError("timed out")
+    )
+
+    # WHEN running method
+    total_errors, outputs = run_driver_method_on_hosts(
+        settings=settings,
+        hosts=hosts,
+        method_name="get_config",
+        description="test get_config desc",
+    )
+
+    # THEN expect every host to try connecting
+    assert total_errors == 5
+    assert outputs == {}
+    assert mock_get_driver.return_value.return_value.__enter__.call_count == 5
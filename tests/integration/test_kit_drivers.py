@@ -15,11 +15,18 @@
 # You should have received a copy of the GNU General Public License
 # along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import sys
 import pathlib
 import pytest
-
-from nectl.configs.drivers import get_driver
-from nectl.configs.drivers.utils import load_drivers_from_kit
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+
+from nectl.configs.drivers import get_driver, NapalmDriver
+from nectl.configs.drivers.utils import (
+    DRIVERS_ENTRY_POINT_GROUP,
+    load_drivers_from_kit,
+)
 from nectl.exceptions import DriverLoadError
 
 
@@ -141,3 +148,106 @@ def test_should_return_kit_driver_when_getting_driver(
 
     # THEN expect driver
     assert driver is not None
+
+
+def test_should_only_import_matching_kit_driver_when_getting_driver(
+    mock_settings,
+):
+    # GIVEN settings using mock kit
+    settings = mock_settings
+
+    # GIVEN drivers path with custom drivers fakeos and spoofos
+    drivers_path = pathlib.Path(settings.kit_path) / settings.drivers_dirname
+    drivers_path.mkdir()
+    for name in ("FakeOs", "SpoofOs"):
+        (drivers_path / f"{name.lower()}.py").write_text(
+            "from nectl import BaseDriver\n"
+            f"class {name}Driver(BaseDriver):\n"
+            "    foo = 'bar'\n"
+        )
+
+    # WHEN getting driver for many hosts
+    with patch("nectl.configs.drivers.utils.os.listdir", wraps=os.listdir) as listdir:
+        drivers = [get_driver(settings=settings, os_name="fakeos") for _ in range(5)]
+
+    # THEN expect the same kit driver
+    assert all(d is drivers[0] for d in drivers)
+    assert drivers[0].__name__ == "FakeOsDriver"
+
+    # THEN expect kit drivers discovered once
+    listdir.assert_called_once()
+
+    # THEN expect other driver not imported
+    assert f"{settings.drivers_dirname}.fakeos" in sys.modules
+    assert f"{settings.drivers_dirname}.spoofos" not in sys.modules
+
+
+@patch("nectl.configs.drivers.registry.find_kit_drivers", return_value={})
+def test_should_discover_kit_drivers_once_when_kit_has_no_drivers(
+    mock_find_kit_drivers,
+    mock_settings,
+):
+    # GIVEN settings using mock kit with no drivers
+    settings = mock_settings
+
+    # WHEN getting core driver for many hosts
+    for _ in range(5):
+        get_driver(settings=settings, os_name="junos")
+
+    # THEN expect kit drivers discovered once
+    mock_find_kit_drivers.assert_called_once()
+
+
+@patch("nectl.configs.drivers.utils.entry_points")
+def test_should_return_installed_driver_when_getting_driver(
+    mock_entry_points,
+    mock_settings,
+):
+    # GIVEN settings using mock kit
+    settings = mock_settings
+
+    # GIVEN driver installed by another package
+    mock_entry_points.return_value = [
+        EntryPoint(
+            name="vendoros",
+            value="nectl.configs.drivers.napalmdriver:NapalmDriver",
+            group=DRIVERS_ENTRY_POINT_GROUP,
+        )
+    ]
+
+    # WHEN getting driver
+    driver = get_driver(settings=settings, os_name="vendoros")
+
+    # THEN expect installed driver
+    assert driver is NapalmDriver
+    mock_entry_points.assert_called_once_with(group=DRIVERS_ENTRY_POINT_GROUP)
+
+
+@pytest.mark.parametrize(
+    "value, expected_error",
+    (
+        ("nectl.settings:Settings", "driver 'vendoros' must be subclass"),
+        ("nectl.foobar:FooDriver", "driver 'vendoros' could not be loaded"),
+    ),
+)
+@patch("nectl.configs.drivers.utils.entry_points")
+def test_should_raise_error_when_getting_invalid_installed_driver(
+    mock_entry_points,
+    mock_settings,
+    value,
+    expected_error,
+):
+    # GIVEN settings using mock kit
+    settings = mock_settings
+
+    # GIVEN invalid driver installed by another package
+    mock_entry_points.return_value = [
+        EntryPoint(name="vendoros", value=value, group=DRIVERS_ENTRY_POINT_GROUP)
+    ]
+
+    with pytest.raises(DriverLoadError) as error:
+        # WHEN getting driver
+        get_driver(settings=settings, os_name="vendoros")
+
+    # THEN expect error
+    assert expected_error in str(error.value)
@@ -15,12 +15,31 @@
 # You should have received a copy of the GNU General Public License
 # along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
 
-import pytest
+import os
+import sys
 import logging
+import threading
+import subprocess
+import pytest
 import click
 
+import nectl
+from nectl.logging import (
+    logging_opts,
+    setup_logging,
+    get_logger,
+    get_record_host,
+    get_hosts_logging_sample,
+    HostSampleFilter,
+    HostFileHandler,
+    QueueLogging,
+)
+
 
-from nectl.logging import logging_opts, setup_logging, get_logger
+def _record(msg, *args, level=logging.DEBUG, **extra):
+    record = logging.LogRecord("nectl", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
 
 
 def test_should_return_logger_when_getting_logger():
@@ -95,3 +114,170 @@ def test_should_return_logging_when_using_logging_dectorator_on_click_command(
             f"logging levels: '*'={logging.getLevelName(expected_all)} 'nectl'={logging.getLevelName(expected_nectl)}"
             in result.output
         )
+
+
+@pytest.mark.parametrize(
+    "record,expected",
+    (
+        (_record("[core0.london] finished render"), "core0.london"),
+        (_record("[%s] fetching fact '%s'", "core0.london", "ntp"), "core0.london"),
+        (_record("start rendering", host="core1.nyc"), "core1.nyc"),
+        (_record("start rendering templates"), None),
+        (_record("[] empty"), None),
+    ),
+)
+def test_should_return_host_when_getting_record_host(record, expected):
+    # WHEN getting record host
+    host = get_record_host(record)
+
+    # THEN expect host ID from message or extra
+    assert host == expected
+
+
+def test_should_keep_warnings_and_records_without_host_when_sampling_hosts():
+    # GIVEN filter which samples no hosts
+    sample = HostSampleFilter(0.0)
+
+    # THEN expect host debug records to be dropped
+    assert not sample.filter(_record("[core0.london] loading facts"))
+
+    # THEN expect host warning records to be kept
+    assert sample.filter(_record("[core0.london] bad", level=logging.WARNING))
+
+    # THEN expect records without host to be kept
+    assert sample.filter(_record("finished discovery"))
+
+    # THEN expect all host records to be kept when sampling all hosts
+    assert HostSampleFilter(1.0).filter(_record("[core0.london] loading facts"))
+
+
+def test_should_write_log_file_per_host_when_using_host_file_handler(tmp_path):
+    # GIVEN host handler which keeps one file open
+    handler = HostFileHandler(str(tmp_path), max_open=1)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    # WHEN writing records for two hosts and one without host
+    handler.handle(_record("[core0.london] first"))
+    handler.handle(_record("[%s] second", "core1.nyc"))
+    handler.handle(_record("[core0.london] third"))
+    handler.handle(_record("finished discovery"))
+    handler.close()
+
+    # THEN expect a log file per host
+    assert sorted(os.listdir(tmp_path)) == ["core0.london.log", "core1.nyc.log"]
+    assert (tmp_path / "core0.london.log").read_text() == (
+        "[core0.london] first\n[core0.london] third\n"
+    )
+    assert (tmp_path / "core1.nyc.log").read_text() == "[core1.nyc] second\n"
+
+
+def test_should_write_records_from_listener_when_using_queue_logging():
+    # GIVEN handler which captures formatted messages and thread
+    class ListHandler(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.messages = []
+
+        def emit(self, record):
+            self.messages.append((self.format(record), threading.current_thread()))
+
+    handler = ListHandler()
+    queue_logging = QueueLogging([handler])
+
+    # WHEN logging through queue
+    queue_logging.start()
+    try:
+        get_logger().warning("[%s] lazy %s", "core0.london", "message")
+    finally:
+        queue_logging.stop()
+        logging.getLogger("").removeHandler(queue_logging.queue_handler)
+
+    # THEN expect message to be formatted by listener thread
+    assert len(handler.messages) == 1
+    assert handler.messages[0][0] == "[core0.london] lazy message"
+    assert handler.messages[0][1] is not threading.current_thread()
+
+
+def test_should_route_host_logs_when_setting_hosts_dir_env_var(tmp_path):
+    # GIVEN hosts log directory env var
+    env = {
+        **os.environ,
+        "NECTL_LOG_HOSTS_DIR": str(tmp_path / "hosts"),
+        "PYTHONPATH": os.path.dirname(os.path.dirname(nectl.__file__)),
+    }
+
+    # WHEN logging from a new process
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from nectl.logging import get_logger, setup_logging\n"
+            "setup_logging()\n"
+            "get_logger().info('[core0.london] finished render')\n"
+            "get_logger().info('finished rendering templates')\n",
+        ],
+        cwd=tmp_path,
+        env=env,
+        check=True,
+    )
+
+    # THEN expect all records in main log file
+    main_log = (tmp_path / "nectl.log").read_text()
+    assert "[core0.london] finished render" in main_log
+    assert "finished rendering templates" in main_log
+
+    # THEN expect host records in host log file
+    host_log = (tmp_path / "hosts" / "core0.london.log").read_text()
+    assert "[core0.london] finished render" in host_log
+    assert "finished rendering templates" not in host_log
+
+
+def test_should_not_start_queue_logging_when_importing_nectl(tmp_path):
+    # GIVEN env with pythonpath to nectl
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.path.dirname(os.path.dirname(nectl.__file__)),
+    }
+
+    # WHEN importing nectl from a new process
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import threading\n"
+            "import nectl\n"
+            "from nectl import logging\n"
+            "print(logging.QUEUE_LOGGING, threading.active_count())\n",
+        ],
+        cwd=tmp_path,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    # THEN expect no queue logging or listener thread
+    assert result.stdout.split() == ["None", "1"]
+
+
+@pytest.mark.parametrize(
+    "value,expected,warns",
+    (
+        ("0.25", 0.25, False),
+        ("0", 0.0, False),
+        ("abc", 1.0, True),
+        ("1.5", 1.0, True),
+    ),
+)
+def test_should_return_sample_rate_when_getting_hosts_logging_sample(
+    monkeypatch, caplog, value, expected, warns
+):
+    # GIVEN sample env var
+    monkeypatch.setenv("NECTL_LOG_SAMPLE", value)
+
+    # WHEN getting sample rate
+    rate = get_hosts_logging_sample()
+
+    # THEN expect rate or default with warning for invalid values
+    assert rate == expected
+    assert ("ignoring NECTL_LOG_SAMPLE" in caplog.text) is warns
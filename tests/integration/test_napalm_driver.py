@@ -1,3 +1,5 @@
+import time
+import threading
 import pytest
 from unittest.mock import patch, MagicMock, call, mock_open
 
@@ -5,8 +7,12 @@ from nectl.configs.drivers import NapalmDriver
 from nectl.datatree.hosts import Host
 from nectl.exceptions import (
     DriverCommitDisconnectError,
+    DriverAuthError,
     DriverConfigLoadError,
+    DriverConnectionError,
     DriverError,
+    DriverLockError,
+    DriverNotConnectedError,
     DriverNotFoundError,
 )
 from napalm.base.exceptions import (
@@ -164,9 +170,9 @@ def test_should_replace_config_unless_using_junos_set_config_format(
     "napalm_exc,driver_exc",
     (
         (ModuleImportError(), DriverNotFoundError),
-        (LockError(), DriverError),
-        (AuthenticationError(), DriverError),
-        (ConnectionException(), DriverError),
+        (LockError(), DriverLockError),
+        (AuthenticationError(), DriverAuthError),
+        (ConnectionException(), DriverConnectionError),
     ),
 )
 def test_should_raise_error_when_driver_open(mock_napalm, napalm_exc, driver_exc):
@@ -298,10 +304,9 @@ def test_should_return_diff_and_not_commit_when_applying_config_but_no_changes(
     assert diff == None
 
 
-@patch("time.sleep")
 @patch("builtins.open", new_callable=mock_open, read_data=None)
 def test_should_return_diff_and_commit_when_replacing_config_and_has_changes(
-    mock_open, mock_sleep, mock_napalm
+    mock_open, mock_napalm
 ):
     # GIVEN open file returns string
     open.return_value.read.return_value = ""
@@ -324,7 +329,7 @@ def test_should_return_diff_and_commit_when_replacing_config_and_has_changes(
     driver = NapalmDriver(host=host, username="foo")
 
     # WHEN calling apply config
-    with driver:
+    with driver, patch.object(driver._session_wait, "wait") as mock_wait:
         diff = driver.apply_config(
             config_filepath="/not/real/config.txt", commit_timer=10
         )
@@ -338,8 +343,8 @@ def test_should_return_diff_and_commit_when_replacing_config_and_has_changes(
     # THEN expect mgmt connection to be restarted
     mock_napalm.return_value.close.assert_called()
 
-    # THEN expect sleep for 75% of 10 minutes = 450 seconds
-    mock_sleep.assert_called_with(450)
+    # THEN expect wait for 75% of 10 minutes = 450 seconds
+    mock_wait.assert_called_with(timeout=450)
 
     # THEN expect commit to be confirmed
     mock_napalm.return_value.confirm_commit.assert_called()
@@ -348,6 +353,70 @@ def test_should_return_diff_and_commit_when_replacing_config_and_has_changes(
     assert diff == "fakediff"
 
 
+@patch("builtins.open", new_callable=mock_open, read_data=None)
+def test_should_release_session_lock_when_waiting_to_confirm_commit(
+    mock_open, mock_napalm
+):
+    # GIVEN open file returns string
+    open.return_value.read.return_value = ""
+
+    # GIVEN host
+    host = Host(
+        hostname="core0",
+        site="london",
+        customer="acme",
+        mgmt_ip="10.0.0.1",
+        os_name="junos",
+        _facts={},
+        _settings=None,
+    )
+
+    # GIVEN compare method will return changes
+    mock_napalm.return_value.compare_config.return_value = "fakediff"
+
+    # GIVEN driver
+    driver = NapalmDriver(host=host, username="foo")
+
+    # GIVEN another thread which uses the session while the driver waits
+    used = []
+    wait = driver._session_wait.wait
+
+    def use_session():
+        with driver._session_wait:
+            used.append("wait")
+            driver._session_wait.notify()
+
+    def wait_and_use_session(timeout):
+        thread = threading.Thread(target=use_session)
+        thread.start()
+        wait(timeout=5)
+        thread.join()
+
+    # GIVEN confirm commit which checks if another thread can use the session
+    def try_session_lock():
+        if driver._session_lock.acquire(blocking=False):
+            driver._session_lock.release()
+            used.append("confirm")
+
+    def check_session_lock():
+        thread = threading.Thread(target=try_session_lock)
+        thread.start()
+        thread.join()
+
+    mock_napalm.return_value.confirm_commit.side_effect = check_session_lock
+
+    # WHEN calling apply config
+    with driver, patch.object(
+        driver._session_wait, "wait", side_effect=wait_and_use_session
+    ) as mock_wait:
+        driver.apply_config(config_filepath="/not/real/config.txt", commit_timer=10)
+
+    # THEN expect session lock released only while waiting to confirm commit
+    mock_wait.assert_called_with(timeout=450)
+    mock_napalm.return_value.confirm_commit.assert_called()
+    assert used == ["wait"]
+
+
 @patch("builtins.open", new_callable=mock_open, read_data=None)
 def test_should_raise_error_when_replacing_config_and_host_connection_lost(
     mock_open, mock_napalm
@@ -385,3 +454,176 @@ def test_should_raise_error_when_replacing_config_and_host_connection_lost(
         str(error.value)
         == "host connection lost after commit: ConnectionException: foo"
     )
+
+
+def test_should_return_state_when_getting_state(mock_napalm):
+    # GIVEN host
+    host = Host(
+        hostname="core0",
+        site="london",
+        customer="acme",
+        mgmt_ip="10.0.0.1",
+        os_name="junos",  # junos is irrelevant just needs to be a valid driver
+        _facts={},
+        _settings=None,
+    )
+
+    # GIVEN driver
+    driver = NapalmDriver(host=host, username="testuser")
+
+    # GIVEN internal driver getters are patched
+    mock_napalm.return_value.get_facts.return_value = {"hostname": "core0"}
+    mock_napalm.return_value.get_interfaces.return_value = {"ge-0/0/0": {}}
+
+    # WHEN getting state
+    with driver:
+        state = driver.get_state(["facts", "interfaces"])
+
+    # THEN expect state from each getter
+    assert state == {"facts": {"hostname": "core0"}, "interfaces": {"ge-0/0/0": {}}}
+
+    # GIVEN getter is not implemented by napalm driver
+    mock_napalm.return_value.get_lldp_neighbors.side_effect = NotImplementedError
+
+    # WHEN getting state
+    with driver:
+        with pytest.raises(DriverError) as error:
+            driver.get_state(["lldp_neighbors"])
+
+    # THEN expect error message
+    assert str(error.value) == "getter 'lldp_neighbors' is not supported"
+
+
+@pytest.mark.parametrize(
+    "os_name,facts,expected_command",
+    (
+        ("junos", {}, "show system commit"),
+        ("eos", {"napalm_change_marker_command": "show foo"}, "show foo"),
+        ("eos", {}, None),
+    ),
+)
+def test_should_return_marker_when_getting_change_marker(
+    mock_napalm, os_name, facts, expected_command
+):
+    # GIVEN host
+    host = Host(
+        hostname="core0",
+        site="london",
+        customer="acme",
+        mgmt_ip="10.0.0.1",
+        os_name=os_name,
+        _facts=facts,
+        _settings=None,
+    )
+
+    # GIVEN driver
+    driver = NapalmDriver(host=host, username="testuser")
+
+    # GIVEN internal driver cli is patched
+    mock_napalm.return_value.cli.side_effect = lambda commands: {
+        commands[0]: "0 2026-01-01 00:00:00 UTC by admin"
+    }
+
+    # WHEN getting change marker
+    with driver:
+        marker = driver.get_change_marker()
+
+    # THEN expect marker only when a command is known for host
+    if expected_command:
+        mock_napalm.return_value.cli.assert_called_with([expected_command])
+        assert len(marker) == 64
+    else:
+        mock_napalm.return_value.cli.assert_not_called()
+        assert marker is None
+
+    # GIVEN cli is not supported by napalm driver
+    mock_napalm.return_value.cli.side_effect = NotImplementedError
+
+    # WHEN getting change marker
+    with driver:
+        marker = driver.get_change_marker()
+
+    # THEN expect no marker
+    assert marker is None
+
+
+def test_should_not_check_connection_when_running_methods_on_open_session(
+    mock_napalm,
+):
+    # GIVEN host
+    host = Host(
+        hostname="core0",
+        site="london",
+        customer="acme",
+        mgmt_ip="10.0.0.1",
+        os_name="junos",
+        _facts={},
+        _settings=None,
+    )
+
+    # GIVEN driver
+    driver = NapalmDriver(host=host, username="testuser")
+    mock_napalm.return_value.get_config.return_value = {"running": "foo"}
+
+    # WHEN getting config many times
+    with driver:
+        for _ in range(3):
+            driver.get_config()
+
+        # THEN expect no liveness round trips
+        mock_napalm.return_value.is_alive.assert_not_called()
+
+        # WHEN method fails
+        mock_napalm.return_value.get_config.side_effect = ConnectionException("eof")
+        with pytest.raises(ConnectionException):
+            driver.get_config()
+
+        # THEN expect connection checked on next call
+        mock_napalm.return_value.is_alive.return_value = {"is_alive": False}
+        with pytest.raises(DriverNotConnectedError):
+            driver.get_config()
+        mock_napalm.return_value.is_alive.assert_called_once()
+
+    # THEN expect methods to check connection once session closed
+    with pytest.raises(DriverNotConnectedError):
+        driver.get_change_marker()
+    assert mock_napalm.return_value.is_alive.call_count == 2
+
+
+def test_should_check_idle_session_when_keepalive_started(mock_napalm):
+    # GIVEN host
+    host = Host(
+        hostname="core0",
+        site="london",
+        customer="acme",
+        mgmt_ip="10.0.0.1",
+        os_name="junos",
+        _facts={},
+        _settings=None,
+    )
+
+    # GIVEN driver with session that drops after the first check
+    driver = NapalmDriver(host=host, username="testuser")
+    checked = threading.Event()
+
+    def is_alive():
+        checked.set()
+        return {"is_alive": mock_napalm.return_value.is_alive.call_count < 2}
+
+    mock_napalm.return_value.is_alive.side_effect = is_alive
+
+    with driver:
+        # WHEN keepalive started on idle session
+        driver.start_keepalive(0.05)
+
+        # THEN expect connection checked until session drops
+        assert checked.wait(5)
+        for _ in range(100):
+            if mock_napalm.return_value.is_alive.call_count >= 2:
+                break
+            time.sleep(0.05)
+        time.sleep(0.2)
+        assert mock_napalm.return_value.is_alive.call_count == 2
+
+    # THEN expect keepalive stopped with session
+    assert driver._keepalive is None
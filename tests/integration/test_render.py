@@ -20,8 +20,11 @@ import pathlib
 import pytest
 
 from nectl.configs.render import render_hosts, render_template
+from nectl.configs.profiler import RenderProfiler
+from nectl.metrics import MemorySink, add_sink, remove_sink
 from nectl.configs.templates import _import_template
 from nectl.configs.utils import write_configs_to_dir
+from nectl import Nectl
 from nectl.datatree.hosts import Host
 from nectl.exceptions import RenderError
 
@@ -378,3 +381,93 @@ def test_should_return_config_when_writing_configs_to_files(mock_settings):
             encoding="utf-8",
         ) as fh:
             assert fh.read() == conf + "\n"
+
+
+def test_should_record_section_stats_when_rendering_with_profiler(mock_settings):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN mock hosts
+    hosts = [
+        Host(
+            hostname=hostname,
+            site="london",
+            os_name="fakeos",
+            os_version="5.1",
+            _facts={"id": f"{hostname}.london", "hostname": hostname},
+        )
+        for hostname in ("core0", "core1")
+    ]
+
+    # GIVEN templates directory
+    templates = pathlib.Path(settings.kit_path) / settings.templates_dirname
+    templates.mkdir(parents=True)
+
+    # GIVEN fakeos template with a slow section and an empty section
+    (templates / "fakeos.py").write_text(
+        "import time\n"
+        "\n"
+        "def section_fast(hostname):\n"
+        "    print(f'hostname is: {hostname}')\n"
+        "\n"
+        "def section_slow():\n"
+        "    time.sleep(0.01)\n"
+        "    print('slow')\n"
+        "\n"
+        "def section_empty():\n"
+        "    pass\n"
+    )
+
+    # GIVEN profiler
+    profiler = RenderProfiler()
+
+    # WHEN rendering hosts
+    render_hosts(hosts=hosts, settings=settings, profiler=profiler)
+
+    # THEN expect stats for each section with slowest first
+    profile = profiler.to_dict()
+    assert list(profile["sections"])[0] == "fakeos:section_slow"
+    assert profile["sections"]["fakeos:section_fast"]["calls"] == 2
+    assert profile["sections"]["fakeos:section_fast"]["bytes"] == 2 * len(
+        "hostname is: core0"
+    )
+    assert profile["sections"]["fakeos:section_empty"]["bytes"] == 0
+    assert profile["sections"]["fakeos:section_slow"]["time"] >= 0.02
+
+    # THEN expect stats for each host
+    assert set(profile["hosts"]) == {"core0.london", "core1.london"}
+    assert profile["hosts"]["core0.london"]["calls"] == 3
+
+    # THEN expect summary table to list slowest section first
+    table = profiler.format_table(limit=1).splitlines()
+    assert len(table) == 2
+    assert table[1].startswith("fakeos:section_slow")
+
+
+def test_should_record_spans_when_rendering_and_writing_configs(
+    mock_settings, mock_template_generator
+):
+    # GIVEN mock settings
+    settings = mock_settings
+
+    # GIVEN template exists in kit directory
+    mock_template_generator(settings)
+
+    # GIVEN metrics sink
+    sink = MemorySink()
+    add_sink(sink)
+
+    # WHEN discovering hosts and rendering configs
+    try:
+        hosts = Nectl(settings=settings).get_hosts(customer="acme")
+        Nectl(settings=settings).render_configs(hosts=hosts.values())
+    finally:
+        remove_sink(sink)
+
+    # THEN expect discovery and write spans
+    assert sink.spans("discovery")[0]["labels"]["hosts"] > len(hosts)
+    assert sink.spans("write")[0]["labels"]["files"] == len(hosts)
+
+    # THEN expect facts and render spans per host
+    assert {r["labels"]["host"] for r in sink.spans("facts")} == set(hosts)
+    assert {r["labels"]["host"] for r in sink.spans("render")} == set(hosts)
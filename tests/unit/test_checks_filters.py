@@ -0,0 +1,101 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=C0116
+import pytest
+from unittest.mock import MagicMock
+
+from nectl.exceptions import ChecksError
+from nectl.datatree.hosts import Host
+from nectl.checks.filters import HostsFilterIndex
+
+
+@pytest.fixture
+def hosts():
+    return [
+        Host(
+            hostname=hostname,
+            site=site,
+            os_name=os_name,
+            _facts={"vlans": vlans},
+            _settings=None,
+        )
+        for hostname, site, os_name, vlans in (
+            ("core0", "london", "junos", [10, 20]),
+            ("core1", "london", "eos", [10]),
+            ("core0", "newyork", "junos", [10, 20]),
+            ("core1", "newyork", "iosxr", []),
+        )
+    ]
+
+
+def test_should_evaluate_callable_filter_once_when_filtering_hosts_twice(hosts):
+    # GIVEN hosts filter index
+    index = HostsFilterIndex(hosts)
+
+    # GIVEN callable filter
+    hosts_filter = MagicMock(side_effect=lambda host: host.site == "london")
+
+    # WHEN filtering hosts twice with the same filter
+    first = index.filter(hosts_filter)
+    second = index.filter(hosts_filter)
+
+    # THEN expect matching hosts
+    assert [host.id for host in first] == ["core0.london", "core1.london"]
+
+    # THEN expect filter to only be called once per host
+    assert hosts_filter.call_count == len(hosts)
+    assert second is first
+
+
+@pytest.mark.parametrize(
+    "hosts_filter,expected_ids",
+    (
+        ({"site": "london"}, ["core0.london", "core1.london"]),
+        (
+            {"os_name": ["junos", "iosxr"]},
+            ["core0.london", "core0.newyork", "core1.newyork"],
+        ),
+        ({"site": "newyork", "os_name": ("junos", "eos")}, ["core0.newyork"]),
+        ({"vlans": [[10, 20]]}, ["core0.london", "core0.newyork"]),
+        ({"site": "paris"}, []),
+        ({}, ["core0.london", "core1.london", "core0.newyork", "core1.newyork"]),
+    ),
+)
+def test_should_return_matching_hosts_when_filtering_with_dict_filter(
+    hosts, hosts_filter, expected_ids
+):
+    # GIVEN hosts filter index
+    index = HostsFilterIndex(hosts)
+
+    # WHEN filtering hosts with dict filter
+    matched = index.filter(hosts_filter)
+
+    # THEN expect matching hosts in original order
+    assert [host.id for host in matched] == expected_ids
+
+
+def test_should_raise_error_when_filtering_with_invalid_filter(hosts):
+    # GIVEN hosts filter index
+    index = HostsFilterIndex(hosts)
+
+    # WHEN filtering hosts with unsupported filter type
+    with pytest.raises(ChecksError) as error:
+        index.filter("london")
+
+    # THEN expect error message
+    assert "must be a callable or dict" in str(error.value)
@@ -0,0 +1,197 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=C0116
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+
+from nectl.exceptions import DriverError
+from nectl.datatree.hosts import Host
+from nectl.checks.sessions import DriverSessionPool
+
+
+@pytest.fixture
+def hosts():
+    return [
+        Host(
+            hostname=hostname,
+            site="london",
+            os_name="fakeos",
+            mgmt_ip="10.0.0.1",
+            _facts={},
+            _settings=None,
+        )
+        for hostname in ("core0", "core1", "core2")
+    ]
+
+
+@patch("nectl.checks.sessions.get_driver")
+def test_should_reuse_session_when_getting_session_for_same_host(
+    mock_get_driver, mock_settings, hosts
+):
+    # GIVEN session pool
+    pool = DriverSessionPool(settings=mock_settings)
+
+    # WHEN getting session for host twice
+    first = pool.get(hosts[0])
+    second = pool.get(hosts[0])
+
+    # THEN expect same session
+    assert first is second
+
+    # THEN expect one connection opened
+    mock_get_driver.return_value.return_value.__enter__.assert_called_once()
+
+
+@patch("nectl.checks.sessions.get_driver")
+def test_should_close_least_recently_used_session_when_pool_is_full(
+    mock_get_driver, mock_settings, hosts
+):
+    # GIVEN driver creates a new session per host
+    sessions = {}
+
+    def driver(host, **kwargs):
+        sessions[host.id] = MagicMock()
+        sessions[host.id].__enter__.return_value = sessions[host.id]
+        return sessions[host.id]
+
+    mock_get_driver.return_value = driver
+
+    # GIVEN session pool with 2 sessions
+    pool = DriverSessionPool(settings=mock_settings, max_sessions=2)
+
+    # WHEN getting sessions with core0 used most recently before core2
+    pool.get(hosts[0])
+    pool.get(hosts[1])
+    pool.get(hosts[0])
+    pool.get(hosts[2])
+
+    # THEN expect core1 session to be closed
+    sessions["core1.london"].__exit__.assert_called_once()
+    sessions["core0.london"].__exit__.assert_not_called()
+    assert len(pool) == 2
+
+    # WHEN closing all sessions
+    pool.close_all()
+
+    # THEN expect all sessions to be closed
+    sessions["core0.london"].__exit__.assert_called_once()
+    sessions["core2.london"].__exit__.assert_called_once()
+    assert len(pool) == 0
+
+
+@patch("nectl.checks.sessions.get_driver")
+def test_should_not_reconnect_when_getting_session_for_host_that_failed(
+    mock_get_driver, mock_settings, hosts
+):
+    # GIVEN driver fails to connect
+    mock_get_driver.return_value.return_value.__enter__.side_effect = DriverError(
+        "connection refused"
+    )
+
+    # GIVEN session pool
+    pool = DriverSessionPool(settings=mock_settings)
+
+    # WHEN getting session for host twice
+    for _ in range(2):
+        with pytest.raises(DriverError) as error:
+            pool.get(hosts[0])
+
+        # THEN expect error
+        assert "connection refused" in str(error.value)
+
+    # THEN expect one connection attempt
+    mock_get_driver.return_value.return_value.__enter__.assert_called_once()
+
+
+@patch("nectl.checks.sessions.get_driver")
+def test_should_start_keepalive_when_opening_session(
+    mock_get_driver, mock_settings, hosts
+):
+    # GIVEN settings with keepalive
+    mock_settings.checks_keepalive = 30.0
+
+    # GIVEN session pool
+    pool = DriverSessionPool(settings=mock_settings)
+
+    # WHEN getting session for host
+    session = pool.get(hosts[0])
+
+    # THEN expect keepalive started for session
+    session.start_keepalive.assert_called_once_with(30.0)
+
+
+@patch("nectl.checks.sessions.get_driver")
+def test_should_close_session_when_starting_keepalive_fails(
+    mock_get_driver, mock_settings, hosts
+):
+    # GIVEN driver which fails to start keepalive
+    session = mock_get_driver.return_value.return_value.__enter__.return_value
+    session.start_keepalive.side_effect = RuntimeError("no threads")
+
+    # GIVEN session pool
+    pool = DriverSessionPool(settings=mock_settings)
+
+    with pytest.raises(DriverError):
+        # WHEN getting session for host
+        pool.get(hosts[0])
+
+    # THEN expect connected session to be closed
+    session.__exit__.assert_called_once_with(None, None, None)
+    assert len(pool) == 0
+
+
+@patch("nectl.checks.sessions.get_driver")
+def test_should_connect_hosts_at_same_time_when_getting_sessions_from_threads(
+    mock_get_driver, mock_settings, hosts
+):
+    # GIVEN driver which waits for two hosts to connect at the same time
+    barrier = threading.Barrier(2, timeout=5)
+    opened = []
+
+    def driver(host, **kwargs):
+        session = MagicMock()
+
+        def enter():
+            opened.append(host.id)
+            barrier.wait()
+            return session
+
+        session.__enter__.side_effect = enter
+        return session
+
+    mock_get_driver.return_value = driver
+
+    # GIVEN session pool
+    pool = DriverSessionPool(settings=mock_settings)
+
+    # WHEN getting sessions for two hosts, and one host twice, from threads
+    sessions = {}
+    threads = [
+        threading.Thread(target=lambda h=h, n=n: sessions.update({n: pool.get(h)}))
+        for n, h in enumerate((hosts[0], hosts[1], hosts[0]))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    # THEN expect one session per host opened at the same time
+    assert sorted(opened) == ["core0.london", "core1.london"]
+    assert sessions[0] is sessions[2]
+    assert len(pool) == 2
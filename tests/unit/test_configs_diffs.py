@@ -0,0 +1,243 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=C0116
+import pytest
+
+from nectl.configs.diffs import (
+    detect_config_format,
+    diff_configs,
+    group_diffs,
+    normalize_diff,
+)
+
+JUNOS_CURLY = """\
+## Last commit: 2026-01-01 00:00:00 UTC
+system {
+    host-name r1;
+    ntp {
+        server 10.0.0.1;
+    }
+}
+interfaces {
+    ge-0/0/0 {
+        description old;
+    }
+}
+"""
+
+EOS_INDENTED = """\
+hostname r1
+!
+interface Ethernet1
+   description old
+   mtu 9000
+!
+ntp server 10.0.0.1
+end
+"""
+
+
+@pytest.mark.parametrize(
+    "config,expected",
+    (
+        ("set system host-name r1\n", "set"),
+        (JUNOS_CURLY, "curly"),
+        (EOS_INDENTED, "indented"),
+    ),
+)
+def test_should_return_format_when_detecting_config_format(config, expected):
+    # WHEN detecting config format
+    config_format = detect_config_format(config)
+
+    # THEN expect format
+    assert config_format == expected
+
+
+def test_should_return_grouped_diff_when_diffing_junos_curly_configs():
+    # GIVEN staged config with sections reordered and changes
+    staged = (
+        "interfaces {\n"
+        "    ge-0/0/0 {\n"
+        "        description new;\n"
+        "    }\n"
+        "}\n"
+        "system {\n"
+        "    host-name r1;\n"
+        "    ntp {\n"
+        "        server 10.0.0.1;\n"
+        "        server 10.0.0.2;\n"
+        "    }\n"
+        "}\n"
+    )
+
+    # WHEN diffing configs
+    diff = diff_configs(active=JUNOS_CURLY, staged=staged)
+
+    # THEN expect only changed statements under their hierarchy
+    assert diff == (
+        "[edit interfaces ge-0/0/0]\n"
+        "-   description old;\n"
+        "+   description new;\n"
+        "[edit system ntp]\n"
+        "+   server 10.0.0.2;"
+    )
+
+
+def test_should_return_grouped_diff_when_diffing_eos_indented_configs():
+    # GIVEN staged config with statements reordered and changes
+    staged = (
+        "hostname r1\n"
+        "interface Ethernet1\n"
+        "   mtu 9000\n"
+        "   description new\n"
+        "interface Ethernet2\n"
+        "   shutdown\n"
+        "ntp server 10.0.0.1\n"
+        "ntp server 10.0.0.2\n"
+    )
+
+    # WHEN diffing configs
+    diff = diff_configs(active=EOS_INDENTED, staged=staged)
+
+    # THEN expect changed statements with parent sections as context
+    assert diff == (
+        "  interface Ethernet1\n"
+        "-    description old\n"
+        "+    description new\n"
+        "  interface Ethernet2\n"
+        "+    shutdown\n"
+        "+ ntp server 10.0.0.2"
+    )
+
+
+def test_should_return_diff_when_diffing_junos_set_configs():
+    # GIVEN active and staged set configs
+    active = "set system host-name r1\nset system ntp server 10.0.0.1\n"
+    staged = "set system ntp server 10.0.0.1\nset system host-name r2\n"
+
+    # WHEN diffing configs
+    diff = diff_configs(active=active, staged=staged)
+
+    # THEN expect removed and added commands
+    assert diff == "- set system host-name r1\n+ set system host-name r2"
+
+
+@pytest.mark.parametrize(
+    "active,staged",
+    (
+        (
+            "firewall {\n"
+            "    family inet {\n"
+            "        filter protect-re {\n"
+            "            term allow-ssh {\n"
+            "                then accept;\n"
+            "            }\n"
+            "            term deny-all {\n"
+            "                then discard;\n"
+            "            }\n"
+            "        }\n"
+            "    }\n"
+            "}\n",
+            "firewall {\n"
+            "    family inet {\n"
+            "        filter protect-re {\n"
+            "            term deny-all {\n"
+            "                then discard;\n"
+            "            }\n"
+            "            term allow-ssh {\n"
+            "                then accept;\n"
+            "            }\n"
+            "        }\n"
+            "    }\n"
+            "}\n",
+        ),
+        (
+            "set policy-options policy-statement export term a then accept\n"
+            "set policy-options policy-statement export term b then reject\n",
+            "set policy-options policy-statement export term b then reject\n"
+            "set policy-options policy-statement export term a then accept\n",
+        ),
+        (
+            "ip access-list extended protect\n"
+            " permit tcp any any eq 22\n"
+            " deny ip any any\n",
+            "ip access-list extended protect\n"
+            " deny ip any any\n"
+            " permit tcp any any eq 22\n",
+        ),
+    ),
+)
+def test_should_return_diff_when_diffing_configs_with_reordered_terms(active, staged):
+    # WHEN diffing configs where order sensitive statements are reordered
+    diff = diff_configs(active=active, staged=staged)
+
+    # THEN expect moved statement to be removed and added
+    assert [line[0] for line in diff.splitlines() if line[0] in "+-"] == ["-", "+"]
+
+
+@pytest.mark.parametrize("config", (JUNOS_CURLY, EOS_INDENTED))
+def test_should_return_empty_diff_when_diffing_same_configs(config):
+    # WHEN diffing config with itself
+    diff = diff_configs(active=config, staged=config)
+
+    # THEN expect no diff
+    assert diff == ""
+
+
+def test_should_remove_host_specific_text_when_normalizing_diff():
+    # GIVEN unified diff with file headers, hunk line numbers and timestamp
+    diff = (
+        "--- core0.london.txt\n"
+        "+++ core0.london.txt\n"
+        "## Last commit: 2026-01-01 00:00:00 UTC\n"
+        "@@ -10,3 +10,4 @@ ntp\n"
+        " ntp server 10.0.0.1  \n"
+        "\n"
+        "+ntp server 10.0.0.2\n"
+    )
+
+    # WHEN normalizing diff
+    normalized = normalize_diff(diff)
+
+    # THEN expect only change lines
+    assert normalized == "@@ ntp\n ntp server 10.0.0.1\n+ntp server 10.0.0.2"
+
+
+def test_should_group_hosts_when_grouping_diffs_with_same_change():
+    # GIVEN diffs where hosts share changes with different line numbers
+    diffs = [
+        ("core0.london", "@@ -10,1 +10,2 @@\n+ntp server 10.0.0.2\n"),
+        ("core1.london", "@@ -12,1 +12,2 @@\n+ntp server 10.0.0.2"),
+        ("edge0.paris", "+snmp location paris"),
+        ("core0.paris", "@@ -8,1 +8,2 @@\n+ntp server 10.0.0.2\n"),
+        ("core1.paris", "\n"),
+    ]
+
+    # WHEN grouping diffs
+    groups = group_diffs(diffs)
+
+    # THEN expect distinct diffs with most hosts first
+    assert [group.hosts for group in groups] == [
+        ["core0.london", "core0.paris", "core1.london"],
+        ["edge0.paris"],
+    ]
+
+    # THEN expect one copy of each diff
+    assert groups[0].diff == "@@\n+ntp server 10.0.0.2"
+    assert groups[1].diff == "+snmp location paris"
+    assert groups[0].digest != groups[1].digest
@@ -0,0 +1,143 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=C0116
+import threading
+import pytest
+
+from nectl.exceptions import DriverConfigLoadError, DriverLockError
+from nectl.configs.limiter import AdaptiveLimiter, SessionLimiter
+
+
+def run_sessions(limiter: AdaptiveLimiter, total: int, overloaded=False):
+    for _ in range(total):
+        limiter.acquire()
+        limiter.release(overloaded=overloaded)
+
+
+def test_should_adjust_limit_when_releasing_sessions():
+    # GIVEN limiter
+    limiter = AdaptiveLimiter(maximum=32)
+
+    # WHEN sessions are healthy before any overload
+    run_sessions(limiter, 7)
+
+    # THEN expect limit to grow by one session per session
+    assert str(limiter) == "8"
+
+    # WHEN sessions are overloaded
+    run_sessions(limiter, 2, overloaded=True)
+
+    # THEN expect limit halved once for the burst
+    assert str(limiter) == "4"
+
+    # WHEN about a full limit of sessions is healthy
+    run_sessions(limiter, 5)
+
+    # THEN expect limit to grow by one session
+    assert str(limiter) == "5"
+
+    # WHEN sessions are overloaded many times
+    run_sessions(limiter, 20, overloaded=True)
+
+    # THEN expect limit to stay at minimum
+    assert str(limiter) == "1"
+
+    # WHEN many sessions are healthy
+    run_sessions(limiter, 10000)
+
+    # THEN expect limit to stay at maximum
+    assert str(limiter) == "32"
+
+
+def test_should_wait_for_session_when_acquiring_limiter_at_limit():
+    # GIVEN limiter with two sessions open at limit
+    limiter = AdaptiveLimiter(maximum=2, initial=2)
+    limiter.acquire()
+    limiter.acquire()
+
+    # WHEN acquiring another session in a thread
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+    thread.start()
+
+    # THEN expect it to wait
+    assert not acquired.wait(0.2)
+
+    # WHEN a session is released
+    limiter.release()
+
+    # THEN expect waiting session to be acquired
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_should_decrease_site_and_global_limits_when_session_is_overloaded():
+    # GIVEN session limiter with healthy sessions to two sites
+    limiter = SessionLimiter(workers=16, site_max_sessions=4, latency_threshold=5)
+    for site in ("london", "paris"):
+        for _ in range(3):
+            with limiter.session(site):
+                pass
+
+    # THEN expect site limits capped at site max sessions
+    assert str(limiter.get_site_limiter("london")) == "4"
+    assert str(limiter.global_limiter) == "7"
+
+    # WHEN session to site fails to take lock
+    with pytest.raises(DriverLockError):
+        with limiter.session("london"):
+            raise DriverLockError("foo")
+
+    # THEN expect site and global limits to decrease
+    assert str(limiter.get_site_limiter("london")) == "2"
+    assert str(limiter.get_site_limiter("paris")) == "4"
+    assert str(limiter.global_limiter) == "3"
+
+    # WHEN session to other site is slow to connect
+    with limiter.session("paris") as stats:
+        stats["latency"] = 6
+
+    # THEN expect site limit to decrease
+    assert str(limiter.get_site_limiter("paris")) == "2"
+
+    # WHEN session has an error which is not overload
+    with pytest.raises(DriverConfigLoadError):
+        with limiter.session("paris"):
+            raise DriverConfigLoadError("foo")
+
+    # THEN expect site limit not to decrease
+    assert str(limiter.get_site_limiter("paris")) == "2"
+
+
+def test_should_only_use_global_limit_when_session_has_no_site():
+    # GIVEN session limiter with healthy sessions
+    limiter = SessionLimiter(workers=16, site_max_sessions=4)
+    for _ in range(3):
+        with limiter.session(None):
+            pass
+
+    # WHEN session with no site is overloaded
+    with pytest.raises(DriverLockError):
+        with limiter.session(None):
+            raise DriverLockError("foo")
+
+    # THEN expect global limit to decrease
+    assert str(limiter.global_limiter) == "2"
+
+    # THEN expect no site limiter for hosts with no site
+    assert not limiter._sites
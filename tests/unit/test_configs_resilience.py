@@ -0,0 +1,214 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=C0116
+import pytest
+from unittest.mock import patch, MagicMock
+
+from nectl.datatree.hosts import Host
+from nectl.exceptions import (
+    DriverAuthError,
+    DriverCircuitOpenError,
+    DriverConnectionError,
+)
+from nectl.configs.resilience import MAX_BACKOFF, CircuitBreaker, RetrySession
+
+
+def make_host(hostname: str = "core0", site: str = "london") -> Host:
+    return Host(
+        hostname=hostname,
+        site=site,
+        customer="acme",
+        mgmt_ip="10.0.0.1",
+        os_name="fakeos",
+        _facts={},
+        _settings=None,
+    )
+
+
+@patch("nectl.configs.resilience.time.sleep")
+def test_should_retry_with_backoff_when_connection_fails(mock_sleep):
+    # GIVEN driver which fails to connect twice
+    driver = MagicMock()
+    driver.__enter__.side_effect = [
+        DriverConnectionError("timed out"),
+        DriverConnectionError("timed out"),
+        "con",
+    ]
+
+    # WHEN opening session with retries
+    with RetrySession(driver, make_host(), retries=3, backoff=20.0) as con:
+        pass
+
+    # THEN expect connection after retries
+    assert con == "con"
+    assert driver.__enter__.call_count == 3
+    driver.__exit__.assert_called_once()
+
+    # THEN expect jittered delays within doubling backoff up to maximum
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    assert len(delays) == 2
+    assert 0 <= delays[0] <= 20.0
+    assert 0 <= delays[1] <= MAX_BACKOFF
+
+
+@patch("nectl.configs.resilience.time.sleep")
+def test_should_raise_when_connection_retries_exhausted(mock_sleep):
+    # GIVEN driver which always fails to connect
+    driver = MagicMock()
+    driver.__enter__.side_effect = DriverConnectionError("timed out")
+
+    # WHEN opening session with retries
+    # THEN expect connection error after retries
+    with pytest.raises(DriverConnectionError):
+        with RetrySession(driver, make_host(), retries=2):
+            pass
+
+    assert driver.__enter__.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+def test_should_not_retry_when_error_is_not_connection_error():
+    # GIVEN driver which fails authentication
+    driver = MagicMock()
+    driver.__enter__.side_effect = DriverAuthError("denied")
+
+    # WHEN opening session with retries
+    # THEN expect error without retries
+    with pytest.raises(DriverAuthError):
+        with RetrySession(driver, make_host(), retries=2):
+            pass
+
+    assert driver.__enter__.call_count == 1
+
+
+def test_should_open_circuit_when_site_reaches_failure_limit():
+    # GIVEN circuit breaker
+    breaker = CircuitBreaker(failure_limit=2, retry_timeout=60.0)
+
+    # WHEN site has failures below limit
+    breaker.record_failure("london")
+
+    # THEN expect hosts to be allowed
+    breaker.allow(make_host())
+
+    # WHEN site reaches failure limit
+    breaker.record_failure("london")
+
+    # THEN expect hosts at site to fail fast
+    with pytest.raises(DriverCircuitOpenError):
+        breaker.allow(make_host("core1"))
+
+    # THEN expect hosts at other sites to be allowed
+    breaker.allow(make_host(site="nyc"))
+
+    # THEN expect skipped host reported for site
+    assert breaker.get_skipped() == {"london": ["core1.london.acme"]}
+
+
+def test_should_reset_failures_when_site_connection_succeeds():
+    # GIVEN circuit breaker with one failure
+    breaker = CircuitBreaker(failure_limit=2, retry_timeout=60.0)
+    breaker.record_failure("london")
+
+    # WHEN connection succeeds followed by another failure
+    breaker.record_success("london")
+    breaker.record_failure("london")
+
+    # THEN expect circuit to be closed
+    assert not breaker.is_open("london")
+
+
+@patch("nectl.configs.resilience.time.monotonic")
+def test_should_allow_one_trial_when_retry_timeout_passed(mock_monotonic):
+    # GIVEN circuit breaker opened for site
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker(failure_limit=1, retry_timeout=60.0)
+    breaker.record_failure("london")
+
+    # WHEN retry timeout has passed
+    mock_monotonic.return_value = 200.0
+
+    # THEN expect one host to be allowed and others to fail fast
+    breaker.allow(make_host("core0"))
+    with pytest.raises(DriverCircuitOpenError):
+        breaker.allow(make_host("core1"))
+
+    # WHEN trial fails
+    breaker.record_failure("london")
+
+    # THEN expect circuit to stay open for another timeout
+    with pytest.raises(DriverCircuitOpenError):
+        breaker.allow(make_host("core2"))
+
+    # WHEN retry timeout has passed and trial succeeds
+    mock_monotonic.return_value = 300.0
+    breaker.allow(make_host("core3"))
+    breaker.record_success("london")
+
+    # THEN expect circuit to be closed
+    assert not breaker.is_open("london")
+    breaker.allow(make_host("core4"))
+
+
+@patch("nectl.configs.resilience.time.monotonic")
+def test_should_allow_next_trial_when_trial_host_fails_without_connection_error(
+    mock_monotonic,
+):
+    # GIVEN circuit breaker opened for site
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker(failure_limit=1, retry_timeout=60.0)
+    breaker.record_failure("london")
+
+    # GIVEN retry timeout has passed
+    mock_monotonic.return_value = 200.0
+
+    # GIVEN trial host driver which fails authentication
+    driver = MagicMock()
+    driver.__enter__.side_effect = DriverAuthError("denied")
+
+    # WHEN trial host opens session
+    breaker.allow(make_host("core0"))
+    with pytest.raises(DriverAuthError):
+        with RetrySession(driver, make_host("core0"), breaker=breaker):
+            pass
+
+    # THEN expect circuit to stay open and next host to be allowed to try
+    assert breaker.is_open("london")
+    breaker.allow(make_host("core1"))
+    with pytest.raises(DriverCircuitOpenError):
+        breaker.allow(make_host("core2"))
+
+
+@patch("nectl.configs.resilience.time.sleep")
+def test_should_stop_retrying_when_site_circuit_opens(mock_sleep):
+    # GIVEN circuit breaker opened for site
+    breaker = CircuitBreaker(failure_limit=1, retry_timeout=60.0)
+    breaker.record_failure("london")
+
+    # GIVEN driver which fails to connect
+    driver = MagicMock()
+    driver.__enter__.side_effect = DriverConnectionError("timed out")
+
+    # WHEN opening session with retries
+    # THEN expect connection error without retries
+    with pytest.raises(DriverConnectionError):
+        with RetrySession(driver, make_host(), retries=3, breaker=breaker):
+            pass
+
+    assert driver.__enter__.call_count == 1
+    mock_sleep.assert_not_called()
@@ -0,0 +1,51 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=C0116
+import pytest
+
+from nectl.datatree.hosts import Host
+from nectl.configs.rollout import get_rollout_waves
+
+
+@pytest.mark.parametrize(
+    "order,expected",
+    (
+        (None, ["lab_1", "prod_2", "prod_10", "ungrouped"]),
+        (["prod_10", "foo"], ["prod_10", "lab_1", "prod_2", "ungrouped"]),
+    ),
+)
+def test_should_return_waves_in_order_when_getting_rollout_waves(order, expected):
+    # GIVEN hosts in deployment groups and one host with no group
+    hosts = [
+        Host(hostname=f"core{num}", deployment_group=group, _facts={}, _settings=None)
+        for num, group in enumerate(
+            ("prod_10", "prod_2", None, "lab_1", "prod_2", "prod_10")
+        )
+    ]
+
+    # WHEN getting rollout waves
+    waves = get_rollout_waves(hosts=hosts, order=order)
+
+    # THEN expect waves in order with ungrouped hosts last
+    assert [group for group, _ in waves] == expected
+
+    # THEN expect every host in one wave
+    assert sorted(h.hostname for _, wave in waves for h in wave) == sorted(
+        h.hostname for h in hosts
+    )
+    assert [h.hostname for h in dict(waves)["prod_2"]] == ["core1", "core4"]
@@ -19,6 +19,7 @@ import pytest
 
 from nectl.datatree.hosts import Host
 from nectl.configs.drivers import get_driver, NapalmDriver
+from nectl.configs.drivers.basedriver import BaseDriver, ensure_connected
 from nectl.exceptions import DriverError, DriverNotConnectedError, DriverNotFoundError
 
 
@@ -69,6 +70,45 @@ def test_should_raise_error_when_running_driver_methods_outside_context_manager(
         assert str(error.value) == f"'{method}' must be run within context manager"
 
 
+def test_should_run_driver_methods_when_driver_does_not_call_base_init():
+    # GIVEN driver which does not call base class init
+    class FakeDriver(BaseDriver):
+        def __init__(self, host, **kwargs):
+            self.host = host
+
+        @property
+        def is_connected(self):
+            return self._session_open
+
+        @ensure_connected
+        def get_config(self, format=None, sanitized=True):
+            return "foo config"
+
+        compare_config = apply_config = get_config
+
+        def __enter__(self):
+            return super().__enter__()
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            super().__exit__(exc_type, exc_val, exc_tb)
+
+    host = Host(hostname="core0", site="london", _facts={}, _settings=None)
+    driver = FakeDriver(host=host)
+
+    # WHEN calling method within context manager
+    with driver:
+        driver.start_keepalive(30)
+        config = driver.get_config()
+
+    # THEN expect method output and keepalive stopped
+    assert config == "foo config"
+    assert driver._keepalive is None
+
+    # THEN expect error when calling method outside context manager
+    with pytest.raises(DriverNotConnectedError):
+        driver.get_config()
+
+
 @pytest.mark.parametrize(
     "os_name, expected_driver", (("junos", NapalmDriver), ("eos", NapalmDriver))
 )
@@ -0,0 +1,155 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=C0116
+import copy
+import random
+import dpath
+import pytest
+
+from nectl.datatree.facts_merge import merge_facts, merge_list
+
+
+def test_should_share_unchanged_subtrees_when_merging_facts():
+    # GIVEN shared facts with large unchanged subtree
+    shared = {
+        "prefix_lists": {"bogons": [f"10.{i}.0.0/16" for i in range(100)]},
+        "users": {"admin": {"uid": 1000}},
+    }
+    shared_copy = copy.deepcopy(shared)
+
+    # GIVEN host specific override
+    override = {"users": {"operator": {"uid": 1001}}}
+
+    # WHEN merging facts
+    merged = merge_facts(shared, override)
+
+    # THEN expect merged facts
+    assert merged == {
+        "prefix_lists": {"bogons": shared_copy["prefix_lists"]["bogons"]},
+        "users": {"admin": {"uid": 1000}, "operator": {"uid": 1001}},
+    }
+
+    # THEN expect unchanged subtrees to be referenced not copied
+    assert merged["prefix_lists"] is shared["prefix_lists"]
+    assert merged["users"]["admin"] is shared["users"]["admin"]
+    assert merged["users"]["operator"] is override["users"]["operator"]
+
+    # THEN expect inputs not to be modified
+    assert shared == shared_copy
+    assert override == {"users": {"operator": {"uid": 1001}}}
+
+
+def _random_facts(rng: random.Random, depth: int = 0) -> dict:
+    """
+    Returns random nested facts using a small key space so merges collide.
+    """
+
+    def _value(depth):
+        kind = rng.choice(
+            ["int", "str", "bool", "float", "none", "list", "dict", "dicts"]
+        )
+        if kind == "int":
+            return rng.randint(0, 3)
+        if kind == "str":
+            return rng.choice(["a", "b", "c"])
+        if kind == "bool":
+            return rng.choice([True, False])
+        if kind == "float":
+            return rng.choice([0.5, 1.0])
+        if kind == "none":
+            return None
+        if kind == "list":
+            return [rng.randint(0, 3) for _ in range(rng.randint(0, 3))]
+        if kind == "dicts":
+            return [{"k": rng.randint(0, 3)} for _ in range(rng.randint(0, 2))]
+        if depth > 3:
+            return {}
+        return _random_facts(rng, depth + 1)
+
+    return {
+        rng.choice(["a", "b", "c", "d", "e"]): _value(depth)
+        for _ in range(rng.randint(0, 5))
+    }
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_should_match_dpath_additive_merge_when_merging_random_facts(seed):
+    # GIVEN random facts
+    rng = random.Random(seed)
+
+    for _ in range(50):
+        dst = _random_facts(rng)
+        src = _random_facts(rng)
+
+        # GIVEN expected result from dpath additive merge
+        expected = dpath.merge(
+            copy.deepcopy(dst), copy.deepcopy(src), flags=dpath.MergeType.ADDITIVE
+        )
+
+        # WHEN merging facts
+        merged = merge_facts(dst, src)
+
+        # THEN expect result to match dpath
+        assert merged == expected, (dst, src)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_should_match_dpath_additive_merge_when_accumulating_random_layers(seed):
+    # GIVEN random facts layers
+    rng = random.Random(seed)
+    layers = [_random_facts(rng) for _ in range(6)]
+    layers_copy = copy.deepcopy(layers)
+
+    # GIVEN expected result from dpath additive merges
+    expected: dict = {}
+    for layer in copy.deepcopy(layers):
+        expected = dpath.merge(expected, layer, flags=dpath.MergeType.ADDITIVE)
+
+    # WHEN merging facts in accumulate mode
+    owned: dict = {}
+    merged: dict = {}
+    for layer in layers:
+        merged = merge_facts(merged, layer, owned)
+
+    # THEN expect result to match dpath
+    assert merged == expected
+
+    # THEN expect layers not to be modified
+    assert layers == layers_copy
+
+
+def test_should_prepend_list_in_place_when_merging_owned_list():
+    # GIVEN shared list layers
+    first = ["10.0.0.1"]
+    second = ["10.0.0.2"]
+    third = ["10.0.0.3"]
+
+    # WHEN merging lists in accumulate mode
+    owned: dict = {}
+    merged = merge_list(first, second, owned)
+    merged_again = merge_list(merged, third, owned)
+
+    # THEN expect most specific values first
+    assert merged_again == ["10.0.0.3", "10.0.0.2", "10.0.0.1"]
+
+    # THEN expect owned list to be updated in place
+    assert merged_again is merged
+
+    # THEN expect shared lists not to be modified
+    assert first == ["10.0.0.1"]
+    assert second == ["10.0.0.2"]
@@ -0,0 +1,126 @@
+# Copyright (C) 2026 Adam Kirchberger
+#
+# This file is part of Nectl.
+#
+# Nectl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Nectl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Nectl.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=C0116
+import json
+import pytest
+
+from nectl import metrics
+from nectl.metrics import (
+    FileSink,
+    MemorySink,
+    add_sink,
+    remove_sink,
+    record_span,
+    span,
+    increment,
+)
+
+
+@pytest.fixture
+def sink():
+    sink = MemorySink()
+    add_sink(sink)
+    yield sink
+    remove_sink(sink)
+
+
+def test_should_not_record_when_no_sinks_are_added():
+    # GIVEN no sinks
+    assert not metrics._sinks
+
+    # WHEN recording span and counter
+    with span("connect", host="core0") as labels:
+        labels["extra"] = True
+    increment("driver_errors")
+
+    # THEN expect nothing to fail
+
+
+def test_should_record_span_with_labels_when_block_finishes(sink):
+    # WHEN timing block and adding a label inside it
+    with span("connect", host="core0.london", site="london") as labels:
+        labels["port"] = 22
+
+    # THEN expect span record with labels
+    records = sink.spans("connect")
+    assert len(records) == 1
+    assert records[0]["labels"] == {
+        "host": "core0.london",
+        "site": "london",
+        "port": 22,
+    }
+    assert records[0]["duration"] >= 0
+    assert records[0]["error"] is None
+
+
+def test_should_record_error_when_block_raises(sink):
+    # WHEN block raises error
+    with pytest.raises(ValueError):
+        with span("render", host="core0.london"):
+            raise ValueError("bad template")
+
+    # THEN expect span record with error type
+    assert sink.spans("render")[0]["error"] == "ValueError"
+
+
+def test_should_return_percentiles_by_label_when_spans_are_recorded(sink):
+    # GIVEN connect spans for two sites
+    for duration in range(1, 101):
+        record_span("connect", duration / 100, site="london")
+    record_span("connect", 5.0, site="nyc")
+
+    # WHEN getting p50 and p99 by site
+    p50 = sink.percentiles("connect", 50, by="site")
+    p99 = sink.percentiles("connect", 99, by="site")
+
+    # THEN expect nearest rank percentiles per site
+    assert p50 == {"london": 0.5, "nyc": 5.0}
+    assert p99 == {"london": 0.99, "nyc": 5.0}
+
+
+def test_should_return_counter_totals_by_label_when_incremented(sink):
+    # GIVEN counters for two sites
+    increment("driver_errors", site="london")
+    increment("driver_errors", 2, site="london")
+    increment("driver_errors", site="nyc")
+
+    # WHEN getting totals
+    totals = sink.counter("driver_errors", by="site")
+
+    # THEN expect totals per site
+    assert totals == {"london": 3, "nyc": 1}
+
+
+def test_should_append_records_when_using_file_sink(tmp_path):
+    # GIVEN file sink
+    filepath = tmp_path / "metrics" / "metrics.jsonl"
+    sink = FileSink(str(filepath))
+    add_sink(sink)
+
+    # WHEN recording span and counter
+    record_span("write", 0.5, files=3)
+    increment("driver_errors", host="core0.london")
+    remove_sink(sink)
+
+    # THEN expect a JSON record per line
+    records = [json.loads(line) for line in filepath.read_text().splitlines()]
+    assert [(r["type"], r["name"]) for r in records] == [
+        ("span", "write"),
+        ("counter", "driver_errors"),
+    ]
+    assert records[0]["labels"] == {"files": 3}